@@ -0,0 +1,93 @@
+"""
+Measure the import time of bq_schema and its command line tools with -X importtime.
+
+Run with: python benchmarks/import_time.py [--budget-ms 100]
+"""
+import argparse
+import subprocess
+import sys
+from typing import Dict, List, Set, Tuple
+
+_REPEAT = 5
+
+_TARGETS = {
+    "bq_schema": "import bq_schema",
+    "row_transformer": "import bq_schema.row_transformer",
+    "bigquery_table": "import bq_schema.bigquery_table",
+    "migrate-tables": "import bq_schema.cli.migrate_tables",
+    "convert-table": "import bq_schema.cli.convert_table",
+    "google.cloud.bigquery (reference)": "import google.cloud.bigquery",
+}
+
+
+def _import_times(code: str) -> List[Tuple[int, str, int]]:
+    """
+    Return the cumulative import time in us, module name and nesting level of
+    every imported module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    import_times = []
+    for line in result.stderr.splitlines()[1:]:
+        _, cumulative, module = line.split("|")
+        name = module.strip()
+        level = (len(module) - len(module.lstrip()) - 1) // 2
+        import_times.append((int(cumulative), name, level))
+    return import_times
+
+
+def _measure(code: str, startup_modules: Set[str]) -> Tuple[float, Set[str]]:
+    """
+    Return the best import time in ms out of _REPEAT runs and the imported modules.
+    Modules imported by the interpreter startup are not counted.
+    """
+    best = float("inf")
+    modules: Set[str] = set()
+    for _ in range(_REPEAT):
+        import_times = _import_times(code)
+        modules = {name for _, name, _ in import_times} - startup_modules
+        total = sum(
+            cumulative
+            for cumulative, name, level in import_times
+            if level == 0 and name not in startup_modules
+        )
+        best = min(best, total / 1000)
+    return best, modules
+
+
+def main(budget_ms: float) -> int:
+    startup_modules = {name for _, name, _ in _import_times("pass")}
+    results: Dict[str, float] = {}
+    for name, code in _TARGETS.items():
+        import_time, modules = _measure(code, startup_modules)
+        results[name] = import_time
+        loads_bigquery = "google.cloud.bigquery" in modules
+        print(
+            f"{name}: {import_time:.1f}ms, {len(modules)} modules"
+            + (", loads google.cloud.bigquery" if loads_bigquery else "")
+        )
+
+    over_budget = [
+        name
+        for name, import_time in results.items()
+        if import_time > budget_ms and "(reference)" not in name
+    ]
+    if over_budget:
+        print(f"Over the budget of {budget_ms}ms: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--budget-ms",
+        default=float("inf"),
+        type=float,
+        help="Fail, if importing a target takes longer.",
+    )
+    sys.exit(main(parser.parse_args().budget_ms))
@@ -0,0 +1,133 @@
+"""
+Measure the migration throughput of find_schema_differences and
+apply_schema_differences against an in-memory bigquery client.
+
+Run with: python benchmarks/migration.py [--sizes 10 100] [--min-tables-per-second 500]
+"""
+import argparse
+import sys
+import time
+from typing import Callable, Dict, List, Sequence, Tuple, TypeVar
+
+from google.cloud.bigquery import SchemaField
+
+from bq_schema.migration.fake_client import FakeBigQueryClient, FakeTable
+from bq_schema.migration.models import ApplyStatus
+from bq_schema.migration.retry import RetryPolicy
+from bq_schema.migration.schema_diff import (
+    apply_schema_differences,
+    find_table_differences,
+)
+
+T = TypeVar("T")  # pylint: disable=invalid-name
+
+_DATASETS = 10
+
+
+def _local_tables(size: int, columns: int) -> List[FakeTable]:
+    schema = [SchemaField(f"column_{i}", "STRING") for i in range(columns)]
+    return [
+        FakeTable(f"table_{i}", list(schema), dataset=f"dataset_{i % _DATASETS}")
+        for i in range(size)
+    ]
+
+
+def _timed(function: Callable[[], T]) -> Tuple[T, float]:
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def benchmark_size(size: int, args: argparse.Namespace) -> Dict[str, float]:
+    """
+    Create all tables, find no differences, add a column and update all tables.
+    Return the tables per second of every phase.
+    """
+    client = FakeBigQueryClient(
+        latency=args.latency,
+        rate_limit_rate=args.rate_limit_rate,
+        failure_rate=args.failure_rate,
+        seed=0,
+    )
+    retry_policy = RetryPolicy(attempts=10, initial_delay=0.01, max_delay=0.1)
+    local_tables = _local_tables(size, args.columns)
+
+    def find() -> dict:
+        return find_table_differences(
+            local_tables,
+            client,
+            "project",
+            None,
+            concurrency=args.concurrency,
+            retry_policy=retry_policy,
+        )
+
+    def apply(schema_diffs: dict) -> None:
+        apply_results = apply_schema_differences(
+            schema_diffs,
+            client,
+            concurrency=args.concurrency,
+            retry_policy=retry_policy,
+        )
+        assert all(r.status == ApplyStatus.APPLIED for r in apply_results.values())
+
+    throughput = {}
+    schema_diffs, duration = _timed(find)
+    assert len(schema_diffs) == size
+    throughput["find missing"] = size / duration
+    _, duration = _timed(lambda: apply(schema_diffs))
+    throughput["create"] = size / duration
+
+    schema_diffs, duration = _timed(find)
+    assert not schema_diffs
+    throughput["find unchanged"] = size / duration
+
+    for local_table in local_tables:
+        local_table.table_schema = local_table.schema + [SchemaField("new", "INTEGER")]
+    schema_diffs, duration = _timed(find)
+    assert len(schema_diffs) == size
+    throughput["find changed"] = size / duration
+    _, duration = _timed(lambda: apply(schema_diffs))
+    throughput["update"] = size / duration
+    return throughput
+
+
+def main(args: argparse.Namespace) -> int:
+    slowest = float("inf")
+    for size in args.sizes:
+        throughput = benchmark_size(size, args)
+        print(
+            f"{size} tables: "
+            + ", ".join(f"{phase} {value:.0f}/s" for phase, value in throughput.items())
+        )
+        slowest = min(slowest, *throughput.values())
+
+    if slowest < args.min_tables_per_second:
+        print(f"Below {args.min_tables_per_second} tables per second: {slowest:.0f}")
+        return 1
+    return 0
+
+
+def parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", nargs="+", default=[10, 100, 1_000, 10_000], type=int
+    )
+    parser.add_argument("--columns", default=20, type=int)
+    parser.add_argument("--concurrency", default=8, type=int)
+    parser.add_argument(
+        "--latency", default=0.0, type=float, help="Seconds per api request."
+    )
+    parser.add_argument("--rate-limit-rate", default=0.0, type=float)
+    parser.add_argument("--failure-rate", default=0.0, type=float)
+    parser.add_argument(
+        "--min-tables-per-second",
+        default=0.0,
+        type=float,
+        help="Fail, if any phase is slower.",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args(sys.argv[1:])))
@@ -0,0 +1,131 @@
+"""
+Compare decoding the pages of a query result on the calling thread and in a
+pool of processes, for a flat row of 20 columns.
+
+Run with: python benchmarks/parallel_decode.py [--rows 200000] [--workers 2 4 8]
+"""
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+from google.cloud.bigquery import SchemaField
+from google.cloud.bigquery.table import RowIterator
+
+from bq_schema.dataclass_converter import dataclass_to_schema
+from bq_schema.row_transformer import RowTransformer
+from bq_schema.types.type_mapping import Timestamp
+
+
+@dataclass
+class Flat:  # pylint: disable=too-many-instance-attributes
+    string_1: str
+    string_2: str
+    string_3: str
+    string_4: str
+    string_5: Optional[str]
+    int_1: int
+    int_2: int
+    int_3: int
+    int_4: Optional[int]
+    float_1: float
+    float_2: float
+    float_3: Optional[float]
+    numeric_1: Decimal
+    numeric_2: Decimal
+    timestamp_1: Timestamp
+    timestamp_2: Timestamp
+    date_1: date
+    date_2: date
+    bool_1: bool
+    bool_2: Optional[bool]
+
+
+_VALUES = {
+    "STRING": "some value",
+    "INTEGER": "12345",
+    "FLOAT": "1.5",
+    "NUMERIC": "12.5",
+    "TIMESTAMP": "1577880000000000",
+    "DATE": "2020-01-01",
+    "BOOLEAN": "true",
+}
+
+
+def _row_iterator(rows: int, page_size: int) -> RowIterator:
+    """
+    Return a RowIterator, which pages through rows of the api without a client.
+    """
+    # The api returns the legacy type names.
+    legacy_types = {"INT64": "INTEGER", "FLOAT64": "FLOAT", "BOOL": "BOOLEAN"}
+    schema = [
+        SchemaField(
+            field.name,
+            legacy_types.get(field.field_type, field.field_type),
+            field.mode,
+        )
+        for field in dataclass_to_schema(Flat)
+    ]
+    pages = (rows + page_size - 1) // page_size
+
+    def api_request(query_params: Dict[str, Any], **_: Any) -> Dict[str, Any]:
+        page = int(query_params.get("pageToken", 0))
+        size = min(page_size, rows - page * page_size)
+        response: Dict[str, Any] = {
+            "rows": [
+                {"f": [{"v": _VALUES[field.field_type]} for field in schema]}
+                for _ in range(size)
+            ]
+        }
+        if page + 1 < pages:
+            response["pageToken"] = str(page + 1)
+        return response
+
+    return RowIterator(
+        client=SimpleNamespace(project="project"),
+        api_request=api_request,
+        path="/rows",
+        schema=schema,
+    )
+
+
+def _rows_per_second(instances: Iterator[Flat], rows: int) -> float:
+    start = time.perf_counter()
+    assert sum(1 for _ in instances) == rows
+    return rows / (time.perf_counter() - start)
+
+
+def main(args: argparse.Namespace) -> int:
+    row_transformer = RowTransformer(Flat)
+    serial = _rows_per_second(
+        row_transformer.iter_instances(
+            _row_iterator(args.rows, args.page_size), prefetch=0
+        ),
+        args.rows,
+    )
+    print(f"serial: {serial:.0f} rows/s")
+    for workers in args.workers:
+        parallel = _rows_per_second(
+            row_transformer.parallel_decode(
+                _row_iterator(args.rows, args.page_size), workers=workers
+            ),
+            args.rows,
+        )
+        print(f"{workers} workers: {parallel:.0f} rows/s, {parallel / serial:.1f}x")
+    return 0
+
+
+def parse_args(argv: Sequence[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", default=200_000, type=int)
+    parser.add_argument("--page-size", default=10_000, type=int)
+    parser.add_argument("--workers", nargs="+", default=[2, 4, 8], type=int)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main(parse_args(sys.argv[1:])))
@@ -0,0 +1,131 @@
+"""
+Compare RowTransformer against the generic dataclass / dacite conversions.
+
+Run with: python benchmarks/row_transformer.py
+"""
+import timeit
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional
+
+from bq_schema.row_transformer import RowTransformer
+from bq_schema.types.type_mapping import Timestamp
+
+_NUMBER = 20_000
+_REPEAT = 5
+
+
+@dataclass
+class Item:
+    sku: str
+    quantity: int
+    price: Decimal
+    tags: List[str]
+
+
+@dataclass
+class Address:
+    street: str
+    city: str
+    zip_code: Optional[str]
+
+
+@dataclass
+class Order:
+    order_id: str
+    created_at: Timestamp
+    customer_id: int
+    shipping_address: Address
+    billing_address: Optional[Address]
+    items: List[Item]
+    notes: Optional[str]
+
+
+def _order() -> Order:
+    return Order(
+        order_id="order",
+        created_at=Timestamp(datetime(2020, 1, 1)),
+        customer_id=1,
+        shipping_address=Address(street="street", city="city", zip_code=None),
+        billing_address=Address(street="street", city="city", zip_code="12345"),
+        items=[
+            Item(sku=f"sku-{i}", quantity=i, price=Decimal(i), tags=["a", "b"])
+            for i in range(10)
+        ],
+        notes=None,
+    )
+
+
+def _report(name: str, baseline: float, optimized: float) -> None:
+    print(
+        f"{name}: baseline {baseline / _NUMBER * 1e6:.2f}us/row, "
+        f"optimized {optimized / _NUMBER * 1e6:.2f}us/row, "
+        f"speedup {baseline / optimized:.1f}x"
+    )
+
+
+def benchmark_encode() -> None:
+    order = _order()
+    row_transformer = RowTransformer[Order](Order)
+    assert row_transformer.dataclass_instance_to_bq_row(order) == asdict(order)
+    baseline = timeit.timeit(lambda: asdict(order), number=_NUMBER)
+    optimized = timeit.timeit(
+        lambda: row_transformer.dataclass_instance_to_bq_row(order), number=_NUMBER
+    )
+    _report("encode", baseline, optimized)
+
+
+def benchmark_decode() -> None:
+    try:
+        from dacite import Config, from_dict  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        print("decode: skipped, install dacite for the baseline")
+        return
+
+    order = _order()
+    row = asdict(order)
+    row_transformer = RowTransformer[Order](Order)
+    assert row_transformer.bq_row_to_dataclass_instance(row) == order
+    baseline = timeit.timeit(
+        lambda: from_dict(Order, row, config=Config(check_types=False)),
+        number=_NUMBER,
+    )
+    optimized = timeit.timeit(
+        lambda: row_transformer.bq_row_to_dataclass_instance(row), number=_NUMBER
+    )
+    _report("decode", baseline, optimized)
+
+
+def benchmark_arrow_decode() -> None:
+    try:
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        print("arrow decode: skipped, install pyarrow")
+        return
+
+    rows = [asdict(_order()) for _ in range(_NUMBER)]
+    record_batch = pa.RecordBatch.from_pylist(rows)
+    row_transformer = RowTransformer[Order](Order)
+
+    def decode_rows() -> List[Order]:
+        return [
+            row_transformer.bq_row_to_dataclass_instance(row)
+            for row in record_batch.to_pylist()
+        ]
+
+    def decode_batch() -> List[Order]:
+        return row_transformer.arrow_record_batch_to_dataclass_instances(record_batch)
+
+    # Compile the decoders before timing, the best of several runs is reported.
+    decode_rows()
+    decode_batch()
+    baseline = min(timeit.repeat(decode_rows, number=1, repeat=_REPEAT))
+    optimized = min(timeit.repeat(decode_batch, number=1, repeat=_REPEAT))
+    _report("arrow decode", baseline, optimized)
+
+
+if __name__ == "__main__":
+    benchmark_encode()
+    benchmark_decode()
+    benchmark_arrow_decode()
@@ -0,0 +1,114 @@
+"""
+Generated schema shapes for the benchmarks: wide, deep, repeated and mixed.
+"""
+from dataclasses import dataclass, field, fields, is_dataclass, make_dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, List, NamedTuple, Optional, Type
+
+from bq_schema.types.big_query_field_modes import BigQueryFieldModes
+from bq_schema.types.type_mapping import Geography, Timestamp
+from bq_schema.types.type_parser import parse_field_type
+
+_VALUES: Dict[Any, Any] = {
+    str: "value",
+    bytes: b"value",
+    int: 1,
+    float: 1.5,
+    Decimal: Decimal("1.5"),
+    bool: True,
+    Timestamp: datetime(2020, 1, 1, 12),
+    date: date(2020, 1, 1),
+    time: time(12),
+    datetime: datetime(2020, 1, 1, 12),
+    Geography: "POINT(1 2)",
+}
+_WIDE_TYPES = [str, int, float, bool, Optional[str], Decimal, Timestamp, date]
+_REPEATED_LENGTH = 50
+
+
+class Shape(NamedTuple):
+    name: str
+    dataclass: Type
+    instance: Any
+
+
+def _value(field_type: Any) -> Any:
+    mode, inner_type = parse_field_type(field_type)
+    if mode == BigQueryFieldModes.REPEATED:
+        return [_value(inner_type) for _ in range(_REPEATED_LENGTH)]
+    if is_dataclass(inner_type):
+        return inner_type(
+            **{
+                dataclass_field.name: _value(dataclass_field.type)
+                for dataclass_field in fields(inner_type)
+            }
+        )
+    return _VALUES[inner_type]
+
+
+def wide_shape(columns: int = 500) -> Shape:
+    wide = make_dataclass(
+        "Wide",
+        [(f"column_{i}", _WIDE_TYPES[i % len(_WIDE_TYPES)]) for i in range(columns)],
+    )
+    return Shape("wide", wide, _value(wide))
+
+
+def deep_shape(levels: int = 10) -> Shape:
+    level = make_dataclass(f"Level{levels}", [("value", int), ("name", str)])
+    for index in reversed(range(levels)):
+        level = make_dataclass(
+            f"Level{index}",
+            [("value", int), ("name", Optional[str]), ("child", level)],
+        )
+    return Shape("deep", level, _value(level))
+
+
+@dataclass
+class RepeatedItem:
+    sku: str
+    quantity: int
+    tags: List[str]
+
+
+@dataclass
+class Repeated:
+    ids: List[int]
+    names: List[str]
+    scores: List[float]
+    items: List[RepeatedItem]
+
+
+@dataclass
+class Address:
+    street: str
+    city: str
+    zip_code: Optional[str]
+
+
+@dataclass
+class Item:
+    sku: str
+    quantity: int
+    price: Decimal
+    tags: List[str]
+
+
+@dataclass
+class Order:
+    order_id: str
+    created_at: Timestamp
+    customer_id: int
+    shipping_address: Address
+    billing_address: Optional[Address]
+    items: List[Item]
+    notes: Optional[str] = field(default=None)
+
+
+SHAPES = [
+    wide_shape(),
+    deep_shape(),
+    Shape("repeated", Repeated, _value(Repeated)),
+    Shape("mixed", Order, _value(Order)),
+]
@@ -0,0 +1,96 @@
+"""
+Microbenchmarks of the converters and RowTransformer for every schema shape.
+
+Run with: inv benchmark
+"""
+from dataclasses import asdict
+
+import pytest
+from google.cloud.bigquery import SchemaField
+from shapes import SHAPES
+
+from bq_schema.codec.json_encoder import dumps
+from bq_schema.codec.validator import compile_validator
+from bq_schema.dataclass_converter import clear_schema_cache, dataclass_to_schema
+from bq_schema.migration.schema_diff import check_schemas
+from bq_schema.row_transformer import RowTransformer
+from bq_schema.schema_converter import schema_to_dataclass
+
+
+@pytest.fixture(params=SHAPES, ids=[shape.name for shape in SHAPES])
+def shape(request):
+    return request.param
+
+
+@pytest.mark.benchmark(group="dataclass_to_schema")
+def test_dataclass_to_schema(benchmark, shape):
+    benchmark.pedantic(
+        dataclass_to_schema,
+        args=(shape.dataclass,),
+        setup=clear_schema_cache,
+        rounds=50,
+    )
+
+
+@pytest.mark.benchmark(group="dataclass_to_schema cached")
+def test_dataclass_to_schema_cached(benchmark, shape):
+    benchmark(dataclass_to_schema, shape.dataclass)
+
+
+@pytest.mark.benchmark(group="schema_to_dataclass")
+def test_schema_to_dataclass(benchmark, shape):
+    schema = dataclass_to_schema(shape.dataclass)
+    benchmark(schema_to_dataclass, shape.name, schema)
+
+
+@pytest.mark.benchmark(group="check_schemas")
+def test_check_schemas(benchmark, shape):
+    local_schema = dataclass_to_schema(shape.dataclass)
+    remote_schema = [
+        SchemaField.from_api_repr(schema_field.to_api_repr())
+        for schema_field in local_schema
+    ]
+    assert benchmark(lambda: list(check_schemas(local_schema, remote_schema))) == []
+
+
+@pytest.mark.benchmark(group="encode")
+def test_encode(benchmark, shape):
+    row_transformer = RowTransformer(shape.dataclass)
+    row = benchmark(row_transformer.dataclass_instance_to_bq_row, shape.instance)
+    assert row == asdict(shape.instance)
+
+
+@pytest.mark.benchmark(group="encode json")
+def test_encode_json(benchmark, shape):
+    encode = RowTransformer.dataclass_instance_to_json_row
+    assert benchmark(lambda: dumps(encode(shape.instance)))
+
+
+@pytest.mark.benchmark(group="decode")
+def test_decode(benchmark, shape):
+    row_transformer = RowTransformer(shape.dataclass)
+    row = asdict(shape.instance)
+    instance = benchmark(row_transformer.bq_row_to_dataclass_instance, row)
+    assert instance == shape.instance
+
+
+@pytest.mark.benchmark(group="decode lazy")
+def test_decode_lazy(benchmark, shape):
+    row_transformer = RowTransformer(shape.dataclass, lazy=True)
+    row = asdict(shape.instance)
+    instance = benchmark(row_transformer.bq_row_to_dataclass_instance, row)
+    assert instance == shape.instance
+
+
+@pytest.mark.benchmark(group="decode record")
+def test_decode_record(benchmark, shape):
+    row_transformer = RowTransformer(shape.dataclass)
+    row = asdict(shape.instance)
+    record = benchmark(row_transformer.bq_row_to_record, row)
+    assert row_transformer.record_to_dataclass_instance(record) == shape.instance
+
+
+@pytest.mark.benchmark(group="validate")
+def test_validate(benchmark, shape):
+    validator = compile_validator(shape.dataclass)
+    assert benchmark(validator, [shape.instance]) == {}
@@ -0,0 +1,27 @@
+"""
+Registry of the caches, which hold values computed once per dataclass.
+"""
+from typing import Any, Dict, List, Optional, Type, TypeVar
+
+CacheT = TypeVar("CacheT", bound=Dict[Any, Any])
+
+_CACHES: List[Dict[Any, Any]] = []
+
+
+def register_cache(cache: CacheT) -> CacheT:
+    """
+    Register a dict keyed by dataclass, so that clear_caches empties it.
+    """
+    _CACHES.append(cache)
+    return cache
+
+
+def clear_caches(dataclass: Optional[Type] = None) -> None:
+    """
+    Remove the entries of a dataclass from all registered caches, or all entries.
+    """
+    for cache in _CACHES:
+        if dataclass is None:
+            cache.clear()
+        else:
+            cache.pop(dataclass, None)
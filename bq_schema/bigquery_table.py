@@ -1,9 +1,27 @@
 from dataclasses import is_dataclass
-from typing import List, Optional, Type, Union, cast
-
-from google.cloud.bigquery import SchemaField, TimePartitioning
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Type, Union, cast
 
+from bq_schema.codec.validator import compile_validator
 from bq_schema.dataclass_converter import dataclass_to_schema
+from bq_schema.types import BigQueryFieldModes, BigQueryTypes
+
+if TYPE_CHECKING:
+    from google.cloud.bigquery import Client, SchemaField, TimePartitioning
+
+    from bq_schema.streaming_writer import StreamingWriter
+
+# Limits of the clustering specification of a table.
+_MAX_CLUSTERING_FIELDS = 4
+_CLUSTERING_TYPES = {
+    BigQueryTypes.STRING,
+    BigQueryTypes.INT64,
+    BigQueryTypes.NUMERIC,
+    BigQueryTypes.BOOL,
+    BigQueryTypes.TIMESTAMP,
+    BigQueryTypes.DATE,
+    BigQueryTypes.DATETIME,
+    BigQueryTypes.GEOGRAPHY,
+}
 
 
 # pylint: disable=missing-function-docstring
@@ -17,7 +35,7 @@ class BigqueryTable:
         raise NotImplementedError
 
     @property
-    def schema(self) -> Union[List[SchemaField], Type]:
+    def schema(self) -> Union[List["SchemaField"], Type]:
         raise NotImplementedError
 
     @property
@@ -33,7 +51,11 @@ class BigqueryTable:
         return None
 
     @property
-    def time_partitioning(self) -> Optional[TimePartitioning]:
+    def time_partitioning(self) -> Optional["TimePartitioning"]:
+        return None
+
+    @property
+    def clustering_fields(self) -> Optional[List[str]]:
         return None
 
     def full_table_name(self) -> str:
@@ -45,11 +67,134 @@ class BigqueryTable:
 
         return self.name
 
-    def get_schema_fields(self) -> List[SchemaField]:
+    def get_schema_fields(self) -> List["SchemaField"]:
         """
         Return the schema as a list of SchemaField.
         """
         if is_dataclass(self.schema):
             return dataclass_to_schema(cast(Type, self.schema))
 
-        return cast(List[SchemaField], self.schema)
+        return cast(List["SchemaField"], self.schema)
+
+    def get_clustering_fields(self) -> Optional[List[str]]:
+        """
+        Return the clustering fields, after checking them against the schema.
+
+        Up to four distinct top level columns can be clustered, which are not
+        REPEATED and have a type, which supports clustering.
+        Raise a ValueError otherwise.
+        """
+        clustering_fields = self.clustering_fields
+        if clustering_fields is None:
+            return None
+
+        errors: List[str] = []
+        if not 0 < len(clustering_fields) <= _MAX_CLUSTERING_FIELDS:
+            errors.append(
+                f"between 1 and {_MAX_CLUSTERING_FIELDS} columns can be clustered"
+            )
+        if len(set(clustering_fields)) != len(clustering_fields):
+            errors.append("columns are clustered more than once")
+
+        columns = {field.name: field for field in self.get_schema_fields()}
+        for name in clustering_fields:
+            column = columns.get(name)
+            if column is None:
+                errors.append(f"{name} does not exist")
+            elif column.mode == BigQueryFieldModes.REPEATED:
+                errors.append(f"{name} is REPEATED")
+            elif _standard_type(column.field_type) not in _CLUSTERING_TYPES:
+                field_type = getattr(column.field_type, "value", column.field_type)
+                errors.append(f"{name} of type {field_type} cannot be clustered")
+
+        if errors:
+            raise ValueError(
+                f"Invalid clustering fields of {self.full_table_name()}: "
+                f"{'; '.join(errors)}"
+            )
+        return list(clustering_fields)
+
+    def get_schema_fingerprint(self) -> Optional[str]:
+        """
+        Return a hash of the schema, see schema_fingerprint.
+        The hash of a dataclass schema is computed once.
+        """
+        # pylint: disable=import-outside-toplevel
+        from bq_schema.migration.fingerprint import (
+            dataclass_fingerprint,
+            schema_fingerprint,
+        )
+
+        if is_dataclass(self.schema):
+            return dataclass_fingerprint(cast(Type, self.schema))
+
+        return schema_fingerprint(self.get_schema_fields())
+
+    def validate_rows(self, rows: Sequence[Any]) -> Dict[int, List[str]]:
+        """
+        Check dataclass instances or dicts before inserting them.
+        Return the errors by the index of the invalid rows, see compile_validator.
+        """
+        if is_dataclass(self.schema):
+            return compile_validator(self.schema)(rows)
+
+        return compile_validator(self.get_schema_fields())(rows)
+
+    def projection_sql(
+        self,
+        view: Optional[Type] = None,
+        project: Optional[str] = None,
+        dataset: Optional[str] = None,
+    ) -> str:
+        """
+        Generate a query, which selects the columns of the view dataclass,
+        by default all columns of the schema, see projection_sql.
+        Decode the result with RowTransformer(view).
+        project and dataset override the ones of the table.
+        """
+        # pylint: disable=import-outside-toplevel
+        from bq_schema.projection import projection_sql
+
+        project = project or self.project
+        dataset = dataset or self.dataset
+        assert dataset, "Dataset has not been set."
+        table_identifier = f"{dataset}.{self.full_table_name()}"
+        if project:
+            table_identifier = f"{project}.{table_identifier}"
+
+        schema_fields = self.get_schema_fields()
+        view_fields = schema_fields if view is None else dataclass_to_schema(view)
+        return projection_sql(schema_fields, view_fields, table_identifier)
+
+    def writer(
+        self,
+        client: "Client",
+        project: Optional[str] = None,
+        dataset: Optional[str] = None,
+        **options: Any,
+    ) -> "StreamingWriter":
+        """
+        Create a writer, which streams rows into this table.
+        project and dataset override the ones of the table, the options are
+        passed to StreamingWriter.
+        """
+        # pylint: disable=import-outside-toplevel
+        from bq_schema.streaming_writer import StreamingWriter
+
+        project = project or self.project
+        assert project, "Project has not been set."
+        dataset = dataset or self.dataset
+        assert dataset, "Dataset has not been set."
+        return StreamingWriter(
+            client,
+            f"{project}.{dataset}.{self.full_table_name()}",
+            self.get_schema_fields(),
+            **options,
+        )
+
+
+def _standard_type(field_type: Any) -> Optional[BigQueryTypes]:
+    """
+    Look up a type of a schema field, which might use a legacy name.
+    """
+    return BigQueryTypes.__members__.get(getattr(field_type, "name", field_type))
@@ -1,9 +1,7 @@
 import argparse
+import sys
 from argparse import Namespace
 
-from bq_schema.cli.bigquery_connection import create_connection
-from bq_schema.schema_converter import schema_to_dataclass
-
 
 def parse_args() -> Namespace:
     parser = argparse.ArgumentParser(
@@ -14,20 +12,42 @@ def parse_args() -> Namespace:
     parser.add_argument(
         "--table-name", required=True, help="Target bigquery table_name"
     )
+    parser.add_argument(
+        "--slots",
+        action="store_true",
+        help="Generate dataclasses with slots, which use less memory (python 3.10+).",
+    )
+    parser.add_argument(
+        "--frozen", action="store_true", help="Generate immutable dataclasses."
+    )
+
+    args = parser.parse_args()
+    if args.slots and sys.version_info < (3, 10):
+        parser.error("--slots requires python 3.10 or newer.")
+    return args
 
-    return parser.parse_args()
 
+def main(
+    project: str,
+    dataset: str,
+    table_name: str,
+    slots: bool = False,
+    frozen: bool = False,
+) -> None:
+    # The bigquery client is slow to import, load it after parsing the arguments.
+    # pylint: disable=import-outside-toplevel
+    from bq_schema.cli.bigquery_connection import create_connection
+    from bq_schema.schema_converter import schema_to_dataclass
 
-def main(project: str, dataset: str, table_name: str) -> None:
     client = create_connection()
     table = client.get_table(f"{project}.{dataset}.{table_name}")
     print("from dataclasses import dataclass")
-    print(schema_to_dataclass(table_name, table.schema))
+    print(schema_to_dataclass(table_name, table.schema, slots=slots, frozen=frozen))
 
 
 def cli() -> None:
     args = parse_args()
-    main(args.project, args.dataset, args.table_name)
+    main(args.project, args.dataset, args.table_name, args.slots, args.frozen)
 
 
 if __name__ == "__main__":
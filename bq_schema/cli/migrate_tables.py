@@ -3,18 +3,6 @@ from argparse import Namespace
 from pprint import pprint
 from typing import Optional
 
-from google.api_core.exceptions import NotFound
-from google.cloud.bigquery.table import Table
-
-from bq_schema.cli.bigquery_connection import create_connection
-from bq_schema.migration.schema_diff import (
-    apply_schema_differences,
-    confirm_apply_schema_differences,
-    find_schema_differences,
-    print_format_schema_differences,
-)
-from bq_schema.migration.table_finder import find_tables
-
 
 def parse_args() -> Namespace:
     parser = argparse.ArgumentParser(
@@ -46,6 +34,34 @@ def parse_args() -> Namespace:
         help="If set to true, tables which are abstract (inheriting from ABC will be ignored during table finding",
         required=False,
     )
+    parser.add_argument(
+        "--static-discovery",
+        default=False,
+        action="store_true",
+        help="If set to true, tables are found by parsing the source code and only modules defining tables are imported.",
+    )
+    parser.add_argument(
+        "--discovery-manifest",
+        required=False,
+        help="File to cache the parsed modules in between runs. Implies --static-discovery.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        default=8,
+        type=int,
+        help="Number of tables, which are fetched from or changed in bigquery in parallel.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        required=False,
+        help="Directory to cache the metadata of remote tables in between runs.",
+    )
+    parser.add_argument(
+        "--cache-max-age",
+        default=3600,
+        type=float,
+        help="Seconds until a cached remote table is fetched again.",
+    )
 
     return parser.parse_args()
 
@@ -57,8 +73,27 @@ def main(
     apply: bool,
     validate: bool,
     ignore_abstract: bool,
+    concurrency: int = 8,
+    cache_dir: Optional[str] = None,
+    cache_max_age: float = 3600,
+    static_discovery: bool = False,
+    discovery_manifest: Optional[str] = None,
 ) -> None:
+    # The bigquery client is slow to import, load it after parsing the arguments.
+    # pylint: disable=import-outside-toplevel
+    from bq_schema.cli.bigquery_connection import create_connection
+    from bq_schema.migration.models import ApplyStatus
+    from bq_schema.migration.schema_diff import (
+        apply_schema_differences,
+        confirm_apply_schema_differences,
+        find_schema_differences,
+        print_format_apply_results,
+        print_format_schema_differences,
+    )
+    from bq_schema.migration.table_cache import TableCache
+
     bigquery_client = create_connection()
+    table_cache = TableCache(cache_dir, max_age=cache_max_age) if cache_dir else None
 
     print("Finding schema differences...")
     schema_diffs = find_schema_differences(
@@ -67,6 +102,10 @@ def main(
         global_project=project,
         global_dataset=dataset,
         ignore_abstract=ignore_abstract,
+        concurrency=concurrency,
+        table_cache=table_cache,
+        static=static_discovery,
+        manifest_path=discovery_manifest,
     )
     formated_schema_diff = print_format_schema_differences(schema_diffs=schema_diffs)
     if formated_schema_diff:
@@ -79,9 +118,21 @@ def main(
 
     if apply:
         if confirm_apply_schema_differences():
-            apply_schema_differences(
-                schema_diffs=schema_diffs, bigquery_client=bigquery_client
+            print("Applying changes...")
+            apply_results = apply_schema_differences(
+                schema_diffs=schema_diffs,
+                bigquery_client=bigquery_client,
+                concurrency=concurrency,
+                table_cache=table_cache,
             )
+            pprint(print_format_apply_results(apply_results))
+            failed_tables = [
+                table_identifier
+                for table_identifier, apply_result in apply_results.items()
+                if apply_result.status == ApplyStatus.FAILED
+            ]
+            if failed_tables:
+                raise Exception(f"Failed to apply changes to {failed_tables}")
 
 
 def cli() -> None:
@@ -93,6 +144,11 @@ def cli() -> None:
         args.apply,
         args.validate,
         args.ignore_abstract,
+        args.concurrency,
+        args.cache_dir,
+        args.cache_max_age,
+        args.static_discovery,
+        args.discovery_manifest,
     )
 
 
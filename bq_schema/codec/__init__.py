@@ -0,0 +1,3 @@
+"""
+Serializers and deserializers, which are compiled once per dataclass schema.
+"""
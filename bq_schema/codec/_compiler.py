@@ -0,0 +1,16 @@
+from typing import Any, Callable, Dict, List
+
+
+def create_function(
+    name: str, args: str, body: List[str], namespace: Dict[str, Any]
+) -> Callable:
+    """
+    Compile the source of a function and return it.
+
+    Every name the body refers to has to be part of the namespace.
+    """
+    lines = "\n".join(f"    {line}" for line in body)
+    source = f"def {name}({args}):\n{lines}\n"
+    local_namespace: Dict[str, Any] = {}
+    exec(source, namespace, local_namespace)  # pylint: disable=exec-used
+    return local_namespace[name]
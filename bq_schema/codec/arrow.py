@@ -0,0 +1,318 @@
+"""
+Convert between pyarrow record batches and dataclass instances, column by column.
+
+Requires the optional pyarrow dependency: pip install bq-schema[arrow]
+"""
+from dataclasses import MISSING, Field, is_dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Type
+
+import pyarrow as pa
+from google.cloud.bigquery import SchemaField
+
+from bq_schema._caches import register_cache
+from bq_schema.dataclass_converter import dataclass_to_schema
+from bq_schema.types import BigQueryFieldModes, BigQueryTypes
+from bq_schema.types.type_parser import parse_field_type, resolve_dataclass_fields
+
+from ._compiler import create_function
+
+ArrowDecoder = Callable[[pa.RecordBatch], List[Any]]
+_ArrayDecoder = Callable[[pa.Array], List[Any]]
+_StructDecoder = Callable[[Dict[str, pa.Array], int], List[Any]]
+
+_ARROW_TYPE_CHECKS: Dict[BigQueryTypes, Callable[[pa.DataType], bool]] = {
+    BigQueryTypes.STRING: lambda t: pa.types.is_string(t)
+    or pa.types.is_large_string(t),
+    BigQueryTypes.BYTES: lambda t: pa.types.is_binary(t)
+    or pa.types.is_large_binary(t)
+    or pa.types.is_fixed_size_binary(t),
+    BigQueryTypes.INT64: pa.types.is_integer,
+    BigQueryTypes.FLOAT64: pa.types.is_floating,
+    BigQueryTypes.NUMERIC: pa.types.is_decimal,
+    BigQueryTypes.BOOL: pa.types.is_boolean,
+    BigQueryTypes.TIMESTAMP: pa.types.is_timestamp,
+    BigQueryTypes.DATE: pa.types.is_date,
+    BigQueryTypes.TIME: pa.types.is_time,
+    BigQueryTypes.DATETIME: pa.types.is_timestamp,
+    BigQueryTypes.GEOGRAPHY: lambda t: pa.types.is_string(t)
+    or pa.types.is_large_string(t),
+    BigQueryTypes.STRUCT: pa.types.is_struct,
+}
+
+# The same types google.cloud.bigquery uses, when it downloads query results.
+ArrowTypeMapping: Dict[BigQueryTypes, pa.DataType] = {
+    BigQueryTypes.STRING: pa.string(),
+    BigQueryTypes.BYTES: pa.binary(),
+    BigQueryTypes.INT64: pa.int64(),
+    BigQueryTypes.FLOAT64: pa.float64(),
+    BigQueryTypes.NUMERIC: pa.decimal128(38, 9),
+    BigQueryTypes.BOOL: pa.bool_(),
+    BigQueryTypes.TIMESTAMP: pa.timestamp("us", tz="UTC"),
+    BigQueryTypes.DATE: pa.date32(),
+    BigQueryTypes.TIME: pa.time64("us"),
+    BigQueryTypes.DATETIME: pa.timestamp("us"),
+    BigQueryTypes.GEOGRAPHY: pa.string(),
+}
+# Distinguishes GEOGRAPHY from STRING columns, like google.cloud.bigquery does.
+_GEOGRAPHY_METADATA = {
+    b"ARROW:extension:name": b"google:sqlType:geography",
+    b"ARROW:extension:metadata": b'{"encoding": "WKT"}',
+}
+
+_DECODERS: Dict[Type, ArrowDecoder] = register_cache({})
+
+
+def dataclass_to_arrow_schema(
+    dataclass: Type, localns: Optional[dict] = None
+) -> pa.Schema:
+    """
+    Transform a dataclass into an arrow schema, matching dataclass_to_schema.
+    """
+    return schema_to_arrow_schema(dataclass_to_schema(dataclass, localns=localns))
+
+
+def schema_to_arrow_schema(schema_fields: Sequence[SchemaField]) -> pa.Schema:
+    """
+    Transform a list of SchemaField into an arrow schema.
+    """
+    return pa.schema([_schema_field_to_arrow_field(field) for field in schema_fields])
+
+
+def arrow_schema_to_schema(arrow_fields: Sequence[pa.Field]) -> List[SchemaField]:
+    """
+    Transform an arrow schema, created by schema_to_arrow_schema, back into a
+    list of SchemaField.
+    """
+    return [_arrow_field_to_schema_field(field) for field in arrow_fields]
+
+
+def _schema_field_to_arrow_field(schema_field: SchemaField) -> pa.Field:
+    field_type = BigQueryTypes[schema_field.field_type]
+    if field_type == BigQueryTypes.STRUCT:
+        arrow_type = pa.struct(
+            [_schema_field_to_arrow_field(field) for field in schema_field.fields]
+        )
+    else:
+        arrow_type = ArrowTypeMapping[field_type]
+
+    metadata = _GEOGRAPHY_METADATA if field_type == BigQueryTypes.GEOGRAPHY else None
+    mode = BigQueryFieldModes[schema_field.mode.upper()]
+    if mode == BigQueryFieldModes.REPEATED:
+        item = pa.field("item", arrow_type, nullable=False, metadata=metadata)
+        return pa.field(schema_field.name, pa.list_(item), nullable=False)
+
+    return pa.field(
+        schema_field.name,
+        arrow_type,
+        nullable=mode == BigQueryFieldModes.NULLABLE,
+        metadata=metadata,
+    )
+
+
+def _arrow_field_to_schema_field(arrow_field: pa.Field) -> SchemaField:
+    mode = (
+        BigQueryFieldModes.NULLABLE
+        if arrow_field.nullable
+        else BigQueryFieldModes.REQUIRED
+    )
+    if pa.types.is_list(arrow_field.type) or pa.types.is_large_list(arrow_field.type):
+        mode = BigQueryFieldModes.REPEATED
+        arrow_field = arrow_field.type.value_field.with_name(arrow_field.name)
+
+    if pa.types.is_struct(arrow_field.type):
+        return SchemaField(
+            name=arrow_field.name,
+            field_type=BigQueryTypes.STRUCT,
+            mode=mode,
+            fields=arrow_schema_to_schema(list(arrow_field.type)),
+        )
+
+    field_type: Optional[BigQueryTypes] = None
+    if arrow_field.metadata == _GEOGRAPHY_METADATA:
+        field_type = BigQueryTypes.GEOGRAPHY
+    else:
+        field_type = next(
+            (
+                bq_type
+                for bq_type, arrow_type in ArrowTypeMapping.items()
+                if arrow_type == arrow_field.type
+            ),
+            None,
+        )
+    if field_type is None:
+        raise TypeError(f"Unsupported type: {arrow_field.type}.")
+
+    return SchemaField(name=arrow_field.name, field_type=field_type, mode=mode)
+
+
+def compile_arrow_decoder(dataclass: Type) -> ArrowDecoder:
+    """
+    Create a function, which converts a record batch into dataclass instances.
+
+    Every column is converted at once and nested structs and repeated fields
+    are built from their child arrays, without creating a dict per row.
+    The schema of a record batch is checked against dataclass_to_schema.
+    """
+    decoder = _DECODERS.get(dataclass)
+    if decoder is None:
+        decoder = _DECODERS[dataclass] = _compile_arrow_decoder(dataclass)
+    return decoder
+
+
+def check_arrow_schema(
+    schema_fields: Sequence[SchemaField], arrow_fields: Sequence[pa.Field]
+) -> None:
+    """
+    Raise a TypeError, if an arrow field does not match its bigquery schema field.
+
+    Arrow fields without a matching schema field are ignored. Columns of the null
+    type, which pyarrow infers for columns without values, match optional fields.
+    """
+    arrow_fields_by_name = {
+        arrow_field.name: arrow_field for arrow_field in arrow_fields
+    }
+    for schema_field in schema_fields:
+        arrow_field = arrow_fields_by_name.get(schema_field.name)
+        if arrow_field is None:
+            continue
+
+        arrow_type = arrow_field.type
+        if pa.types.is_null(arrow_type):
+            if schema_field.mode == BigQueryFieldModes.REQUIRED:
+                raise TypeError(f"{arrow_field} does not match {schema_field}.")
+            continue
+
+        if schema_field.mode == BigQueryFieldModes.REPEATED:
+            if not (pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type)):
+                raise TypeError(f"{arrow_field} does not match {schema_field}.")
+            arrow_type = arrow_type.value_type
+
+        if not _ARROW_TYPE_CHECKS[BigQueryTypes[schema_field.field_type]](arrow_type):
+            raise TypeError(f"{arrow_field} does not match {schema_field}.")
+
+        if pa.types.is_struct(arrow_type):
+            check_arrow_schema(schema_field.fields, list(arrow_type))
+
+
+def _compile_arrow_decoder(dataclass: Type) -> ArrowDecoder:
+    schema_fields = dataclass_to_schema(dataclass)
+    decode_struct = _compile_struct_decoder(dataclass)
+    checked_schema: Optional[pa.Schema] = None
+
+    def decode(record_batch: pa.RecordBatch) -> List[Any]:
+        nonlocal checked_schema
+        if checked_schema is None or not checked_schema.equals(record_batch.schema):
+            check_arrow_schema(schema_fields, list(record_batch.schema))
+            checked_schema = record_batch.schema
+
+        columns = dict(zip(record_batch.schema.names, record_batch.columns))
+        return decode_struct(columns, record_batch.num_rows)
+
+    return decode
+
+
+def _compile_struct_decoder(dataclass: Type) -> _StructDecoder:
+    if not is_dataclass(dataclass):
+        raise TypeError("Not a dataclass.")
+
+    field_decoders = []
+    for field in resolve_dataclass_fields(dataclass):
+        if not field.init:
+            continue
+
+        mode, field_type = parse_field_type(field.type)
+        decoder = (
+            _compile_struct_array_decoder(field_type)
+            if is_dataclass(field_type)
+            else _to_pylist
+        )
+        if mode == BigQueryFieldModes.REPEATED:
+            decoder = _compile_list_array_decoder(decoder)
+        field_decoders.append((field, mode, decoder))
+
+    # Pass the values by name, so kw_only fields are supported.
+    construct = create_function(
+        f"construct_{dataclass.__name__}",
+        ", ".join(f"value_{index}" for index in range(len(field_decoders))),
+        [
+            "return _dataclass(",
+            *(
+                f"    {field.name}=value_{index},"
+                for index, (field, _, _) in enumerate(field_decoders)
+            ),
+            ")",
+        ],
+        {"_dataclass": dataclass},
+    )
+
+    def decode(columns: Dict[str, pa.Array], length: int) -> List[Any]:
+        values = [
+            _decode_column(columns.get(field.name), field, mode, decoder, length)
+            for field, mode, decoder in field_decoders
+        ]
+        if not values:
+            return [dataclass() for _ in range(length)]
+        return list(map(construct, *values))
+
+    return decode
+
+
+def _decode_column(
+    column: Optional[pa.Array],
+    field: Field,
+    mode: BigQueryFieldModes,
+    decoder: _ArrayDecoder,
+    length: int,
+) -> List[Any]:
+    if column is not None:
+        if pa.types.is_null(column.type):
+            if mode == BigQueryFieldModes.REPEATED:
+                return [[] for _ in range(length)]
+            return [None] * length
+        return decoder(column)
+    if field.default_factory is not MISSING:  # type: ignore
+        return [field.default_factory() for _ in range(length)]  # type: ignore
+    if field.default is not MISSING:
+        return [field.default] * length
+    if mode == BigQueryFieldModes.NULLABLE:
+        return [None] * length
+    raise KeyError(f"Missing column {field.name}.")
+
+
+def _compile_struct_array_decoder(dataclass: Type) -> _ArrayDecoder:
+    decode_struct = _compile_struct_decoder(dataclass)
+
+    def decode(array: pa.Array) -> List[Any]:
+        names = [array.type.field(i).name for i in range(array.type.num_fields)]
+        instances = decode_struct(dict(zip(names, array.flatten())), len(array))
+        if array.null_count:
+            return [
+                instance if is_valid else None
+                for instance, is_valid in zip(instances, array.is_valid().to_pylist())
+            ]
+        return instances
+
+    return decode
+
+
+def _compile_list_array_decoder(decode_values: _ArrayDecoder) -> _ArrayDecoder:
+    def decode(array: pa.Array) -> List[Any]:
+        offsets = array.offsets.to_pylist()
+        start = offsets[0]
+        values = decode_values(array.values.slice(start, offsets[-1] - start))
+        lists = [
+            values[begin - start : end - start]
+            for begin, end in zip(offsets, offsets[1:])
+        ]
+        if array.null_count:
+            return [
+                values if is_valid else []
+                for values, is_valid in zip(lists, array.is_valid().to_pylist())
+            ]
+        return lists
+
+    return decode
+
+
+def _to_pylist(array: pa.Array) -> List[Any]:
+    return array.to_pylist()
@@ -0,0 +1,245 @@
+"""
+Write dataclass instances into parquet or arrow ipc files.
+
+Requires the optional pyarrow dependency: pip install bq-schema[arrow]
+"""
+import os
+from dataclasses import is_dataclass
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from enum import Enum
+from types import TracebackType
+from typing import Any, Callable, Generic, Iterable, List, Optional, Type, TypeVar
+
+import pyarrow as pa
+import pyarrow.ipc
+import pyarrow.parquet
+
+from bq_schema.types import BigQueryFieldModes, BigQueryTypes, PythonTypeMapping
+from bq_schema.types.type_parser import parse_field_type, resolve_dataclass_fields
+
+from .arrow import dataclass_to_arrow_schema
+
+T = TypeVar("T")  # pylint: disable=invalid-name
+
+_ArrayBuilder = Callable[[List[Any]], pa.Array]
+
+# Marks the values of fields, whose parent struct is null. Parquet does not allow
+# nulls in required fields, even if the parent is null, so placeholders are used.
+_ABSENT = object()
+_PLACEHOLDERS = {
+    BigQueryTypes.STRING: "",
+    BigQueryTypes.BYTES: b"",
+    BigQueryTypes.INT64: 0,
+    BigQueryTypes.FLOAT64: 0.0,
+    BigQueryTypes.NUMERIC: Decimal(0),
+    BigQueryTypes.BOOL: False,
+    BigQueryTypes.TIMESTAMP: datetime(1970, 1, 1, tzinfo=timezone.utc),
+    BigQueryTypes.DATE: date(1970, 1, 1),
+    BigQueryTypes.TIME: time(),
+    BigQueryTypes.DATETIME: datetime(1970, 1, 1),
+    BigQueryTypes.GEOGRAPHY: "",
+}
+
+
+class ArrowFileFormat(str, Enum):
+    PARQUET = "parquet"
+    IPC = "arrow"
+
+
+class ArrowBatchWriter(Generic[T]):
+    """
+    Buffer dataclass instances and write them as record batches into files.
+
+    Once a file has reached max_file_bytes, the next batch starts a new file.
+    Parquet files can be passed to Client.load_table_from_file with
+    SourceFormat.PARQUET. Tables with REPEATED fields need parquet list
+    inference enabled on the load job, otherwise they are loaded as records
+    with a list.element field:
+
+    parquet_options = ParquetOptions()
+    parquet_options.enable_list_inference = True
+    job_config = LoadJobConfig(source_format=SourceFormat.PARQUET)
+    job_config.parquet_options = parquet_options
+
+    with ArrowBatchWriter(Schema, "/tmp/export") as writer:
+        writer.extend(instances)
+    for path in writer.files:
+        ...
+
+    If the with block raises, the buffered instances are dropped and the file,
+    which is being written, is deleted. Completed files are kept in files.
+    """
+
+    # pylint: disable=too-many-arguments,too-many-instance-attributes
+    def __init__(
+        self,
+        schema: Type[T],
+        directory: str,
+        file_format: ArrowFileFormat = ArrowFileFormat.PARQUET,
+        batch_size: int = 10_000,
+        max_file_bytes: int = 256 * 1024 * 1024,
+        file_prefix: str = "part",
+    ):
+        if batch_size < 1:
+            raise ValueError("The batch size has to be at least 1.")
+
+        self.arrow_schema = dataclass_to_arrow_schema(schema)
+        self._build_columns = _compile_columns_builder(schema, self.arrow_schema)
+        self._directory = directory
+        self._file_format = ArrowFileFormat(file_format)
+        self._batch_size = batch_size
+        self._max_file_bytes = max_file_bytes
+        self._file_prefix = file_prefix
+        self._buffer: List[T] = []
+        self._sink: Optional[pa.OSFile] = None
+        self._writer: Any = None
+        self.files: List[str] = []
+
+    def append(self, instance: T) -> None:
+        self._buffer.append(instance)
+        if len(self._buffer) >= self._batch_size:
+            self.flush()
+
+    def extend(self, instances: Iterable[T]) -> None:
+        for instance in instances:
+            self.append(instance)
+
+    def flush(self) -> None:
+        """
+        Write all buffered instances as one record batch.
+        """
+        if not self._buffer:
+            return
+
+        record_batch = pa.RecordBatch.from_arrays(
+            self._build_columns(self._buffer), schema=self.arrow_schema
+        )
+        self._buffer = []
+        if self._writer is None:
+            self._open_file()
+        self._writer.write_batch(record_batch)
+        if self._sink is not None and self._sink.tell() >= self._max_file_bytes:
+            self._close_file()
+
+    def close(self) -> List[str]:
+        """
+        Write the remaining instances and return the paths of all written files.
+        """
+        self.flush()
+        self._close_file()
+        return self.files
+
+    def __enter__(self) -> "ArrowBatchWriter[T]":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._discard_file()
+
+    def _open_file(self) -> None:
+        path = os.path.join(
+            self._directory,
+            f"{self._file_prefix}-{len(self.files):05d}.{self._file_format.value}",
+        )
+        self._sink = pa.OSFile(path, "wb")
+        if self._file_format == ArrowFileFormat.PARQUET:
+            self._writer = pyarrow.parquet.ParquetWriter(self._sink, self.arrow_schema)
+        else:
+            self._writer = pyarrow.ipc.new_file(self._sink, self.arrow_schema)
+        self.files.append(path)
+
+    def _discard_file(self) -> None:
+        self._buffer = []
+        if self._writer is not None:
+            self._close_file()
+            os.remove(self.files.pop())
+
+    def _close_file(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+
+def _compile_columns_builder(
+    dataclass: Type, arrow_schema: pa.Schema
+) -> Callable[[List[Any]], List[pa.Array]]:
+    build_struct = _compile_struct_builder(dataclass, pa.struct(list(arrow_schema)))
+
+    def build(instances: List[Any]) -> List[pa.Array]:
+        return build_struct(instances).flatten()
+
+    return build
+
+
+def _compile_struct_builder(dataclass: Type, arrow_type: pa.DataType) -> _ArrayBuilder:
+    children = []
+    for field, arrow_field in zip(resolve_dataclass_fields(dataclass), arrow_type):
+        mode, field_type = parse_field_type(field.type)
+        if mode == BigQueryFieldModes.REPEATED:
+            builder = _compile_list_builder(field_type, arrow_field.type)
+        else:
+            builder = _compile_array_builder(field_type, arrow_field.type)
+        children.append((field.name, builder))
+
+    def build(instances: List[Any]) -> pa.Array:
+        mask = [instance is None for instance in instances]
+        arrays = [
+            builder(
+                [
+                    _ABSENT
+                    if instance is None or instance is _ABSENT
+                    else getattr(instance, name)
+                    for instance in instances
+                ]
+            )
+            for name, builder in children
+        ]
+        return pa.StructArray.from_arrays(
+            arrays,
+            fields=list(arrow_type),
+            mask=pa.array(mask, pa.bool_()) if any(mask) else None,
+        )
+
+    return build
+
+
+def _compile_list_builder(field_type: Type, arrow_type: pa.DataType) -> _ArrayBuilder:
+    build_values = _compile_array_builder(field_type, arrow_type.value_type)
+
+    def build(lists: List[Any]) -> pa.Array:
+        offsets = [0]
+        values: List[Any] = []
+        for items in lists:
+            if items and items is not _ABSENT:
+                values.extend(items)
+            offsets.append(len(values))
+        return pa.ListArray.from_arrays(
+            pa.array(offsets, pa.int32()), build_values(values), type=arrow_type
+        )
+
+    return build
+
+
+def _compile_array_builder(field_type: Type, arrow_type: pa.DataType) -> _ArrayBuilder:
+    if is_dataclass(field_type):
+        return _compile_struct_builder(field_type, arrow_type)
+
+    placeholder = _PLACEHOLDERS[PythonTypeMapping[field_type]]
+
+    def build(values: List[Any]) -> pa.Array:
+        if any(value is _ABSENT for value in values):
+            values = [placeholder if value is _ABSENT else value for value in values]
+        return pa.array(values, type=arrow_type)
+
+    return build
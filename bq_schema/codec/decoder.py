@@ -0,0 +1,116 @@
+"""
+Compile a dataclass into a function, which deserializes rows into instances.
+"""
+from dataclasses import MISSING, Field, is_dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from bq_schema._caches import register_cache
+from bq_schema.types import BigQueryFieldModes
+from bq_schema.types.type_parser import parse_field_type, resolve_dataclass_fields
+
+from ._compiler import create_function
+
+Decoder = Callable[[Any], Any]
+
+_DECODERS: Dict[Type, Decoder] = register_cache({})
+
+
+def compile_decoder(dataclass: Type) -> Decoder:
+    """
+    Create a function, which converts a row into an instance of the dataclass.
+
+    A row can be a google.cloud.bigquery.table.Row or a dict. Missing values are
+    replaced by the default of the field or None for optional fields, otherwise
+    a KeyError is raised. Fields with init=False are not read from the row.
+    """
+    decoder = _DECODERS.get(dataclass)
+    if decoder is None:
+        decoder = _DECODERS[dataclass] = _compile_decoder(dataclass)
+    return decoder
+
+
+def _compile_decoder(dataclass: Type) -> Decoder:
+    if not is_dataclass(dataclass):
+        raise TypeError("Not a dataclass.")
+
+    namespace: Dict[str, Any] = {"_dataclass": dataclass}
+    arguments = decoder_arguments(dataclass, namespace, compile_decoder)
+    return create_function(
+        f"decode_{dataclass.__name__}",
+        "row",
+        [
+            "return _dataclass(",
+            *(f"    {name}={argument}," for name, argument in arguments),
+            ")",
+        ],
+        namespace,
+    )
+
+
+def decoder_arguments(
+    dataclass: Type,
+    namespace: Dict[str, Any],
+    compile_nested: Callable[[Type], Decoder],
+) -> List[Tuple[str, str]]:
+    """
+    Return the name and an expression per init field, which reads its value
+    from the row. Nested dataclasses are decoded with the decoder of
+    compile_nested, values of other types are passed as they are.
+    """
+    namespace.update({"_MISSING": MISSING, "_optional": _optional})
+    arguments: List[Tuple[str, str]] = []
+    for field in resolve_dataclass_fields(dataclass):
+        if not field.init:
+            continue
+
+        mode, field_type = parse_field_type(field.type)
+        decoder: Optional[Decoder] = None
+        if is_dataclass(field_type):
+            decoder = compile_nested(field_type)
+
+        if field.default is not MISSING or field.default_factory is not MISSING:
+            default_name = f"_default_{field.name}"
+            namespace[default_name] = _with_default(field, mode, decoder)
+            arguments.append(
+                (field.name, f"{default_name}(row.get({field.name!r}, _MISSING))")
+            )
+            continue
+
+        if mode == BigQueryFieldModes.NULLABLE:
+            value = f"row.get({field.name!r})"
+        else:
+            value = f"row[{field.name!r}]"
+
+        if decoder is not None:
+            decoder_name = f"_decode_{field.name}"
+            namespace[decoder_name] = decoder
+            if mode == BigQueryFieldModes.REPEATED:
+                value = f"[{decoder_name}(item) for item in {value}]"
+            elif mode == BigQueryFieldModes.NULLABLE:
+                value = f"_optional({decoder_name}, {value})"
+            else:
+                value = f"{decoder_name}({value})"
+
+        arguments.append((field.name, value))
+    return arguments
+
+
+def _optional(decoder: Decoder, value: Any) -> Any:
+    return None if value is None else decoder(value)
+
+
+def _with_default(
+    field: Field, mode: BigQueryFieldModes, decoder: Optional[Decoder]
+) -> Decoder:
+    def decode(value: Any) -> Any:
+        if value is MISSING:
+            if field.default_factory is not MISSING:
+                return field.default_factory()  # type: ignore
+            return field.default
+        if decoder is None or value is None:
+            return value
+        if mode == BigQueryFieldModes.REPEATED:
+            return [decoder(item) for item in value]
+        return decoder(value)
+
+    return decode
@@ -0,0 +1,107 @@
+"""
+Compile a dataclass into a function, which serializes instances into rows.
+"""
+import copy
+from dataclasses import fields, is_dataclass
+from typing import Any, Callable, Dict, List, Type
+
+from bq_schema._caches import register_cache
+from bq_schema.types import BigQueryFieldModes, PythonTypeMapping
+from bq_schema.types.type_parser import parse_field_type, resolve_dataclass_fields
+
+from ._compiler import create_function
+
+Encoder = Callable[[Any], dict]
+
+_ENCODERS: Dict[Type, Encoder] = register_cache({})
+
+
+def compile_encoder(dataclass: Type) -> Encoder:
+    """
+    Create a function, which converts an instance of the dataclass into a dict.
+
+    The result is the same as dataclasses.asdict, but the fields, nested structs
+    and repeated fields are resolved only once per dataclass. Nested instances
+    are encoded by the encoder of their own type, so subclasses keep their extra
+    fields. Values of other types, e.g. dicts or unions, are copied like asdict
+    does.
+    """
+    encoder = _ENCODERS.get(dataclass)
+    if encoder is None:
+        encoder = _ENCODERS[dataclass] = _compile_encoder(dataclass)
+    return encoder
+
+
+def _encode_dataclass(value: Any) -> Any:
+    encoder = _ENCODERS.get(type(value))
+    if encoder is None:
+        return _encode_value(value)
+    return encoder(value)
+
+
+def _encode_value(value: Any) -> Any:
+    # The same recursion as dataclasses.asdict, for values without a known type.
+    if is_dataclass(value) and not isinstance(value, type):
+        return compile_encoder(type(value))(value)
+    if isinstance(value, tuple) and hasattr(value, "_fields"):
+        return type(value)(*[_encode_value(item) for item in value])
+    if isinstance(value, (list, tuple)):
+        return type(value)(_encode_value(item) for item in value)
+    if isinstance(value, dict):
+        return type(value)(
+            (_encode_value(key), _encode_value(item)) for key, item in value.items()
+        )
+    return copy.deepcopy(value)
+
+
+def _encode_field(field_type: Any, value: str) -> str:
+    try:
+        mode, field_type = parse_field_type(field_type)
+    except TypeError:
+        return f"_encode_value({value})"
+
+    if is_dataclass(field_type):
+        if mode == BigQueryFieldModes.REPEATED:
+            return f"[_encode_dataclass(item) for item in {value}]"
+        if mode == BigQueryFieldModes.NULLABLE:
+            return f"None if {value} is None else _encode_dataclass({value})"
+        return f"_encode_dataclass({value})"
+    if field_type in PythonTypeMapping:
+        if mode == BigQueryFieldModes.REPEATED:
+            return f"list({value})"
+        return value
+    return f"_encode_value({value})"
+
+
+def _compile_encoder(dataclass: Type) -> Encoder:
+    if not is_dataclass(dataclass):
+        raise TypeError("Not a dataclass.")
+
+    try:
+        field_types = {
+            field.name: field.type for field in resolve_dataclass_fields(dataclass)
+        }
+    except NameError:
+        # Annotations, which cannot be resolved, e.g. of classes defined in a
+        # function, are encoded without their types.
+        field_types = {}
+
+    namespace: Dict[str, Any] = {
+        "_encode_dataclass": _encode_dataclass,
+        "_encode_value": _encode_value,
+    }
+    items: List[str] = []
+    for field in fields(dataclass):
+        value = f"instance.{field.name}"
+        if field.name in field_types:
+            value = _encode_field(field_types[field.name], value)
+        else:
+            value = f"_encode_value({value})"
+        items.append(f"{field.name!r}: {value},")
+
+    return create_function(
+        f"encode_{dataclass.__name__}",
+        "instance",
+        ["return {", *(f"    {item}" for item in items), "}"],
+        namespace,
+    )
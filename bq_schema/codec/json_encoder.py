@@ -0,0 +1,168 @@
+"""
+Compile a dataclass into a function, which serializes instances into JSON rows,
+as expected by insert_rows_json and by load jobs of newline delimited JSON.
+
+orjson is used to dump rows, if it is installed: pip install bq-schema[json]
+"""
+import gzip
+import json
+import math
+from base64 import standard_b64encode
+from dataclasses import is_dataclass
+from datetime import datetime, timezone
+from typing import IO, Any, Callable, Dict, Iterable, List, Type, Union
+
+from bq_schema._caches import register_cache
+from bq_schema.types import BigQueryFieldModes, BigQueryTypes, PythonTypeMapping
+from bq_schema.types.type_parser import parse_field_type, resolve_dataclass_fields
+
+from ._compiler import create_function
+
+JsonEncoder = Callable[[Any], dict]
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode()
+
+
+try:
+    import orjson
+
+    dumps: Callable[[Any], bytes] = orjson.dumps
+except ImportError:
+    dumps = _json_dumps
+
+# An expression per type, which converts a value into a JSON value. {value} is
+# replaced by the converted variable. Other types are JSON values already.
+_CONVERSIONS: Dict[BigQueryTypes, str] = {
+    BigQueryTypes.BYTES: "_b64encode({value}).decode('ascii')",
+    BigQueryTypes.FLOAT64: "{value} if _isfinite({value}) else _non_finite({value})",
+    BigQueryTypes.NUMERIC: "str({value})",
+    BigQueryTypes.TIMESTAMP: "_timestamp_to_json({value})",
+    BigQueryTypes.DATE: "{value}.isoformat()",
+    BigQueryTypes.TIME: "{value}.isoformat()",
+    BigQueryTypes.DATETIME: "_datetime_to_json({value})",
+}
+
+_JSON_ENCODERS: Dict[Type, JsonEncoder] = register_cache({})
+
+
+def compile_json_encoder(dataclass: Type) -> JsonEncoder:
+    """
+    Create a function, which converts an instance of the dataclass into a dict
+    of JSON values.
+
+    BYTES are base64 encoded, TIMESTAMP values are converted to UTC and
+    NUMERIC, DATE, TIME and DATETIME values are formatted as strings.
+    """
+    encoder = _JSON_ENCODERS.get(dataclass)
+    if encoder is None:
+        encoder = _JSON_ENCODERS[dataclass] = _compile_json_encoder(dataclass)
+    return encoder
+
+
+def _compile_json_encoder(dataclass: Type) -> JsonEncoder:
+    if not is_dataclass(dataclass):
+        raise TypeError("Not a dataclass.")
+
+    namespace: Dict[str, Any] = {
+        "_b64encode": standard_b64encode,
+        "_isfinite": math.isfinite,
+        "_non_finite": _non_finite,
+        "_timestamp_to_json": _timestamp_to_json,
+        "_datetime_to_json": _datetime_to_json,
+    }
+    items: List[str] = []
+    for field in resolve_dataclass_fields(dataclass):
+        mode, field_type = parse_field_type(field.type)
+        value = f"instance.{field.name}"
+        if is_dataclass(field_type):
+            conversion = f"_encode_{field.name}({{value}})"
+            namespace[f"_encode_{field.name}"] = compile_json_encoder(field_type)
+        elif field_type in PythonTypeMapping:
+            conversion = _CONVERSIONS.get(PythonTypeMapping[field_type], "{value}")
+        else:
+            raise TypeError(f"Unsupported type: {field_type}.")
+
+        if mode == BigQueryFieldModes.REPEATED:
+            if conversion == "{value}":
+                value = f"list({value})"
+            else:
+                value = f"[{conversion.format(value='item')} for item in {value}]"
+        elif mode == BigQueryFieldModes.NULLABLE and conversion != "{value}":
+            value = f"None if {value} is None else ({conversion.format(value=value)})"
+        else:
+            value = conversion.format(value=value)
+
+        items.append(f"{field.name!r}: {value},")
+
+    return create_function(
+        f"encode_json_{dataclass.__name__}",
+        "instance",
+        ["return {", *(f"    {item}" for item in items), "}"],
+        namespace,
+    )
+
+
+def to_ndjson(instances: Iterable[Any]) -> bytes:
+    """
+    Serialize dataclass instances into newline delimited JSON.
+    """
+    return b"".join(
+        dumps(compile_json_encoder(type(instance))(instance)) + b"\n"
+        for instance in instances
+    )
+
+
+def write_ndjson(
+    instances: Iterable[Any],
+    file_obj: IO[bytes],
+    compress: bool = True,
+    compresslevel: int = 6,
+    chunk_size: int = 1000,
+) -> int:
+    """
+    Write dataclass instances as newline delimited JSON into a binary file,
+    gzip compressed by default, chunk_size rows at a time. The file is not
+    closed and can be passed to load_table_from_file. Return the number of rows.
+    """
+    rows = 0
+    output: Union[gzip.GzipFile, IO[bytes]] = (
+        gzip.GzipFile(fileobj=file_obj, mode="wb", compresslevel=compresslevel)
+        if compress
+        else file_obj
+    )
+    try:
+        chunk: List[bytes] = []
+        for instance in instances:
+            chunk.append(dumps(compile_json_encoder(type(instance))(instance)))
+            if len(chunk) == chunk_size:
+                output.write(b"\n".join(chunk) + b"\n")
+                rows += len(chunk)
+                chunk = []
+        if chunk:
+            output.write(b"\n".join(chunk) + b"\n")
+            rows += len(chunk)
+    finally:
+        if compress:
+            output.close()
+    return rows
+
+
+def _timestamp_to_json(value: datetime) -> str:
+    """
+    Format a timestamp in UTC, naive values are UTC already.
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value.isoformat(timespec="microseconds") + "Z"
+
+
+def _datetime_to_json(value: datetime) -> str:
+    return value.replace(tzinfo=None).isoformat(timespec="microseconds")
+
+
+def _non_finite(value: float) -> str:
+    if math.isnan(value):
+        return "NaN"
+    return "Infinity" if value > 0 else "-Infinity"
@@ -0,0 +1,199 @@
+"""
+Compile a dataclass into a function, which deserializes rows into instances,
+whose nested fields are decoded on first access.
+"""
+from dataclasses import MISSING, fields, is_dataclass
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+from bq_schema._caches import register_cache
+from bq_schema.types import BigQueryFieldModes
+from bq_schema.types.type_parser import parse_field_type, resolve_dataclass_fields
+
+from ._compiler import create_function
+from .decoder import Decoder, _optional, _with_default, compile_decoder
+
+_LAZY_DECODERS: Dict[Type, Decoder] = register_cache({})
+
+
+class _LazyField:
+    """
+    Decode the raw value of a nested field on first access and cache it in the
+    instance, which takes precedence over this non-data descriptor afterwards.
+    """
+
+    def __init__(self, name: str, decode: Decoder):
+        self._name = name
+        self._raw_name = _raw_name(name)
+        self._decode = decode
+
+    def __get__(self, instance: Any, owner: Type) -> Any:
+        if instance is None:
+            return self
+        instance_dict = instance.__dict__
+        # Another thread might have decoded the value in the meantime.
+        if self._name in instance_dict:
+            return instance_dict[self._name]
+        raw_value = instance_dict.get(self._raw_name, MISSING)
+        if raw_value is MISSING:
+            return instance_dict[self._name]
+
+        value = instance_dict.setdefault(self._name, self._decode(raw_value))
+        instance_dict.pop(self._raw_name, None)
+        return value
+
+
+def compile_lazy_decoder(dataclass: Type) -> Decoder:
+    """
+    Create a function, which converts a row into a lazy instance of the dataclass.
+
+    Scalar fields are set right away, STRUCT and REPEATED STRUCT fields are
+    decoded on first access and cached. The instances are of a subclass of the
+    dataclass, which compares equal to instances of the dataclass. Dataclasses
+    with a __post_init__ method are decoded eagerly, as it might read any field.
+    """
+    decoder = _LAZY_DECODERS.get(dataclass)
+    if decoder is None:
+        if not is_dataclass(dataclass):
+            raise TypeError("Not a dataclass.")
+        if hasattr(dataclass, "__post_init__"):
+            decoder = compile_decoder(dataclass)
+        else:
+            decoder = _compile_lazy_decoder(dataclass)
+        _LAZY_DECODERS[dataclass] = decoder
+    return decoder
+
+
+def _compile_lazy_decoder(dataclass: Type) -> Decoder:
+    lazy_fields: Dict[str, _LazyField] = {}
+    namespace: Dict[str, Any] = {"_MISSING": MISSING}
+    body: List[str] = []
+    slots = _slots(dataclass)
+    for field in resolve_dataclass_fields(dataclass):
+        mode, field_type = parse_field_type(field.type)
+        has_default = (
+            field.default is not MISSING or field.default_factory is not MISSING
+        )
+        if not field.init:
+            if has_default:
+                namespace[f"_default_{field.name}"] = _with_default(field, mode, None)
+                body.append(
+                    _assignment(field.name, f"_default_{field.name}(_MISSING)", slots)
+                )
+            continue
+
+        decoder = compile_lazy_decoder(field_type) if is_dataclass(field_type) else None
+
+        if has_default:
+            namespace[f"_default_{field.name}"] = _with_default(field, mode, decoder)
+            value = f"_default_{field.name}(row.get({field.name!r}, _MISSING))"
+        elif mode == BigQueryFieldModes.NULLABLE:
+            value = f"row.get({field.name!r})"
+        else:
+            value = f"row[{field.name!r}]"
+
+        if decoder is None or has_default:
+            body.append(_assignment(field.name, value, slots))
+        else:
+            lazy_fields[field.name] = _LazyField(
+                field.name, _nested_decoder(mode, decoder)
+            )
+            body.append(f"instance_dict[{_raw_name(field.name)!r}] = {value}")
+
+    namespace["_new"] = object.__new__
+    namespace["_lazy_class"] = _lazy_class(dataclass, lazy_fields)
+    namespace.update({f"_set_{name}": setter for name, setter in slots.items()})
+    return create_function(
+        f"decode_lazy_{dataclass.__name__}",
+        "row",
+        [
+            "instance = _new(_lazy_class)",
+            "instance_dict = instance.__dict__",
+            *body,
+            "return instance",
+        ],
+        namespace,
+    )
+
+
+def _assignment(name: str, value: str, slots: Dict[str, Callable]) -> str:
+    if name in slots:
+        return f"_set_{name}(instance, {value})"
+    return f"instance_dict[{name!r}] = {value}"
+
+
+def _nested_decoder(mode: BigQueryFieldModes, decoder: Decoder) -> Decoder:
+    if mode == BigQueryFieldModes.REPEATED:
+        return lambda value: [decoder(item) for item in value]
+    if mode == BigQueryFieldModes.NULLABLE:
+        return lambda value: _optional(decoder, value)
+    return decoder
+
+
+def _lazy_class(dataclass: Type, lazy_fields: Dict[str, _LazyField]) -> Type:
+    """
+    Create a subclass of the dataclass, which decodes lazy_fields on first access.
+    """
+    namespace: Dict[str, Any] = {
+        **lazy_fields,
+        "__module__": dataclass.__module__,
+        "__qualname__": dataclass.__qualname__,
+        "__hash__": dataclass.__hash__,
+        "__reduce__": _reduce,
+    }
+    if dataclass.__eq__ is not object.__eq__:
+        namespace["__eq__"] = _equal
+    return type(dataclass.__name__, (dataclass,), namespace)
+
+
+def _equal(self: Any, other: Any) -> bool:
+    """
+    Compare with instances of the dataclass as well.
+    """
+    dataclass = type(self).__bases__[0]
+    if type(other) is not dataclass and type(other) is not type(self):
+        return NotImplemented
+    return all(
+        getattr(self, field.name) == getattr(other, field.name)
+        for field in fields(dataclass)
+        if field.compare
+    )
+
+
+def _reduce(self: Any) -> Tuple[Callable, Tuple[Type, Dict[str, Any]]]:
+    """
+    Pickle and copy lazy instances as instances of the dataclass.
+    """
+    dataclass = type(self).__bases__[0]
+    return _restore, (
+        dataclass,
+        {
+            field.name: getattr(self, field.name)
+            for field in fields(dataclass)
+            if hasattr(self, field.name)
+        },
+    )
+
+
+def _restore(dataclass: Type, values: Dict[str, Any]) -> Any:
+    instance = object.__new__(dataclass)
+    for name, value in values.items():
+        object.__setattr__(instance, name, value)
+    return instance
+
+
+def _slots(dataclass: Type) -> Dict[str, Callable]:
+    """
+    Return the setters of the attributes, which are stored in slots instead of
+    the instance dict.
+    """
+    setters: Dict[str, Callable] = {}
+    for cls in reversed(dataclass.__mro__):
+        slots = cls.__dict__.get("__slots__", ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            if name not in ("__dict__", "__weakref__"):
+                setters[name] = cls.__dict__[name].__set__
+    return setters
+
+
+def _raw_name(name: str) -> str:
+    return f"_raw_{name}"
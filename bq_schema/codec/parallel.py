@@ -0,0 +1,168 @@
+"""
+Decode pages of rows in a pool of processes, to use more than one core.
+"""
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
+
+from google.cloud.bigquery import SchemaField
+from google.cloud.bigquery._helpers import _row_tuple_from_json
+from google.cloud.bigquery.table import Row
+
+from .decoder import Decoder, compile_decoder
+
+# How the rows of a page are sent to the workers: rows of the api response,
+# before they are converted, the values of google.cloud.bigquery.table.Row,
+# which cannot be pickled, or the rows as they are, e.g. dicts.
+_JSON = "json"
+_VALUES = "values"
+_ROWS = "rows"
+
+_Payload = Tuple[str, Optional[Dict[str, int]], List[Any]]
+
+# The state of a worker process, set once by _init_worker.
+_worker_decoder: Optional[Decoder] = None
+_worker_schema: List[SchemaField] = []
+_worker_field_to_index: Dict[str, int] = {}
+
+
+def parallel_decode(
+    dataclass: Type,
+    row_iterator: Any,
+    workers: Optional[int] = None,
+    ordered: bool = True,
+    max_pending_pages: Optional[int] = None,
+) -> Iterator[Any]:
+    """
+    Decode the pages of a RowIterator or any iterable of pages of rows into
+    dataclass instances in worker processes.
+
+    The dataclass and the schema of the RowIterator are sent to every worker
+    once, which compiles the decoder. Pages of a RowIterator are sent as the
+    raw rows of the api response, so the workers convert them as well. At most
+    max_pending_pages, by default two per worker, are decoded or waiting to be
+    consumed at a time.
+
+    With ordered, the instances are yielded in the order of the pages,
+    otherwise as soon as a page has been decoded. The dataclass has to be
+    importable by the workers.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending_pages = max_pending_pages or 2 * workers
+    if max_pending_pages < 1:
+        raise ValueError("At least one page has to be pending.")
+
+    schema = getattr(row_iterator, "schema", None)
+    pages = getattr(row_iterator, "pages", row_iterator)
+    payloads = (_page_payload(page, schema is not None) for page in pages)
+    executor = ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(dataclass, schema or []),
+    )
+    try:
+        if ordered:
+            yield from _decode_ordered(executor, payloads, max_pending_pages)
+        else:
+            yield from _decode_unordered(executor, payloads, max_pending_pages)
+    finally:
+        executor.shutdown()
+
+
+def _decode_ordered(
+    executor: ProcessPoolExecutor,
+    payloads: Iterable[_Payload],
+    max_pending_pages: int,
+) -> Iterator[Any]:
+    pending: Deque[Future] = deque()
+    try:
+        for payload in payloads:
+            if len(pending) >= max_pending_pages:
+                yield from pending.popleft().result()
+            pending.append(executor.submit(_decode_page, payload))
+
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        _cancel(pending)
+
+
+def _decode_unordered(
+    executor: ProcessPoolExecutor,
+    payloads: Iterable[_Payload],
+    max_pending_pages: int,
+) -> Iterator[Any]:
+    pending: Set[Future] = set()
+    try:
+        for payload in payloads:
+            if len(pending) >= max_pending_pages:
+                yield from _wait_for_page(pending)
+            pending.add(executor.submit(_decode_page, payload))
+
+        while pending:
+            yield from _wait_for_page(pending)
+    finally:
+        _cancel(pending)
+
+
+def _wait_for_page(pending: Set[Future]) -> Iterator[Any]:
+    """
+    Wait until at least one page has been decoded and yield its instances.
+    """
+    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+    for future in done:
+        pending.remove(future)
+        yield from future.result()
+
+
+def _cancel(pending: Iterable[Future]) -> None:
+    for future in pending:
+        future.cancel()
+
+
+def _page_payload(page: Iterable[Any], has_schema: bool) -> _Payload:
+    raw_page = getattr(page, "raw_page", None)
+    if has_schema and raw_page is not None:
+        return _JSON, None, raw_page.get("rows", [])
+
+    rows = list(page)
+    if rows and isinstance(rows[0], Row):
+        # pylint: disable=protected-access
+        return _VALUES, rows[0]._xxx_field_to_index, [row._xxx_values for row in rows]
+    return _ROWS, None, rows
+
+
+def _init_worker(dataclass: Type, schema: List[SchemaField]) -> None:
+    # pylint: disable=global-statement
+    global _worker_decoder, _worker_schema, _worker_field_to_index
+    _worker_decoder = compile_decoder(dataclass)
+    _worker_schema = schema
+    _worker_field_to_index = {field.name: i for i, field in enumerate(schema)}
+
+
+def _decode_page(payload: _Payload) -> List[Any]:
+    decoder = _worker_decoder
+    assert decoder is not None, "The worker has not been initialized."
+    kind, field_to_index, rows = payload
+    if kind == _JSON:
+        return [
+            decoder(
+                Row(_row_tuple_from_json(row, _worker_schema), _worker_field_to_index)
+            )
+            for row in rows
+        ]
+    if kind == _VALUES:
+        return [decoder(Row(values, field_to_index)) for values in rows]
+    return [decoder(row) for row in rows]
@@ -0,0 +1,175 @@
+"""
+Compile a dataclass into a NamedTuple with the same fields, a function, which
+deserializes rows into records, and a function, which converts records back
+into instances of the dataclass.
+"""
+from dataclasses import is_dataclass
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple, Type
+
+from bq_schema._caches import register_cache
+from bq_schema.types import BigQueryFieldModes
+from bq_schema.types.type_parser import parse_field_type, resolve_dataclass_fields
+
+from ._compiler import create_function
+from .decoder import Decoder, _optional, decoder_arguments
+
+RecordConverter = Callable[[Tuple], Any]
+
+_RECORD_TYPES: Dict[Type, Type[Tuple]] = register_cache({})
+_RECORD_DECODERS: Dict[Type, Decoder] = register_cache({})
+_RECORD_CONVERTERS: Dict[Type, RecordConverter] = register_cache({})
+
+
+def record_type(dataclass: Type) -> Type[Tuple]:
+    """
+    Return a NamedTuple named <dataclass>Record, with the init fields of the
+    dataclass in the same order and with the same annotations. Nested
+    dataclasses are annotated with their record types.
+
+    NamedTuple rejects field names starting with an underscore, which BigQuery
+    allows. Such dataclasses get a tuple subclass with the same fields instead.
+    """
+    record = _RECORD_TYPES.get(dataclass)
+    if record is None:
+        record = _RECORD_TYPES[dataclass] = _record_type(dataclass)
+    return record
+
+
+def compile_record_decoder(dataclass: Type) -> Decoder:
+    """
+    Create a function, which converts a row into a record of the dataclass.
+
+    Rows are read like compile_decoder does, nested STRUCT fields are decoded
+    into records as well. __post_init__ is not called.
+    """
+    decoder = _RECORD_DECODERS.get(dataclass)
+    if decoder is None:
+        decoder = _RECORD_DECODERS[dataclass] = _compile_record_decoder(dataclass)
+    return decoder
+
+
+def compile_record_converter(dataclass: Type) -> RecordConverter:
+    """
+    Create a function, which converts a record into an instance of the dataclass.
+    """
+    converter = _RECORD_CONVERTERS.get(dataclass)
+    if converter is None:
+        converter = _RECORD_CONVERTERS[dataclass] = _compile_record_converter(dataclass)
+    return converter
+
+
+def _record_type(dataclass: Type) -> Type[Tuple]:
+    if not is_dataclass(dataclass):
+        raise TypeError("Not a dataclass.")
+
+    annotations: List[Tuple[str, Any]] = []
+    for field in resolve_dataclass_fields(dataclass):
+        if not field.init:
+            continue
+        mode, field_type = parse_field_type(field.type)
+        annotation = field.type
+        if is_dataclass(field_type):
+            annotation = record_type(field_type)
+            if mode == BigQueryFieldModes.REPEATED:
+                annotation = List[annotation]  # type: ignore
+            elif mode == BigQueryFieldModes.NULLABLE:
+                annotation = Optional[annotation]
+        annotations.append((field.name, annotation))
+
+    name = f"{dataclass.__name__}Record"
+    if any(field_name.startswith("_") for field_name, _ in annotations):
+        record = _tuple_record_type(name, annotations)
+    else:
+        record = NamedTuple(name, annotations)  # type: ignore
+    record.__module__ = dataclass.__module__
+    return record
+
+
+def _tuple_record_type(name: str, annotations: List[Tuple[str, Any]]) -> Type[Tuple]:
+    fields = tuple(field_name for field_name, _ in annotations)
+    cls = _unused_name("_cls", fields)
+    tuple_new = _unused_name("_tuple_new", fields)
+    values = "".join(f"{field}, " for field in fields)
+    new = create_function(
+        "__new__",
+        ", ".join((cls, *fields)),
+        [f"return {tuple_new}({cls}, ({values}))"],
+        {tuple_new: tuple.__new__},
+    )
+
+    def __repr__(self: Tuple) -> str:
+        values = ", ".join(f"{field}={value!r}" for field, value in zip(fields, self))
+        return f"{name}({values})"
+
+    def __getnewargs__(self: Tuple) -> Tuple:
+        return tuple(self)
+
+    def _asdict(self: Tuple) -> Dict[str, Any]:
+        return dict(zip(fields, self))
+
+    namespace: Dict[str, Any] = {
+        "__slots__": (),
+        "__annotations__": dict(annotations),
+        "__new__": new,
+        "__repr__": __repr__,
+        "__getnewargs__": __getnewargs__,
+        "_asdict": _asdict,
+        "_fields": fields,
+    }
+    for index, field in enumerate(fields):
+        namespace[field] = property(itemgetter(index), doc=f"Alias for field {index}")
+    return type(name, (tuple,), namespace)
+
+
+def _unused_name(name: str, names: Tuple[str, ...]) -> str:
+    while name in names:
+        name = f"_{name}"
+    return name
+
+
+def _compile_record_decoder(dataclass: Type) -> Decoder:
+    namespace: Dict[str, Any] = {
+        "_new": tuple.__new__,
+        "_record": record_type(dataclass),
+    }
+    arguments = decoder_arguments(dataclass, namespace, compile_record_decoder)
+    return create_function(
+        f"decode_record_{dataclass.__name__}",
+        "row",
+        [
+            "return _new(_record, (",
+            *(f"    {argument}," for _, argument in arguments),
+            "))",
+        ],
+        namespace,
+    )
+
+
+def _compile_record_converter(dataclass: Type) -> RecordConverter:
+    if not is_dataclass(dataclass):
+        raise TypeError("Not a dataclass.")
+
+    namespace: Dict[str, Any] = {"_dataclass": dataclass, "_optional": _optional}
+    arguments: List[str] = []
+    init_fields = [field for field in resolve_dataclass_fields(dataclass) if field.init]
+    for index, field in enumerate(init_fields):
+        name = field.name
+        mode, field_type = parse_field_type(field.type)
+        value = f"record[{index}]"
+        if is_dataclass(field_type):
+            namespace[f"_convert_{name}"] = compile_record_converter(field_type)
+            if mode == BigQueryFieldModes.REPEATED:
+                value = f"[_convert_{name}(item) for item in {value}]"
+            elif mode == BigQueryFieldModes.NULLABLE:
+                value = f"_optional(_convert_{name}, {value})"
+            else:
+                value = f"_convert_{name}({value})"
+        arguments.append(f"{name}={value}")
+
+    return create_function(
+        f"convert_record_{dataclass.__name__}",
+        "record",
+        ["return _dataclass(", *(f"    {argument}," for argument in arguments), ")"],
+        namespace,
+    )
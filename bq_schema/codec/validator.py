@@ -0,0 +1,339 @@
+"""
+Compile a schema into a function, which validates rows before they are inserted.
+"""
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from bq_schema._caches import register_cache
+from bq_schema.dataclass_converter import dataclass_to_schema
+from bq_schema.types import BigQueryFieldModes, BigQueryTypes
+
+from ._compiler import create_function
+
+if TYPE_CHECKING:
+    from google.cloud.bigquery import SchemaField
+
+Validator = Callable[[Sequence[Any]], Dict[int, List[str]]]
+_StructValidator = Callable[[Any], Optional[List[str]]]
+
+_NUMERIC_PRECISION = 38
+_NUMERIC_SCALE = 9
+# The maximum size of a row in a streaming insert.
+_MAX_VALUE_BYTES = 10 * 1024 * 1024
+# Strings with fewer characters are below the limit, even if encoded in utf-8.
+_MAX_VALUE_CHARACTERS = _MAX_VALUE_BYTES // 4
+
+# A condition per type, which is true for invalid values. {value} is replaced
+# by the checked variable.
+_TYPE_CHECKS: Dict[BigQueryTypes, str] = {
+    BigQueryTypes.STRING: "not isinstance({value}, str)",
+    BigQueryTypes.BYTES: "not isinstance({value}, bytes)",
+    BigQueryTypes.INT64: "isinstance({value}, bool) or not isinstance({value}, int)",
+    BigQueryTypes.FLOAT64: (
+        "isinstance({value}, bool) or not isinstance({value}, (float, int))"
+    ),
+    BigQueryTypes.NUMERIC: (
+        "isinstance({value}, bool) or not isinstance({value}, (_Decimal, int))"
+    ),
+    BigQueryTypes.BOOL: "not isinstance({value}, bool)",
+    BigQueryTypes.TIMESTAMP: "not isinstance({value}, _datetime)",
+    BigQueryTypes.DATE: (
+        "isinstance({value}, _datetime) or not isinstance({value}, _date)"
+    ),
+    BigQueryTypes.TIME: "not isinstance({value}, _time)",
+    BigQueryTypes.DATETIME: "not isinstance({value}, _datetime)",
+    BigQueryTypes.GEOGRAPHY: "not isinstance({value}, str)",
+    BigQueryTypes.STRUCT: (
+        "not (isinstance({value}, dict) or hasattr({value}, '__dataclass_fields__'))"
+    ),
+}
+
+# The types of valid values, to check repeated values without a loop.
+_EXACT_TYPES: Dict[BigQueryTypes, frozenset] = {
+    BigQueryTypes.STRING: frozenset([str]),
+    BigQueryTypes.BYTES: frozenset([bytes]),
+    BigQueryTypes.INT64: frozenset([int]),
+    BigQueryTypes.FLOAT64: frozenset([float, int]),
+    BigQueryTypes.BOOL: frozenset([bool]),
+    BigQueryTypes.TIMESTAMP: frozenset([datetime]),
+    BigQueryTypes.DATE: frozenset([date]),
+    BigQueryTypes.TIME: frozenset([time]),
+    BigQueryTypes.DATETIME: frozenset([datetime]),
+    BigQueryTypes.GEOGRAPHY: frozenset([str]),
+}
+
+_VALIDATORS: Dict[Any, Validator] = register_cache({})
+
+
+def compile_validator(schema: Any) -> Validator:
+    """
+    Create a function, which validates a batch of rows against a schema.
+
+    The schema is a dataclass or a list of SchemaField. Rows are dataclass
+    instances or dicts, as passed to insert_rows. The function checks the modes,
+    the types, the range of NUMERIC values and the size of STRING and BYTES
+    values. It returns the errors by the index of the invalid rows, valid rows
+    are not part of the result.
+    """
+    key = schema if isinstance(schema, type) else tuple(schema)
+    validator = _VALIDATORS.get(key)
+    if validator is None:
+        fields = dataclass_to_schema(schema) if isinstance(schema, type) else schema
+        validator = _VALIDATORS[key] = _compile_validator(
+            _compile_struct("row", fields)
+        )
+    return validator
+
+
+def _compile_validator(validate_struct: _StructValidator) -> Validator:
+    return create_function(
+        "validate",
+        "rows",
+        [
+            "errors = {}",
+            "for index, row in enumerate(rows):",
+            "    row_errors = _validate_struct(row)",
+            "    if row_errors:",
+            "        errors[index] = row_errors",
+            "return errors",
+        ],
+        {"_validate_struct": validate_struct},
+    )
+
+
+def _compile_struct(name: str, fields: Sequence["SchemaField"]) -> _StructValidator:
+    """
+    Create a function, which returns the errors of a struct or None.
+    Structs are dicts or objects, e.g. dataclass instances.
+    """
+    namespace: Dict[str, Any] = {
+        "_Decimal": Decimal,
+        "_date": date,
+        "_datetime": datetime,
+        "_time": time,
+        "_error": _error,
+        "_errors": _errors,
+        "_type_error": _type_error,
+        "_numeric_error": _numeric_error,
+        **{
+            f"_types_{field_type.value}": types
+            for field_type, types in _EXACT_TYPES.items()
+        },
+        "_fields": frozenset(field.name for field in fields),
+    }
+    dict_body: List[str] = [
+        "if not _fields.issuperset(row):",
+        "    for field in sorted(row.keys() - _fields):",
+        "        errors = _error(errors, field + ': unknown field')",
+    ]
+    object_body: List[str] = []
+    for field in fields:
+        try:
+            field_type = BigQueryTypes[field.field_type.upper()]
+        except KeyError:
+            raise TypeError(f"Unsupported type: {field.field_type}.") from None
+
+        struct_name = None
+        if field_type == BigQueryTypes.STRUCT:
+            struct_name = f"_validate_{field.name}"
+            namespace[struct_name] = _compile_struct(field.name, field.fields)
+
+        dict_body.append(f"value = row.get({field.name!r})")
+        dict_body.extend(_field_lines(field, field_type, struct_name))
+        object_body.append(f"value = getattr(row, {field.name!r}, None)")
+        object_body.extend(_field_lines(field, field_type, struct_name))
+
+    return create_function(
+        f"validate_{name}",
+        "row",
+        [
+            "errors = None",
+            "if isinstance(row, dict):",
+            *(f"    {line}" for line in dict_body),
+            "else:",
+            *(f"    {line}" for line in object_body or ["pass"]),
+            "return errors",
+        ],
+        namespace,
+    )
+
+
+def _field_lines(
+    field: "SchemaField", field_type: BigQueryTypes, struct_name: Optional[str]
+) -> List[str]:
+    """
+    Return the lines, which check the mode and the value of a field.
+    """
+    name = field.name
+    mode = field.mode or BigQueryFieldModes.NULLABLE
+    if mode == BigQueryFieldModes.REPEATED:
+        return [
+            "if value is None:",
+            "    pass",
+            "elif not isinstance(value, (list, tuple)):",
+            f"    errors = _error(errors, {name + ': expected a list'!r})",
+            *_fast_repeated_lines(field, field_type),
+            "else:",
+            "    for index, item in enumerate(value):",
+            "        if item is None:",
+            f"            errors = _error(errors, f'{name}[{{index}}]: arrays cannot contain NULL')",
+            *(
+                f"        {line}"
+                for line in _value_lines(
+                    field, field_type, "item", f"f'{name}[{{index}}]", struct_name
+                )
+            ),
+        ]
+    elif mode == BigQueryFieldModes.REQUIRED:
+        return [
+            "if value is None:",
+            f"    errors = _error(errors, {name + ': missing required value'!r})",
+            *_value_lines(field, field_type, "value", f"'{name}", struct_name),
+        ]
+    else:
+        return [
+            "if value is None:",
+            "    pass",
+            *_value_lines(field, field_type, "value", f"'{name}", struct_name),
+        ]
+
+
+def _fast_repeated_lines(field: "SchemaField", field_type: BigQueryTypes) -> List[str]:
+    """
+    Return an elif branch, which accepts lists of valid values without looping
+    over them in python. Invalid lists are checked item by item, to find the errors.
+    """
+    if field_type not in _EXACT_TYPES:
+        return []
+
+    condition = f"set(map(type, value)) <= _types_{field_type.value}"
+    max_size = _max_size(field, field_type)
+    if max_size is not None:
+        condition += f" and max(map(len, value), default=0) <= {max_size}"
+    return [f"elif {condition}:", "    pass"]
+
+
+def _max_size(field: "SchemaField", field_type: BigQueryTypes) -> Optional[int]:
+    """
+    Return the length up to which STRING and BYTES values are valid.
+    """
+    max_length = getattr(field, "max_length", None)
+    if field_type in (BigQueryTypes.STRING, BigQueryTypes.GEOGRAPHY):
+        return max_length or _MAX_VALUE_CHARACTERS
+    if field_type == BigQueryTypes.BYTES:
+        return max_length or _MAX_VALUE_BYTES
+    return None
+
+
+def _value_lines(
+    field: "SchemaField",
+    field_type: BigQueryTypes,
+    value: str,
+    path: str,
+    struct_name: Optional[str],
+) -> List[str]:
+    """
+    Return elif branches, which check a value that is not None.
+    path is the start of a string literal, e.g. 'name or f'name[{index}].
+    """
+    checks: List[Tuple[str, str]] = [
+        (
+            _TYPE_CHECKS[field_type].format(value=value),
+            f"_type_error({field_type.value!r}, {value})",
+        )
+    ]
+    if field_type in (BigQueryTypes.STRING, BigQueryTypes.GEOGRAPHY):
+        max_length = getattr(field, "max_length", None)
+        if max_length:
+            checks.append(
+                (
+                    f"len({value}) > {max_length}",
+                    f"'value is longer than {max_length} characters'",
+                )
+            )
+        else:
+            checks.append(
+                (
+                    f"len({value}) > {_MAX_VALUE_CHARACTERS} and "
+                    f"len({value}.encode()) > {_MAX_VALUE_BYTES}",
+                    "'value is larger than 10 MB'",
+                )
+            )
+    elif field_type == BigQueryTypes.BYTES:
+        max_length = getattr(field, "max_length", None) or _MAX_VALUE_BYTES
+        checks.append(
+            (f"len({value}) > {max_length}", f"'value is larger than {max_length} B'")
+        )
+    elif field_type == BigQueryTypes.NUMERIC:
+        checks.append(
+            (f"_numeric_error({value}) is not None", f"_numeric_error({value})")
+        )
+
+    lines = []
+    for condition, message in checks:
+        lines.extend(
+            [
+                f"elif {condition}:",
+                f"    errors = _error(errors, {path}: ' + {message})",
+            ]
+        )
+    if struct_name:
+        lines.extend(
+            [
+                "else:",
+                f"    errors = _errors(errors, {path}.', {struct_name}({value}))",
+            ]
+        )
+    return lines
+
+
+def _error(errors: Optional[List[str]], message: str) -> List[str]:
+    if errors is None:
+        return [message]
+    errors.append(message)
+    return errors
+
+
+def _errors(
+    errors: Optional[List[str]], prefix: str, struct_errors: Optional[List[str]]
+) -> Optional[List[str]]:
+    """
+    Add the errors of a nested struct.
+    """
+    if not struct_errors:
+        return errors
+    errors = errors or []
+    errors.extend(prefix + error for error in struct_errors)
+    return errors
+
+
+def _type_error(field_type: str, value: Any) -> str:
+    return f"expected {field_type}, got {type(value).__name__}"
+
+
+def _numeric_error(value: Any) -> Optional[str]:
+    integer_digits = _NUMERIC_PRECISION - _NUMERIC_SCALE
+    if isinstance(value, int):
+        if abs(value) >= 10**integer_digits:
+            return f"NUMERIC value has more than {integer_digits} integer digits"
+        return None
+
+    # Formatting is a lot faster than Decimal.as_tuple and covers most values.
+    integer, _, fraction = str(value).lstrip("-").partition(".")
+    if (
+        integer.isdigit()
+        and len(integer) <= integer_digits
+        and len(fraction) <= _NUMERIC_SCALE
+        and (not fraction or fraction.isdigit())
+    ):
+        return None
+
+    if not value.is_finite():
+        return "NUMERIC value is not finite"
+    _, digits, exponent = value.normalize().as_tuple()
+    if -exponent > _NUMERIC_SCALE:
+        return f"NUMERIC value has more than {_NUMERIC_SCALE} decimal places"
+    if value and len(digits) + exponent > integer_digits:
+        return f"NUMERIC value has more than {integer_digits} integer digits"
+    return None
@@ -1,28 +1,25 @@
 """
 Convert a python dataclass into a BigQuery schema definition.
 """
-from dataclasses import Field, fields, is_dataclass
-from typing import Any, List, Optional, Type, Union, get_type_hints
+import threading
+from dataclasses import Field, is_dataclass
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Type
 
-from google.cloud.bigquery import SchemaField
-from typing_extensions import get_origin
+from bq_schema._caches import clear_caches, register_cache
+from bq_schema.types.type_parser import parse_field_type, resolve_dataclass_fields
 
-from bq_schema.types.type_parser import (
-    parse_inner_type_of_list,
-    parse_inner_type_of_optional,
-)
+from .types import BigQueryFieldModes, BigQueryTypes, PythonTypeMapping
 
-from .types import BigQueryFieldModes, BigQueryTypes, TypeMapping
+if TYPE_CHECKING:
+    from google.cloud.bigquery import SchemaField
 
-_BASIC_TYPES_TO_NAME = {
-    primitive_type: bq_type for bq_type, primitive_type in TypeMapping.items()
-}
-_NoneType = type(None)
+_SCHEMA_CACHE: Dict[Type, Tuple["SchemaField", ...]] = register_cache({})
+_SCHEMA_CACHE_LOCK = threading.Lock()
 
 
 def dataclass_to_schema(
     dataclass: Type, localns: Optional[dict] = None
-) -> List[SchemaField]:
+) -> List["SchemaField"]:
     """
     Transfrom a dataclass into a list of SchemaField.
 
@@ -39,71 +36,68 @@ def dataclass_to_schema(
             b: Example1
 
         dataclass_to_schema(Example2, localns=locals())
+
+    The schema is cached per dataclass, unless localns is passed, as the locals
+    are usually a new dict on every call. Every call returns a new list, the
+    SchemaField instances themselves are shared.
     """
-    if not is_dataclass(dataclass):
-        raise TypeError("Not a dataclass.")
+    return list(_cached_schema(dataclass, localns))
 
-    type_hints = get_type_hints(dataclass, localns=localns)
-    dataclass_fields = fields(dataclass)
-    for field in dataclass_fields:
-        field.type = type_hints[field.name]
-    return [_field_to_schema(field) for field in dataclass_fields]
 
+def clear_schema_cache(dataclass: Optional[Type] = None) -> None:
+    """
+    Remove the cached schemas of a dataclass, or all cached schemas, together
+    with everything else cached per dataclass, e.g. the compiled codecs and
+    schema fingerprints.
 
-def _field_to_schema(field: Field) -> SchemaField:
-    field_type = _BASIC_TYPES_TO_NAME.get(field.type)
-    if field_type:
-        return SchemaField(
-            name=field.name,
-            field_type=field_type,
-            description=_parse_field_description(field),
-            mode=BigQueryFieldModes.REQUIRED,
-        )
+    Call it after reloading modules, which define dataclasses. Without an
+    argument, the caches of dataclasses, which nest the reloaded ones, are
+    cleared as well.
+    """
+    with _SCHEMA_CACHE_LOCK:
+        clear_caches(dataclass)
 
-    if is_dataclass(field.type):
-        return SchemaField(
-            name=field.name,
-            field_type=BigQueryTypes.STRUCT,
-            mode=BigQueryFieldModes.REQUIRED,
-            description=_parse_field_description(field),
-            fields=_parse_fields(field.type),
-        )
 
-    # typing.Optional is the same as typing.Union[SomeType, NoneType]
-    if get_origin(field.type) is Union:
-        return _parse_optional(field)
+def _cached_schema(
+    dataclass: Type, localns: Optional[dict]
+) -> Tuple["SchemaField", ...]:
+    if localns is None:
+        cached = _SCHEMA_CACHE.get(dataclass)
+        if cached is not None:
+            return cached
 
-    if get_origin(field.type) is list:
-        return _parse_list(field)
+    if not is_dataclass(dataclass):
+        raise TypeError("Not a dataclass.")
 
-    raise TypeError(f"Unsupported type: {field.type}.")
+    schema = tuple(
+        _field_to_schema(field)
+        for field in resolve_dataclass_fields(dataclass, localns)
+    )
+    if localns is not None:
+        return schema
+    with _SCHEMA_CACHE_LOCK:
+        return _SCHEMA_CACHE.setdefault(dataclass, schema)
 
 
-def _parse_list(field: Field) -> SchemaField:
-    field_type = parse_inner_type_of_list(field.type)
-    return SchemaField(
-        name=field.name,
-        field_type=_python_type_to_big_query_type(field_type),
-        mode=BigQueryFieldModes.REPEATED,
-        description=_parse_field_description(field),
-        fields=_parse_fields(field_type),
+def _field_to_schema(field: Field) -> "SchemaField":
+    # google.cloud.bigquery is slow to import, only load it when it is needed.
+    from google.cloud.bigquery import (  # pylint: disable=import-outside-toplevel
+        SchemaField,
     )
 
-
-def _parse_optional(field: Field) -> SchemaField:
-    field_type = parse_inner_type_of_optional(field.type)
+    mode, field_type = parse_field_type(field.type)
     return SchemaField(
         name=field.name,
         field_type=_python_type_to_big_query_type(field_type),
-        mode=BigQueryFieldModes.NULLABLE,
+        mode=mode,
         description=_parse_field_description(field),
         fields=_parse_fields(field_type),
     )
 
 
-def _parse_fields(field_type: Type) -> List[SchemaField]:
+def _parse_fields(field_type: Type) -> List["SchemaField"]:
     if is_dataclass(field_type):
-        return dataclass_to_schema(field_type)
+        return list(_cached_schema(field_type, None))
 
     return []
 
@@ -112,11 +106,11 @@ def _python_type_to_big_query_type(field_type: Any) -> BigQueryTypes:
     if is_dataclass(field_type):
         return BigQueryTypes.STRUCT
 
-    bq_type = _BASIC_TYPES_TO_NAME.get(field_type)
+    bq_type = PythonTypeMapping.get(field_type)
     if bq_type:
         return bq_type
 
-    raise TypeError(f"Unsupported type: {field_type}")
+    raise TypeError(f"Unsupported type: {field_type}.")
 
 
 def _parse_field_description(field: Field) -> Optional[str]:
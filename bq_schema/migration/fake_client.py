@@ -0,0 +1,243 @@
+"""
+An in-memory stand-in for the bigquery client, to test and benchmark migrations
+without a project.
+"""
+import copy
+import json
+import random
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+from google.api_core.exceptions import (
+    BadRequest,
+    Conflict,
+    Forbidden,
+    InternalServerError,
+    NotFound,
+)
+from google.cloud.bigquery import SchemaField
+from google.cloud.bigquery.table import Table, TableListItem, TableReference
+
+from bq_schema.bigquery_table import BigqueryTable
+
+_TableArg = Union[str, Table, TableReference]
+
+# Limits of a single insertAll request.
+_MAX_REQUEST_BYTES = 10 * 1024 * 1024
+_MAX_REQUEST_ROWS = 50_000
+
+
+class FakeBigQueryClient:
+    """
+    Implement get_table, list_tables, create_table, update_table and
+    insert_rows_json on tables kept in memory.
+
+    Every call sleeps for latency seconds. A share of the calls fails with a
+    rate limit error (rate_limit_rate) or an internal server error
+    (failure_rate), both of which are retryable. Errors for single tables can
+    be injected with inject_error. The number of calls per method is counted
+    in calls, the highest number of calls in flight at once in
+    max_concurrent_calls.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.rate_limit_rate = rate_limit_rate
+        self.failure_rate = failure_rate
+        self.calls: Counter = Counter()
+        self.max_concurrent_calls = 0
+        self._concurrent_calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._tables: Dict[str, Table] = {}
+        self._datasets: Dict[str, List[str]] = {}
+        self._errors: Dict[str, List[Exception]] = {}
+        self._rows: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def create_dataset(self, dataset: str, exists_ok: bool = False) -> None:
+        with self._lock:
+            if dataset in self._datasets and not exists_ok:
+                raise Conflict(f"Already Exists: Dataset {dataset}")
+            self._datasets.setdefault(dataset, [])
+
+    def add_tables(self, tables: Iterable[Table]) -> None:
+        """
+        Store tables without latency or errors, e.g. to prepare a benchmark.
+        """
+        for table in tables:
+            self._store(table, exists_ok=True)
+
+    def inject_error(
+        self, table_identifier: str, error: Exception, times: int = 1
+    ) -> None:
+        """
+        Raise error on the next times calls concerning the table.
+        """
+        with self._lock:
+            self._errors.setdefault(table_identifier, []).extend([error] * times)
+
+    def get_table(self, table: _TableArg) -> Table:
+        table_identifier = _table_identifier(table)
+        self._call("get_table", table_identifier)
+        with self._lock:
+            if table_identifier not in self._tables:
+                raise NotFound(f"Not found: Table {table_identifier}")
+            return _copy(self._tables[table_identifier])
+
+    def list_tables(self, dataset: str) -> List[TableListItem]:
+        self._call("list_tables", dataset)
+        with self._lock:
+            if dataset not in self._datasets:
+                raise NotFound(f"Not found: Dataset {dataset}")
+            return [
+                TableListItem(self._tables[table_identifier].to_api_repr())
+                for table_identifier in sorted(self._datasets[dataset])
+            ]
+
+    def create_table(self, table: Table, exists_ok: bool = False) -> Table:
+        self._call("create_table", _table_identifier(table))
+        return self._store(table, exists_ok)
+
+    def update_table(self, table: Table, fields: List[str]) -> Table:
+        table_identifier = _table_identifier(table)
+        self._call("update_table", table_identifier)
+        with self._lock:
+            if table_identifier not in self._tables:
+                raise NotFound(f"Not found: Table {table_identifier}")
+            stored_table = self._tables[table_identifier]
+            for field in fields:
+                setattr(stored_table, field, copy.deepcopy(getattr(table, field)))
+            _touch(stored_table)
+            return _copy(stored_table)
+
+    def insert_rows_json(
+        self,
+        table: _TableArg,
+        json_rows: Sequence[Dict[str, Any]],
+        row_ids: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Store the rows, rows with the same id are only stored once.
+        The request limits of the streaming api are enforced.
+        """
+        table_identifier = _table_identifier(table)
+        self._call("insert_rows_json", table_identifier)
+        if row_ids is None:
+            row_ids = [str(random.getrandbits(64)) for _ in json_rows]
+        request = {
+            "rows": [
+                {"insertId": row_id, "json": json_row}
+                for row_id, json_row in zip(row_ids, json_rows)
+            ]
+        }
+        if len(json_rows) > _MAX_REQUEST_ROWS:
+            raise BadRequest(f"Too many rows present in the request: {len(json_rows)}")
+        if len(json.dumps(request)) > _MAX_REQUEST_BYTES:
+            raise BadRequest("Request payload size exceeds the limit")
+
+        with self._lock:
+            if table_identifier not in self._tables:
+                raise NotFound(f"Not found: Table {table_identifier}")
+            rows = self._rows.setdefault(table_identifier, {})
+            for row_id, json_row in zip(row_ids, json_rows):
+                rows.setdefault(row_id, copy.deepcopy(json_row))
+        return []
+
+    def list_rows(self, table: _TableArg) -> List[Dict[str, Any]]:
+        """
+        Return the inserted rows of a table.
+        """
+        with self._lock:
+            return list(self._rows.get(_table_identifier(table), {}).values())
+
+    def _store(self, table: Table, exists_ok: bool) -> Table:
+        table_identifier = _table_identifier(table)
+        dataset = table_identifier.rsplit(".", 1)[0]
+        with self._lock:
+            if table_identifier in self._tables:
+                if not exists_ok:
+                    raise Conflict(f"Already Exists: Table {table_identifier}")
+                return _copy(self._tables[table_identifier])
+
+            stored_table = _copy(table)
+            stored_table._properties[  # pylint: disable=protected-access
+                "creationTime"
+            ] = str(int(time.time() * 1000))
+            _touch(stored_table)
+            self._tables[table_identifier] = stored_table
+            self._datasets.setdefault(dataset, []).append(table_identifier)
+            return _copy(stored_table)
+
+    def _call(self, method: str, resource: str) -> None:
+        with self._lock:
+            self.calls[method] += 1
+            self._concurrent_calls += 1
+            self.max_concurrent_calls = max(
+                self.max_concurrent_calls, self._concurrent_calls
+            )
+            errors = self._errors.get(resource)
+            error = errors.pop(0) if errors else None
+            chance = self._random.random()
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self._concurrent_calls -= 1
+
+        if error:
+            raise error
+        if chance < self.rate_limit_rate:
+            raise Forbidden(
+                "Exceeded rate limits", errors=[{"reason": "rateLimitExceeded"}]
+            )
+        if chance < self.rate_limit_rate + self.failure_rate:
+            raise InternalServerError("Injected failure")
+
+
+class FakeTable(BigqueryTable):
+    """
+    A local table, whose name, schema and dataset are passed on creation,
+    e.g. to generate many tables for a test or benchmark.
+    """
+
+    def __init__(
+        self, name: str, schema: List[SchemaField], dataset: Optional[str] = None
+    ):
+        self._name = name
+        self._dataset = dataset
+        self.table_schema = schema
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def dataset(self) -> Optional[str]:
+        return self._dataset
+
+    @property
+    def schema(self) -> List[SchemaField]:
+        return self.table_schema
+
+
+def _table_identifier(table: _TableArg) -> str:
+    if isinstance(table, str):
+        return table
+    return f"{table.project}.{table.dataset_id}.{table.table_id}"
+
+
+def _copy(table: Table) -> Table:
+    return Table.from_api_repr(copy.deepcopy(table.to_api_repr()))
+
+
+def _touch(table: Table) -> None:
+    properties = table._properties  # pylint: disable=protected-access
+    properties["lastModifiedTime"] = str(int(time.time() * 1000))
+    properties["etag"] = str(random.getrandbits(64))
@@ -0,0 +1,68 @@
+"""
+Hash schemas, to quickly find tables whose schema has not changed.
+"""
+import hashlib
+import json
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+from google.cloud.bigquery import SchemaField
+from google.cloud.bigquery.schema import _STRUCT_TYPES, LEGACY_TO_STANDARD_TYPES
+
+from bq_schema._caches import register_cache
+from bq_schema.dataclass_converter import dataclass_to_schema
+
+_DATACLASS_FINGERPRINTS: Dict[Type, Optional[str]] = register_cache({})
+
+
+class _UnspecifiedFieldType(Exception):
+    pass
+
+
+def schema_fingerprint(schema: Sequence[SchemaField]) -> Optional[str]:
+    """
+    Create a hash of the names, types and modes of all (nested) columns.
+
+    Field types are normalized like check_schemas does, e.g. INTEGER and INT64
+    are the same type. The order of the columns is part of the hash.
+    If two fingerprints are equal, check_schemas does not find any difference.
+    Schemas with a field type check_schemas does not know have no fingerprint.
+    """
+    try:
+        canonical_schema = _canonical_schema(schema)
+    except _UnspecifiedFieldType:
+        return None
+
+    return hashlib.sha256(
+        json.dumps(canonical_schema, separators=(",", ":")).encode()
+    ).hexdigest()
+
+
+def dataclass_fingerprint(dataclass: Type) -> Optional[str]:
+    """
+    Return the schema fingerprint of a dataclass, which is computed once.
+    """
+    if dataclass not in _DATACLASS_FINGERPRINTS:
+        _DATACLASS_FINGERPRINTS[dataclass] = schema_fingerprint(
+            dataclass_to_schema(dataclass)
+        )
+    return _DATACLASS_FINGERPRINTS[dataclass]
+
+
+def _canonical_schema(schema: Sequence[SchemaField]) -> List[Any]:
+    canonical_schema = []
+    for column in schema:
+        field_type = LEGACY_TO_STANDARD_TYPES.get(column.field_type)
+        if field_type is None:
+            raise _UnspecifiedFieldType(column.field_type)
+
+        canonical_schema.append(
+            [
+                column.name,
+                field_type.name,
+                column.mode,
+                _canonical_schema(column.fields)
+                if column.field_type in _STRUCT_TYPES
+                else [],
+            ]
+        )
+    return canonical_schema
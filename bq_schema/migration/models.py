@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-from typing import List
+from enum import Enum
+from typing import List, Optional
 
 from google.cloud.bigquery.table import Table
 
@@ -16,3 +17,17 @@ class ExistingTable:
     local_table: BigqueryTable
     remote_table: Table
     schema_diffs: List[str]
+    clustering_diff: Optional[str] = None
+
+
+class ApplyStatus(str, Enum):
+    APPLIED = "APPLIED"
+    FAILED = "FAILED"
+    SKIPPED = "SKIPPED"
+
+
+@dataclass
+class ApplyResult:
+    status: ApplyStatus
+    remote_table: Optional[Table] = None
+    error: Optional[Exception] = None
@@ -0,0 +1,73 @@
+"""
+Retry bigquery api calls, which failed due to rate limits or transient errors.
+"""
+import random
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterator, TypeVar
+
+from google.api_core.exceptions import (
+    BadGateway,
+    GatewayTimeout,
+    GoogleAPICallError,
+    InternalServerError,
+    ServiceUnavailable,
+    TooManyRequests,
+)
+
+T = TypeVar("T")  # pylint: disable=invalid-name
+
+_RETRYABLE_EXCEPTIONS = (
+    BadGateway,
+    GatewayTimeout,
+    InternalServerError,
+    ServiceUnavailable,
+    TooManyRequests,
+)
+# BigQuery reports exceeded rate limits, e.g. for table metadata updates,
+# as 403 Forbidden with the reason rateLimitExceeded.
+_RETRYABLE_REASONS = {"backendError", "internalError", "rateLimitExceeded"}
+
+
+def is_retryable(error: Exception) -> bool:
+    if isinstance(error, _RETRYABLE_EXCEPTIONS):
+        return True
+
+    if isinstance(error, GoogleAPICallError):
+        return any(
+            isinstance(detail, dict) and detail.get("reason") in _RETRYABLE_REASONS
+            for detail in error.errors
+        )
+
+    return False
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retry with exponential backoff and jitter.
+    """
+
+    attempts: int = 5
+    initial_delay: float = 1.0
+    max_delay: float = 32.0
+
+    def call(self, function: Callable[[], T]) -> T:
+        for delay in self.backoff():
+            try:
+                return function()
+            except Exception as error:  # pylint: disable=broad-except
+                if not is_retryable(error):
+                    raise
+            time.sleep(delay)
+
+        return function()
+
+    def backoff(self) -> Iterator[float]:
+        """
+        Yield the delay before each retry, attempts - 1 times.
+        """
+        delay = self.initial_delay
+        for _ in range(1, self.attempts):
+            yield random.uniform(delay / 2, delay)
+            delay = min(delay * 2, self.max_delay)
@@ -1,4 +1,7 @@
-from typing import Dict, Iterator, List, Optional, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from google.api_core.exceptions import NotFound
 from google.cloud import bigquery
@@ -7,7 +10,16 @@ from google.cloud.bigquery.schema import _STRUCT_TYPES, LEGACY_TO_STANDARD_TYPES
 from google.cloud.bigquery.table import Table
 from google.cloud.bigquery_v2 import types
 
-from bq_schema.migration.models import ExistingTable, MissingTable
+from bq_schema.bigquery_table import BigqueryTable
+from bq_schema.migration.fingerprint import schema_fingerprint
+from bq_schema.migration.models import (
+    ApplyResult,
+    ApplyStatus,
+    ExistingTable,
+    MissingTable,
+)
+from bq_schema.migration.retry import RetryPolicy
+from bq_schema.migration.table_cache import TableCache
 from bq_schema.migration.table_finder import find_tables
 
 _SchemaDiffs = Dict[str, Union[MissingTable, ExistingTable]]
@@ -71,34 +83,161 @@ def find_schema_differences(
     global_project: Optional[str],
     global_dataset: Optional[str],
     ignore_abstract: bool,
+    concurrency: int = 1,
+    retry_policy: RetryPolicy = RetryPolicy(),
+    table_cache: Optional[TableCache] = None,
+    static: bool = False,
+    manifest_path: Optional[str] = None,
 ) -> _SchemaDiffs:
-    schema_diffs: _SchemaDiffs = {}
-    for local_table in find_tables(module_path, ignore_abstract):
+    return find_table_differences(
+        local_tables=find_tables(module_path, ignore_abstract, static, manifest_path),
+        bigquery_client=bigquery_client,
+        global_project=global_project,
+        global_dataset=global_dataset,
+        concurrency=concurrency,
+        retry_policy=retry_policy,
+        table_cache=table_cache,
+    )
+
+
+# pylint: disable=too-many-arguments
+def find_table_differences(
+    local_tables: Iterable[BigqueryTable],
+    bigquery_client: BigQueryClient,
+    global_project: Optional[str],
+    global_dataset: Optional[str],
+    concurrency: int = 1,
+    retry_policy: RetryPolicy = RetryPolicy(),
+    table_cache: Optional[TableCache] = None,
+) -> _SchemaDiffs:
+    """
+    Compare the local tables with the remote tables.
+
+    The existing tables are listed once per dataset, only those are fetched.
+    Up to concurrency requests are sent in parallel. Failed requests are
+    retried according to the retry policy. The differences are ordered by the
+    table identifier.
+
+    Tables, which are deleted between listing and fetching them, are missing.
+
+    With a table cache, cached remote tables are used instead of fetching them.
+    If a cached table differs from the local table, it is fetched again to make
+    sure the difference is not outdated.
+    """
+    tables: Dict[str, BigqueryTable] = {}
+    for local_table in local_tables:
         project = global_project or local_table.project
         assert project, "Project has not been set."
         dataset = global_dataset or local_table.dataset
         assert dataset, "Dataset has not been set."
+        local_table.get_clustering_fields()
 
-        table_identifier = f"{project}.{dataset}.{local_table.full_table_name()}"
+        tables[f"{project}.{dataset}.{local_table.full_table_name()}"] = local_table
 
+    def list_tables(dataset_identifier: str) -> Dict[str, Optional[datetime]]:
         try:
-            remote_table = bigquery_client.get_table(table_identifier)
-            if list(
-                check_schemas(local_table.get_schema_fields(), remote_table.schema)
-            ):
-                schema_diffs[table_identifier] = ExistingTable(
-                    local_table=local_table,
-                    remote_table=remote_table,
-                    schema_diffs=list(
-                        check_schemas(
-                            local_table.get_schema_fields(), remote_table.schema
-                        )
-                    ),
-                )
+            return retry_policy.call(
+                lambda: {
+                    f"{dataset_identifier}.{table.table_id}": table.created
+                    for table in bigquery_client.list_tables(dataset_identifier)
+                }
+            )
         except NotFound:
-            schema_diffs[table_identifier] = MissingTable(local_table=local_table)
+            return {}
+
+    def fetch_table(table_identifier: str) -> Tuple[Table, Optional[str]]:
+        remote_table = retry_policy.call(
+            lambda: bigquery_client.get_table(table_identifier)
+        )
+        fingerprint = schema_fingerprint(remote_table.schema)
+        if table_cache:
+            table_cache.put(remote_table, fingerprint)
+        return remote_table, fingerprint
+
+    def find_difference(
+        table_identifier: str,
+    ) -> Optional[Union[MissingTable, ExistingTable]]:
+        local_table = tables[table_identifier]
+        if table_identifier not in existing_tables:
+            return MissingTable(local_table=local_table)
+
+        if table_cache:
+            cached = table_cache.get_with_fingerprint(
+                table_identifier, existing_tables[table_identifier]
+            )
+            if cached and not _compare_table(local_table, *cached):
+                return None
+
+        try:
+            remote_table = fetch_table(table_identifier)
+        except NotFound:
+            # The table was deleted after the dataset has been listed.
+            if table_cache:
+                table_cache.invalidate(table_identifier)
+            return MissingTable(local_table=local_table)
+        return _compare_table(local_table, *remote_table)
+
+    table_identifiers = sorted(tables)
+    dataset_identifiers = sorted(
+        {table_identifier.rsplit(".", 1)[0] for table_identifier in tables}
+    )
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+        existing_tables: Dict[str, Optional[datetime]] = {}
+        for dataset_tables in executor.map(list_tables, dataset_identifiers):
+            existing_tables.update(dataset_tables)
+        differences = list(executor.map(find_difference, table_identifiers))
+
+    if table_cache:
+        table_cache.prune()
+
+    return {
+        table_identifier: difference
+        for table_identifier, difference in zip(table_identifiers, differences)
+        if difference is not None
+    }
+
+
+def _compare_table(
+    local_table: BigqueryTable,
+    remote_table: Table,
+    remote_fingerprint: Optional[str],
+) -> Optional[ExistingTable]:
+    """
+    Compare the schema fingerprints first, both are computed once, so
+    unchanged schemas are found by comparing two strings.
+    """
+    clustering_diff = _compare_clustering(local_table, remote_table)
+    local_fingerprint = local_table.get_schema_fingerprint()
+    if local_fingerprint is not None and local_fingerprint == remote_fingerprint:
+        table_schema_diffs: List[str] = []
+    else:
+        table_schema_diffs = list(
+            check_schemas(local_table.get_schema_fields(), remote_table.schema)
+        )
+    if not table_schema_diffs and not clustering_diff:
+        return None
 
-    return schema_diffs
+    return ExistingTable(
+        local_table=local_table,
+        remote_table=remote_table,
+        schema_diffs=table_schema_diffs,
+        clustering_diff=clustering_diff,
+    )
+
+
+def _compare_clustering(
+    local_table: BigqueryTable, remote_table: Table
+) -> Optional[str]:
+    """
+    Tables without local clustering fields keep the clustering of the remote table.
+    """
+    clustering_fields = local_table.get_clustering_fields()
+    if clustering_fields is None or clustering_fields == remote_table.clustering_fields:
+        return None
+    return (
+        f"Clustering fields changed from {remote_table.clustering_fields} "
+        f"to {clustering_fields}"
+    )
 
 
 def print_format_schema_differences(schema_diffs: _SchemaDiffs) -> Dict[str, str]:
@@ -107,9 +246,12 @@ def print_format_schema_differences(schema_diffs: _SchemaDiffs) -> Dict[str, str
         if isinstance(difference, MissingTable):
             formated_prints[table_identifier] = "Table does not exist in bq"
         elif isinstance(difference, ExistingTable):
-            formated_prints[
-                table_identifier
-            ] = f"Schema differences: {difference.schema_diffs}"
+            messages = []
+            if difference.schema_diffs or not difference.clustering_diff:
+                messages.append(f"Schema differences: {difference.schema_diffs}")
+            if difference.clustering_diff:
+                messages.append(difference.clustering_diff)
+            formated_prints[table_identifier] = "; ".join(messages)
 
     return formated_prints
 
@@ -129,19 +271,90 @@ def confirm_apply_schema_differences() -> bool:
 def apply_schema_differences(
     schema_diffs: _SchemaDiffs,
     bigquery_client: BigQueryClient,
-) -> None:
-    print("Applying changes...")
-    for table_identifier, difference in schema_diffs.items():
-        if isinstance(difference, MissingTable):
-            print("Creating table...")
-            table = Table(
-                table_identifier,
-                schema=difference.local_table.get_schema_fields(),
-            )
-            if difference.local_table.time_partitioning:
-                table.time_partitioning = difference.local_table.time_partitioning
-            remote_table = bigquery_client.create_table(table)
-            print(remote_table)
-        elif isinstance(difference, ExistingTable):
-            difference.remote_table.schema = difference.local_table.get_schema_fields()
-            print(bigquery_client.update_table(difference.remote_table, ["schema"]))
+    concurrency: int = 1,
+    retry_policy: RetryPolicy = RetryPolicy(),
+    stop_on_error: bool = False,
+    table_cache: Optional[TableCache] = None,
+) -> Dict[str, ApplyResult]:
+    """
+    Create the missing tables and update the schemas of the existing tables,
+    as well as their clustering fields, if they changed.
+
+    Up to concurrency tables are changed in parallel. Requests, which failed due
+    to rate limits or transient errors, are retried according to the retry
+    policy. If stop_on_error is set, tables are skipped after the first failure.
+    Changed tables are updated in the table cache.
+    Returns the result per table, in the order of schema_diffs.
+    """
+    failed = threading.Event()
+
+    def apply_difference(table_identifier: str) -> ApplyResult:
+        if stop_on_error and failed.is_set():
+            return ApplyResult(status=ApplyStatus.SKIPPED)
+
+        difference = schema_diffs[table_identifier]
+        try:
+            if isinstance(difference, MissingTable):
+                table = Table(
+                    table_identifier,
+                    schema=difference.local_table.get_schema_fields(),
+                )
+                if difference.local_table.time_partitioning:
+                    table.time_partitioning = difference.local_table.time_partitioning
+                table.clustering_fields = difference.local_table.get_clustering_fields()
+                remote_table = retry_policy.call(_create_table(bigquery_client, table))
+            else:
+                fields = ["schema"]
+                difference.remote_table.schema = (
+                    difference.local_table.get_schema_fields()
+                )
+                if difference.clustering_diff:
+                    fields.append("clustering_fields")
+                    difference.remote_table.clustering_fields = (
+                        difference.local_table.get_clustering_fields()
+                    )
+                remote_table = retry_policy.call(
+                    lambda: bigquery_client.update_table(
+                        difference.remote_table, fields
+                    )
+                )
+        except Exception as error:  # pylint: disable=broad-except
+            failed.set()
+            if table_cache:
+                table_cache.invalidate(table_identifier)
+            return ApplyResult(status=ApplyStatus.FAILED, error=error)
+
+        if table_cache:
+            table_cache.put(remote_table)
+        return ApplyResult(status=ApplyStatus.APPLIED, remote_table=remote_table)
+
+    with ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+        return dict(
+            zip(schema_diffs, executor.map(apply_difference, list(schema_diffs)))
+        )
+
+
+def _create_table(bigquery_client: BigQueryClient, table: Table) -> Callable[[], Table]:
+    """
+    Create the table, retries accept an existing table, as a failed attempt
+    might have created it.
+    """
+    attempts = 0
+
+    def create_table() -> Table:
+        nonlocal attempts
+        attempts += 1
+        return bigquery_client.create_table(table, exists_ok=attempts > 1)
+
+    return create_table
+
+
+def print_format_apply_results(apply_results: Dict[str, ApplyResult]) -> Dict[str, str]:
+    formated_prints = {}
+    for table_identifier, apply_result in apply_results.items():
+        if apply_result.status == ApplyStatus.FAILED:
+            formated_prints[table_identifier] = f"Failed: {apply_result.error}"
+        else:
+            formated_prints[table_identifier] = apply_result.status.capitalize()
+
+    return formated_prints
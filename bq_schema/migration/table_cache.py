@@ -0,0 +1,139 @@
+"""
+Cache the metadata of remote tables on disk, to avoid fetching unchanged tables.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from google.cloud.bigquery.table import Table
+
+from bq_schema.migration.fingerprint import schema_fingerprint
+
+_SUFFIX = ".json"
+
+
+class TableCache:
+    """
+    Store the api representation of remote tables (schema, partitioning, etag,
+    lastModifiedTime, ...) and the fingerprint of their schema as one json
+    file per table.
+
+    A cached table is used, as long as it is younger than max_age seconds and
+    its creation time matches the one returned by list_tables, i.e. the table has
+    not been recreated. The table listing does not contain the modification
+    time, so changes made outside of migrate-tables are only seen after max_age.
+    At most max_entries tables are kept, the oldest entries are pruned first.
+    """
+
+    def __init__(
+        self, directory: str, max_age: float = 3600, max_entries: int = 10_000
+    ):
+        self._directory = directory
+        self._max_age = max_age
+        self._max_entries = max_entries
+        os.makedirs(directory, exist_ok=True)
+
+    def get(
+        self, table_identifier: str, created: Optional[datetime] = None
+    ) -> Optional[Table]:
+        """
+        Return the cached table, if it is still valid.
+        """
+        cached = self.get_with_fingerprint(table_identifier, created)
+        return cached[0] if cached else None
+
+    def get_with_fingerprint(
+        self, table_identifier: str, created: Optional[datetime] = None
+    ) -> Optional[Tuple[Table, Optional[str]]]:
+        """
+        Return the cached table and the fingerprint of its schema,
+        if it is still valid. Malformed entries are treated as missing.
+        """
+        path = self._path(table_identifier)
+        try:
+            with open(path, encoding="utf-8") as cache_file:
+                entry = json.load(cache_file)
+        except (OSError, ValueError):
+            return None
+
+        if not _is_valid_entry(entry):
+            return None
+
+        if time.time() - entry["cached_at"] > self._max_age:
+            return None
+
+        try:
+            table = Table.from_api_repr(entry["table"])
+            if table.created != created:
+                return None
+        except (KeyError, TypeError, ValueError):
+            return None
+
+        return table, entry["fingerprint"]
+
+    def put(self, table: Table, fingerprint: Optional[str] = None) -> None:
+        """
+        Store the table, fingerprint is computed from its schema, if it is not
+        passed.
+        """
+        entry = {
+            "cached_at": time.time(),
+            "table": table.to_api_repr(),
+            "fingerprint": fingerprint or schema_fingerprint(table.schema),
+        }
+        file_descriptor, temporary_path = tempfile.mkstemp(
+            dir=self._directory, suffix=".tmp"
+        )
+        with os.fdopen(file_descriptor, "w", encoding="utf-8") as cache_file:
+            json.dump(entry, cache_file)
+        os.replace(
+            temporary_path,
+            self._path(f"{table.project}.{table.dataset_id}.{table.table_id}"),
+        )
+
+    def invalidate(self, table_identifier: str) -> None:
+        try:
+            os.remove(self._path(table_identifier))
+        except FileNotFoundError:
+            pass
+
+    def prune(self) -> None:
+        """
+        Remove expired entries and the oldest entries above max_entries.
+        """
+        entries: List[Tuple[float, str]] = []
+        for file_name in os.listdir(self._directory):
+            if not file_name.endswith(_SUFFIX):
+                continue
+            path = os.path.join(self._directory, file_name)
+            try:
+                entries.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                continue
+
+        entries.sort(reverse=True)
+        expired_before = time.time() - self._max_age
+        for index, (modified, path) in enumerate(entries):
+            if index >= self._max_entries or modified < expired_before:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _path(self, table_identifier: str) -> str:
+        file_name = hashlib.sha256(table_identifier.encode()).hexdigest()
+        return os.path.join(self._directory, f"{file_name}{_SUFFIX}")
+
+
+def _is_valid_entry(entry: Any) -> bool:
+    return (
+        isinstance(entry, dict)
+        and isinstance(entry.get("cached_at"), (int, float))
+        and isinstance(entry.get("table"), dict)
+        and "fingerprint" in entry
+        and isinstance(entry["fingerprint"], (str, type(None)))
+    )
@@ -1,32 +1,100 @@
+import ast
+import hashlib
 import importlib
 import inspect
+import json
+import os
 import pkgutil
 import sys
+import tempfile
 from abc import ABC
+from dataclasses import asdict, dataclass, field
 from os import path
-from typing import Iterator, Optional, Set
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
 
 from bq_schema.bigquery_table import BigqueryTable
 
+_BIGQUERY_TABLE = f"{BigqueryTable.__module__}.{BigqueryTable.__name__}"
+_MANIFEST_VERSION = 1
 
-def find_tables(module_path: str, ignore_abstract: bool) -> Set[BigqueryTable]:
+
+def find_tables(
+    module_path: str,
+    ignore_abstract: bool,
+    static: bool = False,
+    manifest_path: Optional[str] = None,
+) -> Set[BigqueryTable]:
+    """
+    Find all bigquery tables defined in the modules below module_path.
+
+    If static is set, the tables are found by parsing the source code and only
+    the modules, which define tables, are imported. A manifest_path implies
+    static and caches the parsed modules in between runs.
+    """
     tables = {}
-    for table in _tables_iterator(module_path, ignore_abstract):
+    if static or manifest_path:
+        iterator = _static_tables_iterator(module_path, ignore_abstract, manifest_path)
+    else:
+        iterator = _tables_iterator(module_path, ignore_abstract)
+    for table in iterator:
         tables[(table.project, table.dataset, table.name)] = table
 
     return set(tables.values())
 
 
-def _tables_iterator(
-    root_path: str, ignore_abstract: bool, current_path: Optional[str] = None
+def _tables_iterator(root_path: str, ignore_abstract: bool) -> Iterator[BigqueryTable]:
+    """
+    Import all modules and find the defined bigquery tables.
+    """
+    for module_name, _, _ in _iter_modules(root_path):
+        module = importlib.import_module(module_name)
+        for attribute_name in dir(module):
+            if attribute_name.startswith("__"):
+                continue
+
+            attribute = getattr(module, attribute_name)
+            if _is_table_class(attribute, ignore_abstract):
+                yield attribute()
+
+
+def _static_tables_iterator(
+    root_path: str, ignore_abstract: bool, manifest_path: Optional[str]
 ) -> Iterator[BigqueryTable]:
     """
-    Recursively find all defined bigquery tables.
+    Parse all modules and import only the modules, which define bigquery tables.
     """
-    if current_path is None:
-        module_path = root_path
-    else:
-        module_path = current_path[current_path.find(root_path) :]
+    table_classes = find_table_classes(root_path, manifest_path)
+    for module_name, class_names in table_classes.items():
+        module = importlib.import_module(module_name)
+        for class_name in class_names:
+            # Classes defined in skipped branches are not module attributes.
+            attribute = getattr(module, class_name, None)
+            if attribute is not None and _is_table_class(attribute, ignore_abstract):
+                yield attribute()
+
+
+def _is_table_class(attribute: object, ignore_abstract: bool) -> bool:
+    return (
+        inspect.isclass(attribute)
+        and issubclass(attribute, BigqueryTable)  # type: ignore
+        and attribute != BigqueryTable
+        and not (
+            ignore_abstract
+            and attribute
+            in ABC.__subclasses__()  # only direct descendants are in ABC's subclass list
+            # , any concrete implementations shouldn't be here
+        )
+    )
+
+
+def _iter_modules(
+    root_path: str, current_path: Optional[str] = None
+) -> Iterator[Tuple[str, str, bool]]:
+    """
+    Recursively find all modules and yield their name, file path and whether
+    they are a package.
+    """
+    module_path = root_path if current_path is None else current_path
 
     sys_path = sys.path[0].replace(path.sep, ".")
 
@@ -35,25 +103,248 @@ def _tables_iterator(
     for (_, module_name, is_pkg) in pkgutil.iter_modules([module_path_to_iterate]):
         module_path = module_path.replace(sys_path, "")
         module_path = module_path[1:] if module_path.startswith(".") else module_path
-        module = importlib.import_module(f"{module_path}.{module_name}")
-        if is_pkg and module.__file__:
-            sub_path = module.__file__.replace(f"{path.sep}__init__.py", "")
-            yield from _tables_iterator(root_path, ignore_abstract, sub_path)
-        for attribute_name in dir(module):
-            if attribute_name.startswith("__"):
-                continue
+        sub_path = path.join(module_path_to_iterate, module_name)
+        if is_pkg:
+            yield f"{module_path}.{module_name}", path.join(
+                sub_path, "__init__.py"
+            ), is_pkg
+            yield from _iter_modules(root_path, sub_path)
+        else:
+            yield f"{module_path}.{module_name}", f"{sub_path}.py", is_pkg
 
-            attribute = getattr(module, attribute_name)
-            if (
-                inspect.isclass(attribute)
-                and issubclass(attribute, BigqueryTable)
-                and attribute != BigqueryTable
-                and not (
-                    ignore_abstract
-                    and attribute
-                    in ABC.__subclasses__()  # only direct descendants are in ABC's subclass list
-                    # , any concrete implementations shouldn't be here
+
+@dataclass
+class _ModuleDefinitions:
+    """
+    Top level classes and imported names of a module.
+    """
+
+    classes: Dict[str, List[str]] = field(default_factory=dict)
+    imports: Dict[str, str] = field(default_factory=dict)
+
+
+def find_table_classes(
+    root_path: str, manifest_path: Optional[str] = None
+) -> Dict[str, List[str]]:
+    """
+    Find the subclasses of BigqueryTable by parsing the modules below root_path,
+    without importing them.
+
+    Base classes are followed through the modules below root_path, so a table may
+    inherit from BigqueryTable via other classes defined there. Base classes of
+    other modules are looked up, if the module has been imported already.
+    Otherwise the class is returned as a candidate, which is checked once its
+    module is imported. The schema dataclasses are resolved when the module
+    defining the table is imported. Returns the names of the table classes
+    per module name.
+
+    With a manifest_path, the classes and imports of every module are stored
+    together with the modification time, size and content hash of its file.
+    On the next run, only files whose content has changed are parsed again.
+    """
+    manifest = _load_manifest(manifest_path) if manifest_path else {}
+    entries = {}
+    modules = {}
+    for module_name, file_path, is_pkg in _iter_modules(root_path):
+        file_key = path.abspath(file_path)
+        entry = _manifest_entry(manifest.get(file_key), module_name, file_path, is_pkg)
+        entries[file_key] = entry
+        modules[module_name] = _ModuleDefinitions(
+            classes=entry["classes"], imports=entry["imports"]
+        )
+    if manifest_path and entries != manifest:
+        _write_manifest(manifest_path, entries)
+
+    resolved: Dict[str, Optional[bool]] = {}
+
+    def is_table(qualified_name: str) -> Optional[bool]:
+        if qualified_name in (_BIGQUERY_TABLE, f"bq_schema.{BigqueryTable.__name__}"):
+            return True
+        if qualified_name in resolved:
+            return resolved[qualified_name]
+
+        # Guards against cyclic imports, while the name is being resolved.
+        resolved[qualified_name] = False
+        module_name, _, name = qualified_name.rpartition(".")
+        definitions = modules.get(module_name)
+        if definitions is None:
+            resolved[qualified_name] = _is_imported_table(module_name, name)
+        elif name in definitions.classes:
+            resolved[qualified_name] = _any_table(
+                [is_table(base) for base in definitions.classes[name]]
+            )
+        elif name in definitions.imports:
+            resolved[qualified_name] = is_table(definitions.imports[name])
+        return resolved[qualified_name]
+
+    table_classes = {}
+    for module_name, definitions in modules.items():
+        class_names = [
+            class_name
+            for class_name in definitions.classes
+            if is_table(f"{module_name}.{class_name}") is not False
+        ]
+        if class_names:
+            table_classes[module_name] = class_names
+
+    return table_classes
+
+
+def _is_imported_table(module_name: str, name: str) -> Optional[bool]:
+    """
+    Check if a class of a module outside root_path is a table, without importing
+    the module. Return None, if the module has not been imported.
+    """
+    module = sys.modules.get(module_name)
+    if module is None:
+        return None
+    attribute = getattr(module, name, None)
+    return inspect.isclass(attribute) and issubclass(
+        attribute, BigqueryTable  # type: ignore
+    )
+
+
+def _any_table(bases: List[Optional[bool]]) -> Optional[bool]:
+    """
+    A class is a table, if any base is, and might be one, if any base might be.
+    """
+    if any(bases):
+        return True
+    if None in bases:
+        return None
+    return False
+
+
+def _load_manifest(manifest_path: str) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(manifest_path, encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return {}
+
+    if manifest.get("version") != _MANIFEST_VERSION:
+        return {}
+    return manifest["modules"]
+
+
+def _write_manifest(manifest_path: str, entries: Dict[str, Dict[str, Any]]) -> None:
+    directory = path.dirname(path.abspath(manifest_path))
+    os.makedirs(directory, exist_ok=True)
+    file_descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(file_descriptor, "w", encoding="utf-8") as manifest_file:
+        json.dump({"version": _MANIFEST_VERSION, "modules": entries}, manifest_file)
+    os.replace(temporary_path, manifest_path)
+
+
+def _manifest_entry(
+    entry: Optional[Dict[str, Any]], module_name: str, file_path: str, is_pkg: bool
+) -> Dict[str, Any]:
+    """
+    Return the cached entry of a module, if its file has not changed, otherwise
+    parse the module again.
+    """
+    stat = os.stat(file_path)
+    if entry and (entry["module_name"], entry["is_pkg"]) != (module_name, is_pkg):
+        entry = None
+    if entry and (entry["mtime_ns"], entry["size"]) == (stat.st_mtime_ns, stat.st_size):
+        return entry
+
+    with open(file_path, "rb") as module_file:
+        source = module_file.read()
+    content_hash = hashlib.sha256(source).hexdigest()
+    if entry and entry["sha256"] == content_hash:
+        return {**entry, "mtime_ns": stat.st_mtime_ns}
+
+    return {
+        "module_name": module_name,
+        "is_pkg": is_pkg,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha256": content_hash,
+        **asdict(_parse_module(module_name, file_path, source, is_pkg)),
+    }
+
+
+def _parse_module(
+    module_name: str, file_path: str, source: bytes, is_pkg: bool
+) -> _ModuleDefinitions:
+    tree = ast.parse(source, filename=file_path)
+
+    package = module_name if is_pkg else module_name.rpartition(".")[0]
+    definitions = _ModuleDefinitions()
+    for statement in _top_level_statements(tree.body):
+        if isinstance(statement, ast.Import):
+            for alias in statement.names:
+                if alias.asname:
+                    definitions.imports[alias.asname] = alias.name
+                else:
+                    top_level_name = alias.name.split(".")[0]
+                    definitions.imports[top_level_name] = top_level_name
+        elif isinstance(statement, ast.ImportFrom):
+            imported_module = _import_source(package, statement)
+            for alias in statement.names:
+                definitions.imports[
+                    alias.asname or alias.name
+                ] = f"{imported_module}.{alias.name}"
+        elif isinstance(statement, ast.ClassDef):
+            definitions.classes[statement.name] = [
+                base_name
+                for base_name in (
+                    _qualified_name(module_name, definitions, base)
+                    for base in statement.bases
                 )
-            ):
+                if base_name
+            ]
 
-                yield attribute()
+    return definitions
+
+
+def _top_level_statements(body: List[ast.stmt]) -> Iterator[ast.stmt]:
+    """
+    Yield the statements, which are executed on import, including those in
+    if and try blocks.
+    """
+    for statement in body:
+        if isinstance(statement, ast.If):
+            yield from _top_level_statements(statement.body)
+            yield from _top_level_statements(statement.orelse)
+        elif isinstance(statement, ast.Try):
+            yield from _top_level_statements(statement.body)
+            for handler in statement.handlers:
+                yield from _top_level_statements(handler.body)
+            yield from _top_level_statements(statement.orelse)
+            yield from _top_level_statements(statement.finalbody)
+        else:
+            yield statement
+
+
+def _import_source(package: str, statement: ast.ImportFrom) -> str:
+    if not statement.level:
+        return statement.module or ""
+
+    parts = package.split(".")
+    parent = ".".join(parts[: len(parts) - statement.level + 1])
+    return f"{parent}.{statement.module}" if statement.module else parent
+
+
+def _qualified_name(
+    module_name: str, definitions: _ModuleDefinitions, node: ast.expr
+) -> Optional[str]:
+    """
+    Resolve a name like Table or module.Table to its fully qualified name.
+    """
+    attributes = []
+    while isinstance(node, ast.Attribute):
+        attributes.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+
+    if node.id in definitions.imports:
+        qualified_name = definitions.imports[node.id]
+    elif node.id in definitions.classes:
+        qualified_name = f"{module_name}.{node.id}"
+    else:
+        return None
+
+    return ".".join([qualified_name, *reversed(attributes)])
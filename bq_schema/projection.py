@@ -0,0 +1,125 @@
+"""
+Generate queries, which select only the columns of a view of a table schema,
+to scan fewer bytes than SELECT *.
+"""
+from typing import Any, Dict, Iterator, List
+
+from google.cloud.bigquery import SchemaField
+from google.cloud.bigquery.schema import _STRUCT_TYPES, LEGACY_TO_STANDARD_TYPES
+
+
+def projection_sql(
+    table_schema: List[SchemaField],
+    view_schema: List[SchemaField],
+    table_identifier: str,
+) -> str:
+    """
+    Return a query, which selects the columns of view_schema from the table.
+
+    view_schema has to be a subset of table_schema: every field has to exist in
+    the table with the same type. REQUIRED fields of the view have to be
+    REQUIRED in the table and REPEATED fields REPEATED. STRUCT columns, of which
+    only some fields are part of the view, are rebuilt from these fields, so
+    only they are scanned. The order of REPEATED STRUCT values is kept.
+    """
+    errors = list(_projection_errors(table_schema, view_schema, ""))
+    if errors:
+        raise ValueError(f"The view does not match the table: {'; '.join(errors)}")
+
+    table_fields = _by_name(table_schema)
+    columns = [_select(table_fields[field.name], field, "", 0) for field in view_schema]
+    return "\n".join(
+        [
+            "SELECT",
+            ",\n".join(f"  {column}" for column in columns),
+            f"FROM `{table_identifier}`",
+        ]
+    )
+
+
+def _projection_errors(
+    table_schema: List[SchemaField], view_schema: List[SchemaField], prefix: str
+) -> Iterator[str]:
+    table_fields = _by_name(table_schema)
+    for field in view_schema:
+        path = f"{prefix}{field.name}"
+        table_field = table_fields.get(field.name)
+        if table_field is None:
+            yield f"{path} does not exist"
+            continue
+        if _standard_type(field) != _standard_type(table_field):
+            yield (
+                f"{path} is {_name(table_field.field_type)}, "
+                f"not {_name(field.field_type)}"
+            )
+            continue
+        if (field.mode == "REPEATED") != (table_field.mode == "REPEATED") or (
+            field.mode == "REQUIRED" and table_field.mode != "REQUIRED"
+        ):
+            yield f"{path} is {_name(table_field.mode)}, not {_name(field.mode)}"
+            continue
+        if field.field_type in _STRUCT_TYPES:
+            yield from _projection_errors(table_field.fields, field.fields, f"{path}.")
+
+
+def _select(table_field: SchemaField, field: SchemaField, base: str, depth: int) -> str:
+    """
+    Return the expression, which selects the field relative to base, with an alias.
+    """
+    name = _quote(field.name)
+    column = f"{base}.{name}" if base else name
+    if field.field_type not in _STRUCT_TYPES or _selects_all(table_field, field):
+        return f"{column} AS {name}" if base else column
+
+    table_fields = _by_name(table_field.fields)
+    if field.mode == "REPEATED":
+        item = f"_item{depth}"
+        struct = ", ".join(
+            _select(table_fields[nested.name], nested, item, depth + 1)
+            for nested in field.fields
+        )
+        expression = (
+            f"ARRAY(SELECT AS STRUCT {struct} FROM UNNEST({column}) AS {item} "
+            f"WITH OFFSET AS {item}_offset ORDER BY {item}_offset)"
+        )
+    else:
+        struct = ", ".join(
+            _select(table_fields[nested.name], nested, column, depth)
+            for nested in field.fields
+        )
+        expression = f"STRUCT({struct})"
+        if table_field.mode != "REQUIRED":
+            expression = f"IF({column} IS NULL, NULL, {expression})"
+    return f"{expression} AS {name}"
+
+
+def _selects_all(table_field: SchemaField, field: SchemaField) -> bool:
+    """
+    Check if the view of a STRUCT field contains all fields of the table.
+    """
+    if field.field_type not in _STRUCT_TYPES:
+        return True
+    view_fields = _by_name(field.fields)
+    return len(view_fields) == len(table_field.fields) and all(
+        nested.name in view_fields and _selects_all(nested, view_fields[nested.name])
+        for nested in table_field.fields
+    )
+
+
+def _by_name(schema: List[SchemaField]) -> Dict[str, SchemaField]:
+    return {field.name: field for field in schema}
+
+
+def _standard_type(field: SchemaField) -> object:
+    return LEGACY_TO_STANDARD_TYPES.get(field.field_type, field.field_type)
+
+
+def _name(value: Any) -> str:
+    """
+    Return the name of a type or mode, which might be an enum member.
+    """
+    return getattr(value, "value", value)
+
+
+def _quote(name: str) -> str:
+    return f"`{name}`"
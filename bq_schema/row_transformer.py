@@ -1,29 +1,263 @@
-from dataclasses import asdict
-from typing import Generic, Type, TypeVar
+import threading
+from queue import Full, Queue
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
-from dacite import Config, from_dict
-from google.cloud.bigquery.table import Row
+from bq_schema.codec.decoder import compile_decoder
+from bq_schema.codec.encoder import compile_encoder
+from bq_schema.codec.lazy import compile_lazy_decoder
+from bq_schema.codec.record import (
+    compile_record_converter,
+    compile_record_decoder,
+    record_type,
+)
+
+if TYPE_CHECKING:
+    import pyarrow as pa
+    from google.cloud.bigquery.table import Row, RowIterator
 
 T = TypeVar("T")  # pylint: disable=invalid-name
 
+_DONE = object()
+
 
 class RowTransformer(Generic[T]):
     """
     Serialized / deserialize rows.
     """
 
-    def __init__(self, schema: Type[T]):
+    def __init__(self, schema: Type[T], lazy: bool = False):
+        """
+        With lazy, nested STRUCT and REPEATED STRUCT fields are decoded on
+        first access, which is cheaper for rows, whose nested fields are rarely
+        read. The instances are of a subclass of the dataclass.
+        """
         self._schema: Type[T] = schema
+        self._decoder = (
+            compile_lazy_decoder(schema) if lazy else compile_decoder(schema)
+        )
 
-    def bq_row_to_dataclass_instance(self, bq_row: Row) -> T:
+    def bq_row_to_dataclass_instance(self, bq_row: "Row") -> T:
         """
         Create a dataclass instance from a row returned by the bq library.
+
+        Dicts with the same structure are accepted as well.
+        """
+        return self._decoder(bq_row)
+
+    @property
+    def record_type(self) -> Type[Tuple]:
+        """
+        The NamedTuple, into which bq_row_to_record decodes rows.
         """
-        return from_dict(self._schema, bq_row, config=Config(check_types=False))
+        return record_type(self._schema)
+
+    def bq_row_to_record(self, bq_row: "Row") -> Tuple:
+        """
+        Create a record from a row returned by the bq library.
+
+        A record is a NamedTuple with the fields of the dataclass, which is
+        smaller and faster to create than a dataclass instance.
+        """
+        return compile_record_decoder(self._schema)(bq_row)
+
+    def record_to_dataclass_instance(self, record: Tuple) -> T:
+        """
+        Convert a record of bq_row_to_record into a dataclass instance.
+        """
+        return compile_record_converter(self._schema)(record)
 
     @staticmethod
     def dataclass_instance_to_bq_row(instance: T) -> dict:
         """
         Convert a dataclass instance into a dictionary, which can be inserted into bq.
+
+        The encoder is compiled on first use and cached per dataclass.
+        """
+        return compile_encoder(type(instance))(instance)
+
+    @staticmethod
+    def dataclass_instance_to_json_row(instance: T) -> dict:
+        """
+        Convert a dataclass instance into a dictionary of JSON values,
+        which can be passed to insert_rows_json without further conversion.
+        """
+        # pylint: disable=import-outside-toplevel
+        from bq_schema.codec.json_encoder import compile_json_encoder
+
+        return compile_json_encoder(type(instance))(instance)
+
+    @staticmethod
+    def write_ndjson(
+        instances: Iterable[T], file_obj: IO[bytes], compress: bool = True
+    ) -> int:
+        """
+        Write dataclass instances as gzip compressed, newline delimited JSON into
+        a binary file, e.g. for load_table_from_file. Return the number of rows.
+        """
+        # pylint: disable=import-outside-toplevel
+        from bq_schema.codec.json_encoder import write_ndjson
+
+        return write_ndjson(instances, file_obj, compress=compress)
+
+    def iter_instances(
+        self, row_iterator: "RowIterator", prefetch: int = 1
+    ) -> Iterator[T]:
+        """
+        Lazily deserialize all rows of a query result, one page at a time.
+
+        While a page is deserialized, the next pages are fetched on a background
+        thread. Set prefetch to 0 to fetch the pages on the calling thread.
+        """
+        for page in self._iter_pages(row_iterator, prefetch):
+            yield from page
+
+    def iter_records(
+        self, row_iterator: "RowIterator", prefetch: int = 1
+    ) -> Iterator[Tuple]:
+        """
+        Lazily deserialize all rows of a query result into records,
+        one page at a time.
+        """
+        decoder = compile_record_decoder(self._schema)
+        for page in self._iter_pages(row_iterator, prefetch, decoder):
+            yield from page
+
+    def iter_batches(
+        self, row_iterator: "RowIterator", batch_size: int, prefetch: int = 1
+    ) -> Iterator[List[T]]:
+        """
+        Lazily deserialize all rows of a query result into lists of batch_size.
+
+        The last batch contains the remaining rows and might be smaller.
+        """
+        if batch_size < 1:
+            raise ValueError("The batch size has to be at least 1.")
+
+        batch: List[T] = []
+        for page in self._iter_pages(row_iterator, prefetch):
+            start = 0
+            while start < len(page):
+                end = start + batch_size - len(batch)
+                batch.extend(page[start:end])
+                start = end
+                if len(batch) == batch_size:
+                    yield batch
+                    batch = []
+
+        if batch:
+            yield batch
+
+    def parallel_decode(
+        self,
+        row_iterator: Union["RowIterator", Iterable[Iterable[Any]]],
+        workers: Optional[int] = None,
+        ordered: bool = True,
+        max_pending_pages: Optional[int] = None,
+    ) -> Iterator[T]:
+        """
+        Deserialize all pages of a query result in a pool of worker processes,
+        by default one per cpu. Any iterable of pages of rows is accepted as well.
+
+        The instances are yielded in the order of the pages, unless ordered is
+        False. At most max_pending_pages, by default two per worker, are held in
+        memory at a time. The dataclass has to be importable by the workers.
         """
-        return asdict(instance)
+        # pylint: disable=import-outside-toplevel
+        from bq_schema.codec.parallel import parallel_decode
+
+        return parallel_decode(
+            self._schema, row_iterator, workers, ordered, max_pending_pages
+        )
+
+    def arrow_record_batch_to_dataclass_instances(
+        self, record_batch: "pa.RecordBatch"
+    ) -> List[T]:
+        """
+        Create dataclass instances from a pyarrow record batch, column by column.
+
+        Requires pyarrow: pip install bq-schema[arrow]
+        """
+        # pylint: disable=import-outside-toplevel
+        from bq_schema.codec.arrow import compile_arrow_decoder
+
+        return compile_arrow_decoder(self._schema)(record_batch)
+
+    def iter_arrow_instances(
+        self, record_batches: Iterable["pa.RecordBatch"]
+    ) -> Iterator[T]:
+        """
+        Lazily create dataclass instances from record batches,
+        e.g. from RowIterator.to_arrow_iterable().
+        """
+        for record_batch in record_batches:
+            yield from self.arrow_record_batch_to_dataclass_instances(record_batch)
+
+    def _iter_pages(
+        self,
+        row_iterator: "RowIterator",
+        prefetch: int,
+        decoder: Optional[Callable[[Any], Any]] = None,
+    ) -> Iterator[List[Any]]:
+        decoder = decoder or self._decoder
+        pages: Iterable[Iterable["Row"]] = row_iterator.pages
+        if prefetch > 0:
+            pages = _prefetch(pages, prefetch)
+
+        for page in pages:
+            yield [decoder(row) for row in page]
+
+
+def _prefetch(iterable: Iterable[Any], buffer_size: int) -> Iterator[Any]:
+    """
+    Consume an iterable on a background thread, buffering up to buffer_size items.
+
+    Exceptions of the iterable are raised in the calling thread. The background
+    thread stops, once the returned iterator is closed.
+    """
+    items: "Queue[Any]" = Queue(maxsize=buffer_size)
+    stopped = threading.Event()
+
+    def put(item: Any) -> bool:
+        while not stopped.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+    def produce() -> None:
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+        except Exception as error:  # pylint: disable=broad-except
+            put((_DONE, error))
+            return
+        put((_DONE, None))
+
+    threading.Thread(target=produce, name="bq-schema-prefetch", daemon=True).start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stopped.set()
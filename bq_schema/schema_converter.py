@@ -1,14 +1,15 @@
 """
 Convert a bigquery schema into the source code for a data class.
 """
-from typing import List
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from google.cloud.bigquery import SchemaField
 
 from .types import BigQueryFieldModes, BigQueryTypes, TypeMapping
 
 _TEMPLATE_DATACLASS = """
-@dataclass
+@{decorator}
 class {schema_name}:
 {fields}
 """
@@ -21,32 +22,98 @@ _TEMPLATE_FIELD_WITH_DESCRIPTION = (
 _STRUCT_TYPES = {"RECORD", "STRUCT"}
 
 
-def schema_to_dataclass(schema_name: str, schema: List[SchemaField]) -> str:
+def schema_to_dataclass(
+    schema_name: str,
+    schema: List[SchemaField],
+    slots: bool = False,
+    frozen: bool = False,
+) -> str:
     """
     Convert a list of schema fields, our schema, into a dataclass.
-    """
 
-    struct_fields = [s for s in schema if s.field_type in _STRUCT_TYPES]
-    nested_dataclasses = "".join(
-        schema_to_dataclass(s.name, s.fields) for s in struct_fields
+    Nested structs are emitted once per structure, before the first dataclass
+    using them. Different structs with the same name are numbered. slots and
+    frozen are passed to the dataclass decorator, slots requires python 3.10.
+    """
+    if slots and sys.version_info < (3, 10):
+        raise ValueError("Dataclasses with slots require python 3.10 or newer.")
+
+    options = [
+        f"{name}=True"
+        for name, value in [("frozen", frozen), ("slots", slots)]
+        if value
+    ]
+    decorator = f"dataclass({', '.join(options)})" if options else "dataclass"
+    dataclasses: Dict[Tuple, Tuple[str, str]] = {}
+    _add_dataclass(schema_name, schema, decorator, dataclasses)
+    python_dataclasses = [
+        python_dataclass for _, python_dataclass in dataclasses.values()
+    ]
+    if len(python_dataclasses) == 1:
+        return f"{python_dataclasses[0]}\n"
+    return "\n\n".join(python_dataclasses)
+
+
+def _add_dataclass(
+    schema_name: str,
+    schema: Sequence[SchemaField],
+    decorator: str,
+    dataclasses: Dict[Tuple, Tuple[str, str]],
+) -> str:
+    """
+    Add the dataclass of a schema and its nested structs, unless a struct with
+    the same structure has been added already. Return the name of the dataclass.
+    """
+    key = _structure(schema)
+    if key in dataclasses:
+        return dataclasses[key][0]
+
+    dataclass_fields = []
+    for field in schema:
+        struct_name = None
+        if field.field_type in _STRUCT_TYPES:
+            struct_name = _add_dataclass(
+                field.name, field.fields, decorator, dataclasses
+            )
+        dataclass_fields.append(_create_field(field, struct_name))
+
+    names = {name for name, _ in dataclasses.values()}
+    base_name = name = _generate_dataclass_name(schema_name)
+    number = 2
+    while name in names:
+        name = f"{base_name}{number}"
+        number += 1
+    dataclasses[key] = (
+        name,
+        _TEMPLATE_DATACLASS.format(
+            decorator=decorator,
+            schema_name=name,
+            fields="\n".join(dataclass_fields),
+        ).strip(),
     )
-    dataclass_fields = [_create_field(field) for field in schema]
-    python_dataclass = _TEMPLATE_DATACLASS.format(
-        schema_name=_generate_dataclass_name(schema_name),
-        fields="\n".join(dataclass_fields),
-    ).strip()
+    return name
 
-    return (
-        f"{nested_dataclasses}\n{python_dataclass}"
-        if nested_dataclasses
-        else f"{python_dataclass}\n"
+
+def _structure(schema: Sequence[SchemaField]) -> Tuple:
+    """
+    Return a key, which is equal for structs emitted as the same dataclass.
+    """
+    return tuple(
+        (
+            field.name,
+            field.field_type,
+            field.mode,
+            field.description,
+            _structure(field.fields),
+        )
+        for field in schema
     )
 
 
-def _create_field(field: SchemaField) -> str:
+def _create_field(field: SchemaField, struct_name: Optional[str]) -> str:
     bigquery_type = BigQueryTypes[field.field_type]
     if bigquery_type == BigQueryTypes.STRUCT:
-        dataclass_type = _generate_dataclass_name(field.name)
+        dataclass_type = struct_name or _generate_dataclass_name(field.name)
     else:
         dataclass_type = TypeMapping[bigquery_type].__name__
 
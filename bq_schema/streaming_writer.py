@@ -0,0 +1,254 @@
+"""
+Stream rows into a bigquery table with batched, concurrent insertAll requests.
+"""
+import hashlib
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, is_dataclass
+from functools import partial
+from typing import Any, Callable, Dict, Generic, Iterable, List, Optional, TypeVar
+
+from google.cloud.bigquery import Client, SchemaField
+from google.cloud.bigquery._helpers import _record_field_to_json
+
+from bq_schema.migration.retry import RetryPolicy
+from bq_schema.row_transformer import RowTransformer
+
+T = TypeVar("T")  # pylint: disable=invalid-name
+
+# Limits of a single insertAll request.
+MAX_REQUEST_BYTES = 10 * 1024 * 1024
+MAX_REQUEST_ROWS = 50_000
+
+# Size of the request body without rows, the separator and the insertId of a row.
+_REQUEST_OVERHEAD = len(json.dumps({"rows": []}))
+_ROW_OVERHEAD = len(json.dumps({"insertId": "", "json": None})) - len("null") + 2
+# Rows with these errors have not been inserted and can be sent again. Rows
+# are stopped, if another row of the same request is invalid.
+_RETRYABLE_REASONS = {
+    "backendError",
+    "internalError",
+    "rateLimitExceeded",
+    "stopped",
+    "timeout",
+}
+
+
+@dataclass
+class FailedRow(Generic[T]):
+    row: T
+    insert_id: str
+    errors: List[Dict[str, Any]]
+
+
+@dataclass
+class BatchResult(Generic[T]):
+    """
+    Report of one batch, after all its rows have been inserted or have failed.
+    """
+
+    rows: int
+    payload_bytes: int
+    requests: int
+    retried_rows: int
+    duration: float
+    failed_rows: List[FailedRow[T]] = field(default_factory=list)
+
+
+@dataclass
+class _PendingRow(Generic[T]):
+    row: T
+    json_row: Dict[str, Any]
+    insert_id: str
+    size: int
+
+
+def random_insert_id(_: Dict[str, Any]) -> str:
+    """
+    Create a random insertId, which is reused when the row is retried.
+    """
+    return str(uuid.uuid4())
+
+
+def content_insert_id(json_row: Dict[str, Any]) -> str:
+    """
+    Derive the insertId from the content of a row, so that sending the same row
+    again is deduplicated by bigquery, even by another writer. Equal rows are
+    deduplicated as well.
+    """
+    content = json.dumps(json_row, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+# pylint: disable=too-many-instance-attributes
+class StreamingWriter(Generic[T]):
+    """
+    Insert dataclass instances or dicts into a table with the streaming api.
+
+    Rows are serialized with RowTransformer and packed into requests of up to
+    max_request_bytes and max_request_rows. Up to concurrency requests are sent
+    in parallel, write blocks while max_pending_batches are waiting. Requests
+    failing due to rate limits or transient errors are retried according to the
+    retry policy, rows failing within a request are retried on their own.
+
+    Every row gets a random insertId, which is sent with every retry of the row,
+    so bigquery drops duplicates of retried requests. Pass insert_id to derive
+    it from the row instead, e.g. content_insert_id or a key of the row.
+
+    on_batch is called with a BatchResult from the sending thread, once a batch
+    is done. Rows, which could not be inserted, are collected in failed_rows.
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        client: Client,
+        table_identifier: str,
+        schema: List[SchemaField],
+        max_request_bytes: int = MAX_REQUEST_BYTES - 512 * 1024,
+        max_request_rows: int = MAX_REQUEST_ROWS,
+        concurrency: int = 4,
+        max_pending_batches: Optional[int] = None,
+        retry_policy: RetryPolicy = RetryPolicy(),
+        insert_id: Callable[[Dict[str, Any]], str] = random_insert_id,
+        on_batch: Optional[Callable[[BatchResult[T]], None]] = None,
+    ):
+        self._client = client
+        self._table_identifier = table_identifier
+        self._schema = schema
+        self._max_request_bytes = max_request_bytes
+        self._max_request_rows = max_request_rows
+        self._retry_policy = retry_policy
+        self._insert_id = insert_id
+        self._on_batch = on_batch
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="bq-schema-writer"
+        )
+        self._pending_batches = threading.BoundedSemaphore(
+            max_pending_batches or 2 * concurrency
+        )
+        self._futures: List[Future] = []
+        self._lock = threading.Lock()
+        self._batch: List[_PendingRow[T]] = []
+        self._batch_bytes = _REQUEST_OVERHEAD
+        self.failed_rows: List[FailedRow[T]] = []
+
+    def __enter__(self) -> "StreamingWriter[T]":
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def write(self, row: T) -> None:
+        """
+        Add a row to the current batch, which is sent once it is full.
+        """
+        json_row = (
+            RowTransformer.dataclass_instance_to_json_row(row)
+            if is_dataclass(row)
+            else _record_field_to_json(self._schema, row)
+        )
+        insert_id = self._insert_id(json_row)
+        size = len(json.dumps(json_row)) + len(insert_id) + _ROW_OVERHEAD
+        if size + _REQUEST_OVERHEAD > self._max_request_bytes:
+            error = {"reason": "invalid", "message": "Row exceeds the request size."}
+            with self._lock:
+                self.failed_rows.append(FailedRow(row, insert_id, [error]))
+            return
+
+        if (
+            self._batch_bytes + size > self._max_request_bytes
+            or len(self._batch) >= self._max_request_rows
+        ):
+            self.flush()
+        self._batch.append(_PendingRow(row, json_row, insert_id, size))
+        self._batch_bytes += size
+
+    def write_many(self, rows: Iterable[T]) -> None:
+        for row in rows:
+            self.write(row)
+
+    def flush(self) -> None:
+        """
+        Send the current batch, without waiting for the response.
+        """
+        if not self._batch:
+            return
+
+        batch, payload_bytes = self._batch, self._batch_bytes
+        self._batch, self._batch_bytes = [], _REQUEST_OVERHEAD
+        self._pending_batches.acquire()  # pylint: disable=consider-using-with
+        future = self._executor.submit(self._send, batch, payload_bytes)
+        future.add_done_callback(lambda _: self._pending_batches.release())
+        self._futures.append(future)
+
+    def close(self) -> None:
+        """
+        Send the remaining rows and wait until all batches are done.
+        """
+        self.flush()
+        try:
+            for future in self._futures:
+                future.result()
+        finally:
+            self._executor.shutdown()
+            self._futures.clear()
+
+    def _send(self, batch: List[_PendingRow[T]], payload_bytes: int) -> None:
+        start = time.monotonic()
+        result: BatchResult[T] = BatchResult(
+            rows=len(batch),
+            payload_bytes=payload_bytes,
+            requests=0,
+            retried_rows=0,
+            duration=0.0,
+        )
+        rows = batch
+        backoff = self._retry_policy.backoff()
+        while rows:
+            result.requests += 1
+            try:
+                errors = self._retry_policy.call(
+                    partial(
+                        self._client.insert_rows_json,
+                        self._table_identifier,
+                        [row.json_row for row in rows],
+                        row_ids=[row.insert_id for row in rows],
+                    )
+                )
+            except Exception as error:  # pylint: disable=broad-except
+                result.failed_rows.extend(
+                    FailedRow(row.row, row.insert_id, [_error_details(error)])
+                    for row in rows
+                )
+                break
+
+            delay = next(backoff, None)
+            retry_rows = []
+            for row_errors in errors:
+                row = rows[row_errors["index"]]
+                reasons = {error.get("reason") for error in row_errors["errors"]}
+                if delay is not None and reasons <= _RETRYABLE_REASONS:
+                    retry_rows.append(row)
+                else:
+                    result.failed_rows.append(
+                        FailedRow(row.row, row.insert_id, row_errors["errors"])
+                    )
+            if retry_rows:
+                result.retried_rows += len(retry_rows)
+                time.sleep(delay or 0)
+            rows = retry_rows
+
+        result.duration = time.monotonic() - start
+        if result.failed_rows:
+            with self._lock:
+                self.failed_rows.extend(result.failed_rows)
+        if self._on_batch:
+            self._on_batch(result)
+
+
+def _error_details(error: Exception) -> Dict[str, Any]:
+    return {"reason": type(error).__name__, "message": str(error)}
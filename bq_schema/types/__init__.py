@@ -1,3 +1,3 @@
 from .big_query_field_modes import BigQueryFieldModes
 from .big_query_types import BigQueryTypes
-from .type_mapping import Timestamp, TypeMapping
+from .type_mapping import PythonTypeMapping, Timestamp, TypeMapping
@@ -21,3 +21,7 @@ TypeMapping: Dict[BigQueryTypes, Type] = {
     BigQueryTypes.DATETIME: datetime,
     BigQueryTypes.GEOGRAPHY: Geography,
 }
+
+PythonTypeMapping: Dict[Type, BigQueryTypes] = {
+    python_type: bq_type for bq_type, python_type in TypeMapping.items()
+}
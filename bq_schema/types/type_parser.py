@@ -1,6 +1,9 @@
-from typing import Any, Type
+from dataclasses import Field, fields
+from typing import Any, Optional, Tuple, Type, Union, get_type_hints
 
-from typing_extensions import get_args
+from typing_extensions import get_args, get_origin
+
+from .big_query_field_modes import BigQueryFieldModes
 
 _NoneType = type(None)
 
@@ -16,3 +19,30 @@ def parse_inner_type_of_optional(optional_type: Any) -> Type:
         raise TypeError(f"Unsupported type: {optional_type}.")
 
     return next(arg for arg in args if arg is not _NoneType)
+
+
+def parse_field_type(field_type: Any) -> Tuple[BigQueryFieldModes, Type]:
+    """
+    Split a type hint into the field mode and the type of the values.
+    """
+    # typing.Optional is the same as typing.Union[SomeType, NoneType]
+    if get_origin(field_type) is Union:
+        return BigQueryFieldModes.NULLABLE, parse_inner_type_of_optional(field_type)
+
+    if get_origin(field_type) is list:
+        return BigQueryFieldModes.REPEATED, parse_inner_type_of_list(field_type)
+
+    return BigQueryFieldModes.REQUIRED, field_type
+
+
+def resolve_dataclass_fields(
+    dataclass: Type, localns: Optional[dict] = None
+) -> Tuple[Field, ...]:
+    """
+    Return the fields of a dataclass, with forward references resolved.
+    """
+    type_hints = get_type_hints(dataclass, localns=localns)
+    dataclass_fields = fields(dataclass)
+    for field in dataclass_fields:
+        field.type = type_hints[field.name]
+    return dataclass_fields
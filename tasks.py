@@ -27,6 +27,18 @@ def test(context):
     )
 
 
+@task
+def benchmark(context, compare=False):
+    """
+    Run and store the benchmarks. With --compare, fail if they are slower than
+    the last stored run.
+    """
+    options = "--benchmark-autosave"
+    if compare:
+        options += " --benchmark-compare --benchmark-compare-fail=median:20%"
+    context.run(f"pytest benchmarks {options}")
+
+
 @task
 def format_code(context):
     context.run("black .")
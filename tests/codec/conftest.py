@@ -0,0 +1,101 @@
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from typing import List, Optional
+
+import pytest
+
+from bq_schema.types.type_mapping import Geography, Timestamp
+
+
+@dataclass
+class Nested:
+    int_field: int
+    optional_field: Optional[str]
+    repeated_field: List[str]
+
+
+# pylint: disable=too-many-instance-attributes
+@dataclass
+class Schema:
+    string_field: str
+    bytes_field: bytes
+    int_field: int
+    float_field: float
+    numeric_field: Decimal
+    bool_field: bool
+    timestamp_field: Timestamp
+    date_field: date
+    time_field: time
+    datetime_field: datetime
+    geography_field: Geography
+    optional_numeric_field: Optional[Decimal]
+    repeated_int_field: List[int]
+    nested_field: Nested
+    optional_nested_field: Optional[Nested]
+    repeated_nested_field: List[Nested]
+
+
+def _nested(i: int) -> Nested:
+    return Nested(
+        int_field=i,
+        optional_field=None if i % 2 else str(i),
+        repeated_field=[str(j) for j in range(i % 3)],
+    )
+
+
+def _instance(i: int) -> Schema:
+    """
+    Every instance has other values, odd ones leave the optional fields empty.
+    """
+    return Schema(
+        string_field=f"string_{i}",
+        bytes_field=b"\x00bytes",
+        int_field=i,
+        float_field=i + 0.5,
+        numeric_field=Decimal("1.000000001") + i,
+        bool_field=i % 2 == 1,
+        timestamp_field=Timestamp(
+            datetime(2020, 1, 1, 12, 0, 0, i, tzinfo=timezone.utc)
+        ),
+        date_field=date(2020, 1, i + 1),
+        time_field=time(12, 30, 1, i),
+        datetime_field=datetime(2020, 1, 1, i),
+        geography_field=Geography(f"POINT({i} 1)"),
+        optional_numeric_field=None if i % 2 else Decimal(i),
+        repeated_int_field=list(range(i % 4)),
+        nested_field=_nested(i),
+        optional_nested_field=None if i % 2 else _nested(i + 1),
+        repeated_nested_field=[_nested(j) for j in range(i % 3)],
+    )
+
+
+@pytest.fixture(name="nested_schema")
+def fixture_nested_schema():
+    return Nested
+
+
+@pytest.fixture(name="schema")
+def fixture_schema():
+    return Schema
+
+
+@pytest.fixture(name="instances")
+def fixture_instances():
+    return [_instance(i) for i in range(5)]
+
+
+@pytest.fixture(name="instance")
+def fixture_instance():
+    """
+    An instance with all optional fields set to None.
+    """
+    return _instance(1)
+
+
+@pytest.fixture(name="row")
+def fixture_row(instance):
+    """
+    The instance as a row from the bigquery client.
+    """
+    return asdict(instance)
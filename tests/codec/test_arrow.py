@@ -0,0 +1,98 @@
+import sys
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+import pytest
+
+from bq_schema.dataclass_converter import clear_schema_cache
+from bq_schema.row_transformer import RowTransformer
+
+pa = pytest.importorskip("pyarrow")
+
+# pylint: disable=wrong-import-position
+from bq_schema.codec.arrow import (  # isort:skip
+    compile_arrow_decoder,
+    dataclass_to_arrow_schema,
+)
+
+
+def _record_batch(instances: List[Any]) -> "pa.RecordBatch":
+    schema = type(instances[0])
+    rows = [RowTransformer.dataclass_instance_to_bq_row(i) for i in instances]
+    return pa.RecordBatch.from_pylist(rows, schema=dataclass_to_arrow_schema(schema))
+
+
+def test_decode_record_batch(schema, instances):
+    row_transformer = RowTransformer(schema)
+    decoded = row_transformer.arrow_record_batch_to_dataclass_instances(
+        _record_batch(instances)
+    )
+    assert decoded == instances
+
+
+def test_decode_sliced_record_batch(schema, instances):
+    record_batch = _record_batch(instances).slice(2, 2)
+    assert compile_arrow_decoder(schema)(record_batch) == instances[2:4]
+
+
+def test_iter_arrow_instances(schema, instances):
+    record_batches = [_record_batch(instances[:2]), _record_batch(instances[2:])]
+    row_transformer = RowTransformer(schema)
+    assert list(row_transformer.iter_arrow_instances(record_batches)) == instances
+
+
+def test_decode_missing_optional_column():
+    @dataclass
+    class OptionalSchema:
+        int_field: int
+        optional_field: Optional[str]
+
+    record_batch = pa.RecordBatch.from_pydict({"int_field": [1, 2]})
+    assert compile_arrow_decoder(OptionalSchema)(record_batch) == [
+        OptionalSchema(1, None),
+        OptionalSchema(2, None),
+    ]
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="kw_only requires 3.10")
+def test_decode_keyword_only_fields():
+    @dataclass(kw_only=True)  # pylint: disable=unexpected-keyword-arg
+    class KeywordOnly:
+        int_field: int
+        optional_field: Optional[str]
+
+    record_batch = pa.RecordBatch.from_pydict(
+        {"int_field": [1, 2], "optional_field": ["a", None]}
+    )
+    assert compile_arrow_decoder(KeywordOnly)(record_batch) == [
+        KeywordOnly(int_field=1, optional_field="a"),
+        KeywordOnly(int_field=2, optional_field=None),
+    ]
+
+
+def test_decode_missing_required_column(nested_schema):
+    record_batch = pa.RecordBatch.from_pydict({"repeated_field": [["a"]]})
+    with pytest.raises(KeyError):
+        compile_arrow_decoder(nested_schema)(record_batch)
+
+
+def test_decode_mismatching_type(nested_schema):
+    record_batch = pa.RecordBatch.from_pydict(
+        {"int_field": ["1"], "repeated_field": [["a"]]}
+    )
+    with pytest.raises(TypeError):
+        compile_arrow_decoder(nested_schema)(record_batch)
+
+
+def test_decode_mismatching_mode(nested_schema):
+    record_batch = pa.RecordBatch.from_pydict(
+        {"int_field": [1], "repeated_field": ["a"]}
+    )
+    with pytest.raises(TypeError):
+        compile_arrow_decoder(nested_schema)(record_batch)
+
+
+def test_clear_schema_cache(schema):
+    decoder = compile_arrow_decoder(schema)
+    clear_schema_cache(schema)
+    assert compile_arrow_decoder(schema) is not decoder
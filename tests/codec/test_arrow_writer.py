@@ -0,0 +1,83 @@
+import pytest
+from google.cloud.bigquery import SchemaField
+
+from bq_schema.dataclass_converter import dataclass_to_schema
+from bq_schema.types import BigQueryTypes
+
+pa = pytest.importorskip("pyarrow")
+
+# pylint: disable=wrong-import-position
+from bq_schema.codec.arrow import (  # isort:skip
+    arrow_schema_to_schema,
+    compile_arrow_decoder,
+    dataclass_to_arrow_schema,
+    schema_to_arrow_schema,
+)
+from bq_schema.codec.arrow_writer import ArrowBatchWriter, ArrowFileFormat  # isort:skip
+
+
+@pytest.mark.parametrize("field_type", list(BigQueryTypes))
+@pytest.mark.parametrize("mode", ["REQUIRED", "NULLABLE", "REPEATED"])
+def test_arrow_schema_round_trip(field_type, mode):
+    fields = (
+        [SchemaField("nested", "INT64", "REQUIRED")]
+        if field_type == BigQueryTypes.STRUCT
+        else []
+    )
+    schema = [SchemaField("field", field_type, mode, fields=fields)]
+    assert arrow_schema_to_schema(schema_to_arrow_schema(schema)) == schema
+
+
+def test_dataclass_to_arrow_schema(schema):
+    arrow_schema = dataclass_to_arrow_schema(schema)
+    assert arrow_schema.field("timestamp_field").type == pa.timestamp("us", tz="UTC")
+    assert arrow_schema.field("numeric_field").type == pa.decimal128(38, 9)
+    assert arrow_schema_to_schema(arrow_schema) == dataclass_to_schema(schema)
+
+
+@pytest.mark.parametrize("file_format", list(ArrowFileFormat))
+def test_write_files(tmp_path, schema, instances, file_format):
+    with ArrowBatchWriter(
+        schema, str(tmp_path), file_format=file_format, batch_size=2, max_file_bytes=1
+    ) as writer:
+        writer.extend(instances)
+
+    assert len(writer.files) == 3
+    decoder = compile_arrow_decoder(schema)
+    decoded = []
+    for path in writer.files:
+        if file_format == ArrowFileFormat.PARQUET:
+            table = pa.parquet.read_table(path)
+        else:
+            table = pa.ipc.open_file(path).read_all()
+        assert table.schema.equals(writer.arrow_schema)
+        for record_batch in table.to_batches():
+            decoded.extend(decoder(record_batch))
+
+    assert decoded == instances
+
+
+def test_write_files_of_max_size(tmp_path, schema, instances):
+    with ArrowBatchWriter(schema, str(tmp_path), batch_size=2) as writer:
+        writer.extend(instances)
+
+    assert len(writer.files) == 1
+    table = pa.parquet.read_table(writer.files[0])
+    assert table.num_rows == len(instances)
+
+
+@pytest.mark.parametrize("max_file_bytes, completed_files", [(1, 1), (2**20, 0)])
+def test_discard_file_on_error(
+    tmp_path, schema, instances, max_file_bytes, completed_files
+):
+    with pytest.raises(ValueError):
+        with ArrowBatchWriter(
+            schema, str(tmp_path), batch_size=2, max_file_bytes=max_file_bytes
+        ) as writer:
+            writer.extend(instances[:3])
+            raise ValueError("failed")
+
+    assert len(writer.files) == completed_files
+    assert sorted(str(path) for path in tmp_path.iterdir()) == writer.files
+    for path in writer.files:
+        assert pa.parquet.read_table(path).num_rows == 2
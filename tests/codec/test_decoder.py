@@ -0,0 +1,85 @@
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+import pytest
+from google.cloud.bigquery.table import Row
+
+from bq_schema.codec.decoder import compile_decoder
+from bq_schema.codec.encoder import compile_encoder
+
+
+def test_decode_dict(schema, instances):
+    for instance in instances:
+        assert compile_decoder(schema)(compile_encoder(schema)(instance)) == instance
+
+
+def test_decode_missing_optional_values(schema, instance, row):
+    del row["optional_numeric_field"]
+    del row["nested_field"]["optional_field"]
+    assert compile_decoder(schema)(row) == instance
+
+
+def test_decode_row_round_trip(schema, instances):
+    for instance in instances:
+        row_as_dict = compile_encoder(schema)(instance)
+        row = Row(
+            values=list(row_as_dict.values()),
+            field_to_index={key: i for i, key in enumerate(row_as_dict)},
+        )
+        assert compile_decoder(schema)(row) == instance
+
+
+def test_decode_defaults(nested_schema):
+    @dataclass
+    class SchemaWithDefaults:
+        int_field: int
+        default_field: str = "default"
+        default_factory_field: List[nested_schema] = field(default_factory=list)
+        computed_field: int = field(default=0, init=False)
+
+    decoder = compile_decoder(SchemaWithDefaults)
+    assert decoder({"int_field": 1, "computed_field": 5}) == SchemaWithDefaults(
+        int_field=1
+    )
+    assert decoder(
+        {
+            "int_field": 1,
+            "default_factory_field": [{"int_field": 2, "repeated_field": []}],
+        }
+    ) == SchemaWithDefaults(
+        int_field=1,
+        default_factory_field=[
+            nested_schema(int_field=2, optional_field=None, repeated_field=[])
+        ],
+    )
+
+
+def test_decode_missing_required_value(nested_schema):
+    with pytest.raises(KeyError):
+        compile_decoder(nested_schema)({"optional_field": "a", "repeated_field": []})
+
+
+def test_decoder_not_a_dataclass():
+    with pytest.raises(TypeError):
+        compile_decoder(dict)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="kw_only requires 3.10")
+def test_decode_keyword_only_fields(nested_schema, row):
+    @dataclass(kw_only=True)  # pylint: disable=unexpected-keyword-arg
+    class KeywordOnly:
+        int_field: int
+        nested_field: nested_schema
+
+    assert compile_decoder(KeywordOnly)(row) == KeywordOnly(
+        int_field=row["int_field"], nested_field=nested_schema(**row["nested_field"])
+    )
+
+
+def test_decode_other_types():
+    @dataclass
+    class Other:
+        dict_field: Dict[str, str]
+
+    assert compile_decoder(Other)({"dict_field": {"k": "v"}}) == Other({"k": "v"})
@@ -0,0 +1,101 @@
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Optional, Union
+
+import pytest
+
+from bq_schema.codec.encoder import compile_encoder
+
+
+def test_encoder_matches_asdict(schema, instances):
+    for instance in instances:
+        row = compile_encoder(schema)(instance)
+        assert row == asdict(instance)
+        assert list(row) == list(asdict(instance))
+
+
+def test_encoder_copies_lists(schema, instance):
+    row = compile_encoder(schema)(instance)
+    assert row["repeated_int_field"] is not instance.repeated_int_field
+    assert row["nested_field"]["repeated_field"] is not (
+        instance.nested_field.repeated_field
+    )
+
+
+def test_encoder_is_compiled_once(schema):
+    assert compile_encoder(schema) is compile_encoder(schema)
+
+
+def test_encoder_not_a_dataclass():
+    with pytest.raises(TypeError):
+        compile_encoder(int)
+
+
+def test_encoder_copies_other_types():
+    @dataclass
+    class Other:
+        int_field: int
+        dict_field: Dict[str, str]
+        any_field: Any
+
+    instance = Other(int_field=1, dict_field={"k": "v"}, any_field=[{"k": "v"}])
+    row = compile_encoder(Other)(instance)
+    assert row == asdict(instance)
+    assert row["dict_field"] is not instance.dict_field
+    assert row["any_field"][0] is not instance.any_field[0]
+
+
+def test_encoder_uses_the_type_of_nested_values():
+    @dataclass
+    class Base:
+        a: int
+
+    @dataclass
+    class Extended(Base):
+        extra: int
+
+    @dataclass
+    class Outer:
+        b: Base
+        optional_b: Optional[Base]
+        repeated_b: List[Base]
+
+    extended = Extended(a=1, extra=2)
+    instance = Outer(b=extended, optional_b=extended, repeated_b=[Base(a=0), extended])
+    row = compile_encoder(Outer)(instance)
+    assert row == asdict(instance)
+    assert row["b"] == {"a": 1, "extra": 2}
+
+
+def test_encoder_union_fields(nested_schema):
+    @dataclass
+    class WithUnion:
+        union_field: Union[int, str]
+        optional_union_field: Optional[Union[int, nested_schema]]
+
+    nested = nested_schema(int_field=1, optional_field=None, repeated_field=["a"])
+    for instance in (
+        WithUnion(union_field=1, optional_union_field=None),
+        WithUnion(union_field="a", optional_union_field=nested),
+    ):
+        assert compile_encoder(WithUnion)(instance) == asdict(instance)
+
+
+def test_encoder_unresolved_annotations():
+    @dataclass
+    class LocalNested:
+        int_field: int
+
+    @dataclass
+    class Local:
+        nested_field: "LocalNested"
+        repeated_field: "List[LocalNested]"
+        dict_field: "Dict[str, LocalNested]"
+
+    instance = Local(
+        nested_field=LocalNested(int_field=1),
+        repeated_field=[LocalNested(int_field=2)],
+        dict_field={"k": LocalNested(int_field=3)},
+    )
+    row = compile_encoder(Local)(instance)
+    assert row == asdict(instance)
+    assert row["repeated_field"][0] == {"int_field": 2}
@@ -0,0 +1,121 @@
+import gzip
+import io
+import json
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, List
+
+import pytest
+from google.cloud.bigquery import SchemaField
+from google.cloud.bigquery._helpers import _record_field_to_json
+
+from bq_schema.codec import json_encoder
+from bq_schema.codec.json_encoder import compile_json_encoder, to_ndjson, write_ndjson
+from bq_schema.dataclass_converter import dataclass_to_schema
+from bq_schema.row_transformer import RowTransformer
+from bq_schema.types.type_mapping import Timestamp
+
+
+def _records(schema: List[SchemaField]) -> List[SchemaField]:
+    """
+    The google client encodes nested fields of the type RECORD only.
+    """
+    return [
+        SchemaField(
+            field.name,
+            "RECORD" if field.field_type == "STRUCT" else field.field_type,
+            field.mode,
+            fields=_records(field.fields),
+        )
+        for field in schema
+    ]
+
+
+def _google_format(value: Any) -> Any:
+    """
+    The google client formats integers and booleans as strings and drops None values.
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, list):
+        return [_google_format(item) for item in value]
+    if isinstance(value, dict):
+        return {
+            key: _google_format(item) for key, item in value.items() if item is not None
+        }
+    return value
+
+
+def test_json_row_matches_google_encoding(schema, instances):
+    for instance in instances:
+        json_row = compile_json_encoder(schema)(instance)
+        expected = _record_field_to_json(
+            _records(dataclass_to_schema(schema)),
+            RowTransformer.dataclass_instance_to_bq_row(instance),
+        )
+        assert _google_format(json_row) == expected
+        assert json.loads(json.dumps(json_row)) == json_row
+
+
+def test_json_values(schema, instance):
+    json_row = compile_json_encoder(schema)(instance)
+    assert json_row["bytes_field"] == "AGJ5dGVz"
+    assert json_row["timestamp_field"] == "2020-01-01T12:00:00.000001Z"
+    assert json_row["int_field"] == 1
+    assert json_row["bool_field"] is True
+    assert json_row["optional_numeric_field"] is None
+    assert json_row["optional_nested_field"] is None
+
+
+def test_timestamps_are_converted_to_utc(instance):
+    instance.timestamp_field = Timestamp(
+        datetime(2020, 1, 1, 12, tzinfo=timezone(timedelta(hours=2)))
+    )
+    json_row = RowTransformer.dataclass_instance_to_json_row(instance)
+    assert json_row["timestamp_field"] == "2020-01-01T10:00:00.000000Z"
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [(float("nan"), "NaN"), (float("inf"), "Infinity"), (float("-inf"), "-Infinity")],
+)
+def test_non_finite_floats(schema, instance, value, expected):
+    instance.float_field = value
+    assert compile_json_encoder(schema)(instance)["float_field"] == expected
+
+
+def test_unsupported_types():
+    with pytest.raises(TypeError):
+        compile_json_encoder(dict)
+
+    @dataclass
+    class Unsupported:
+        field: complex
+
+    with pytest.raises(TypeError):
+        compile_json_encoder(Unsupported)
+
+
+@pytest.mark.parametrize("dumps", [json_encoder.dumps, json_encoder._json_dumps])
+def test_ndjson(monkeypatch, schema, instances, dumps):
+    monkeypatch.setattr(json_encoder, "dumps", dumps)
+    instances[1].string_field = "ü"
+
+    lines = to_ndjson(instances).decode().splitlines()
+    assert [json.loads(line) for line in lines] == [
+        compile_json_encoder(schema)(instance) for instance in instances
+    ]
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_write_ndjson(instances, compress):
+    file_obj = io.BytesIO()
+    assert write_ndjson(instances, file_obj, compress=compress, chunk_size=2) == 5
+    assert not file_obj.closed
+
+    content = file_obj.getvalue()
+    if compress:
+        content = gzip.decompress(content)
+    assert content == to_ndjson(instances)
@@ -0,0 +1,145 @@
+import copy
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import FrozenInstanceError, asdict, dataclass, field, replace
+from typing import Dict, List
+
+import pytest
+
+from bq_schema.codec.decoder import compile_decoder
+from bq_schema.codec.lazy import _LazyField, compile_lazy_decoder
+from bq_schema.row_transformer import RowTransformer
+
+
+@dataclass(frozen=True)
+class FrozenNested:
+    int_field: int
+
+
+@dataclass(frozen=True)
+class FrozenSchema:
+    nested_field: FrozenNested
+
+
+def test_lazy_instance_equals_eager_instance(schema, row):
+    lazy_instance = compile_lazy_decoder(schema)(row)
+    eager_instance = compile_decoder(schema)(row)
+    assert isinstance(lazy_instance, schema)
+    assert lazy_instance == eager_instance
+    assert eager_instance == lazy_instance
+    assert repr(lazy_instance) == repr(eager_instance)
+    assert asdict(lazy_instance) == asdict(eager_instance)
+
+
+def test_nested_fields_are_decoded_on_first_access(schema, instance, row):
+    lazy_instance = compile_lazy_decoder(schema)(row)
+    assert "nested_field" not in vars(lazy_instance)
+    assert lazy_instance.date_field == instance.date_field
+
+    nested = lazy_instance.nested_field
+    assert nested == instance.nested_field
+    assert lazy_instance.nested_field is nested
+    assert lazy_instance.optional_nested_field is None
+    assert lazy_instance.repeated_nested_field == instance.repeated_nested_field
+
+    lazy_instance.nested_field = None
+    assert lazy_instance.nested_field is None
+
+
+def test_defaults(nested_schema):
+    @dataclass
+    class SchemaWithDefaults:
+        default_nested_field: List[nested_schema] = field(default_factory=list)
+        computed_field: int = field(default=0, init=False)
+
+    lazy_instance = compile_lazy_decoder(SchemaWithDefaults)({})
+    assert lazy_instance.computed_field == 0
+    assert lazy_instance.default_nested_field == []
+
+
+def test_lazy_instances_are_copied_as_dataclass_instances(schema, row):
+    lazy_instance = compile_lazy_decoder(schema)(row)
+    for copied in (
+        pickle.loads(pickle.dumps(lazy_instance)),
+        copy.deepcopy(lazy_instance),
+    ):
+        assert type(copied) is schema
+        assert copied == lazy_instance
+
+    replaced = replace(lazy_instance, repeated_int_field=[])
+    assert replaced.nested_field == lazy_instance.nested_field
+
+
+def test_frozen_dataclass():
+    lazy_instance = compile_lazy_decoder(FrozenSchema)(
+        {"nested_field": {"int_field": 1}}
+    )
+    assert lazy_instance.nested_field.int_field == 1
+    with pytest.raises(FrozenInstanceError):
+        lazy_instance.nested_field = None
+    assert hash(lazy_instance) == hash(FrozenSchema(FrozenNested(1)))
+
+
+def test_post_init_is_decoded_eagerly(nested_schema, row):
+    @dataclass
+    class SchemaWithPostInit:
+        nested_field: nested_schema
+
+        def __post_init__(self):
+            self.nested_field.int_field += 1
+
+    instance = compile_lazy_decoder(SchemaWithPostInit)(row)
+    assert type(instance) is SchemaWithPostInit
+    assert instance.nested_field.int_field == row["nested_field"]["int_field"] + 1
+
+
+def test_slotted_dataclass(nested_schema, instance, row):
+    @dataclass
+    class SlottedSchema:
+        __slots__ = ("int_field", "nested_field")
+        int_field: int
+        nested_field: nested_schema
+
+    lazy_instance = compile_lazy_decoder(SlottedSchema)(row)
+    assert lazy_instance.int_field == instance.int_field
+    assert lazy_instance.nested_field == instance.nested_field
+
+
+def test_concurrent_first_access():
+    barrier = threading.Barrier(2)
+
+    def decode(value):
+        # Both threads decode the raw value at the same time.
+        barrier.wait(timeout=5)
+        return [value]
+
+    class Lazy:
+        nested_field = _LazyField("nested_field", decode)
+
+    instance = Lazy()
+    instance.__dict__["_raw_nested_field"] = 1
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        values = list(executor.map(lambda _: instance.nested_field, range(2)))
+    assert values == [[1], [1]]
+    assert values[0] is values[1] is instance.nested_field
+    assert "_raw_nested_field" not in vars(instance)
+
+
+def test_other_types(nested_schema, instance, row):
+    @dataclass
+    class Other:
+        dict_field: Dict[str, str]
+        nested_field: nested_schema
+
+    lazy_instance = compile_lazy_decoder(Other)(
+        {"dict_field": {"k": "v"}, "nested_field": row["nested_field"]}
+    )
+    assert lazy_instance == Other({"k": "v"}, instance.nested_field)
+
+
+def test_row_transformer_lazy(schema, instance, row):
+    row_transformer = RowTransformer(schema, lazy=True)
+    lazy_instance = row_transformer.bq_row_to_dataclass_instance(row)
+    assert "nested_field" not in vars(lazy_instance)
+    assert lazy_instance == instance
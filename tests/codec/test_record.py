@@ -0,0 +1,127 @@
+import copy
+import sys
+from dataclasses import asdict, dataclass, field, fields
+from typing import List, Optional, get_type_hints
+
+import pytest
+
+from bq_schema.codec.decoder import compile_decoder
+from bq_schema.codec.record import (
+    compile_record_converter,
+    compile_record_decoder,
+    record_type,
+)
+from bq_schema.row_transformer import RowTransformer
+
+
+def test_record_type(schema, nested_schema):
+    record = record_type(schema)
+    nested_record = record_type(nested_schema)
+    assert record.__name__ == "SchemaRecord"
+    assert record_type(schema) is record
+    assert record._fields == tuple(schema_field.name for schema_field in fields(schema))
+    assert get_type_hints(record) == {
+        **get_type_hints(schema),
+        "nested_field": nested_record,
+        "optional_nested_field": Optional[nested_record],
+        "repeated_nested_field": List[nested_record],
+    }
+
+
+def test_record_type_with_defaults(nested_schema):
+    @dataclass
+    class SchemaWithDefaults:
+        default_nested_field: List[nested_schema] = field(default_factory=list)
+        computed_field: int = field(default=0, init=False)
+
+    record = record_type(SchemaWithDefaults)
+    assert record._fields == ("default_nested_field",)
+    assert compile_record_decoder(SchemaWithDefaults)({}) == record([])
+    assert compile_record_converter(SchemaWithDefaults)(
+        record([])
+    ) == SchemaWithDefaults(default_nested_field=[])
+
+
+def test_decode_record(schema, nested_schema, instances):
+    nested_record = record_type(nested_schema)
+    instance = instances[2]
+    row = asdict(instance)
+    record = compile_record_decoder(schema)(row)
+    assert isinstance(record, record_type(schema))
+    assert record.date_field == instance.date_field
+    assert record.nested_field == nested_record(**row["nested_field"])
+    assert record.optional_nested_field == nested_record(**row["optional_nested_field"])
+    assert record.repeated_nested_field == [
+        nested_record(**item) for item in row["repeated_nested_field"]
+    ]
+    assert record.repeated_int_field == instance.repeated_int_field
+    assert sys.getsizeof(record) < sys.getsizeof(instance) + sys.getsizeof(
+        vars(instance)
+    )
+
+
+def test_record_to_dataclass_instance(schema, nested_schema, instances):
+    for instance in instances:
+        record = compile_record_decoder(schema)(asdict(instance))
+        converted = compile_record_converter(schema)(record)
+        assert converted == instance
+        assert type(converted.nested_field) is nested_schema
+
+
+def test_not_a_dataclass():
+    for compile_function in (
+        record_type,
+        compile_record_decoder,
+        compile_record_converter,
+    ):
+        with pytest.raises(TypeError):
+            compile_function(dict)
+
+
+def test_row_transformer_records(schema, instance, row):
+    row_transformer = RowTransformer(schema)
+    record = row_transformer.bq_row_to_record(row)
+    assert isinstance(record, row_transformer.record_type)
+    assert row_transformer.record_to_dataclass_instance(record) == instance
+
+
+def test_record_with_underscore_fields(nested_schema):
+    @dataclass
+    class Underscore:
+        _source: str
+        _cls: int
+        nested_field: Optional[nested_schema]
+
+    record = record_type(Underscore)
+    assert record.__name__ == "UnderscoreRecord"
+    assert record._fields == ("_source", "_cls", "nested_field")
+    assert get_type_hints(record) == {
+        "_source": str,
+        "_cls": int,
+        "nested_field": Optional[record_type(nested_schema)],
+    }
+
+    row = {
+        "_source": "a",
+        "_cls": 1,
+        "nested_field": {"int_field": 2, "repeated_field": []},
+    }
+    decoded = compile_record_decoder(Underscore)(row)
+    assert isinstance(decoded, record)
+    assert decoded == record(_source="a", _cls=1, nested_field=(2, None, []))
+    assert decoded == record("a", 1, (2, None, []))
+    assert decoded._source == "a"
+    assert decoded._cls == 1
+    assert decoded.nested_field.int_field == 2
+    assert decoded._asdict()["_source"] == "a"
+    assert repr(decoded) == (
+        "UnderscoreRecord(_source='a', _cls=1, "
+        "nested_field=NestedRecord(int_field=2, optional_field=None, "
+        "repeated_field=[]))"
+    )
+    assert copy.copy(decoded) == decoded
+    assert compile_record_converter(Underscore)(decoded) == compile_decoder(Underscore)(
+        row
+    )
+    with pytest.raises(AttributeError):
+        decoded.other = 1
@@ -0,0 +1,123 @@
+from dataclasses import asdict
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from google.cloud.bigquery import SchemaField
+
+from bq_schema.bigquery_table import BigqueryTable
+from bq_schema.codec.validator import compile_validator
+
+
+def test_validate_valid_rows(schema, instances):
+    validator = compile_validator(schema)
+    rows = [asdict(instance) for instance in instances]
+    del rows[1]["optional_numeric_field"]
+    assert validator([*instances, *rows]) == {}
+
+
+def test_validate_modes(schema, instance, row):
+    validator = compile_validator(schema)
+    row["string_field"] = None
+    del row["int_field"]
+    nested = row["nested_field"]
+    row["repeated_nested_field"] = [
+        None,
+        {**nested, "repeated_field": [None]},
+        {**nested, "repeated_field": ["a", 1]},
+    ]
+    row["unknown"] = 1
+    assert validator([instance, row]) == {
+        1: [
+            "unknown: unknown field",
+            "string_field: missing required value",
+            "int_field: missing required value",
+            "repeated_nested_field[0]: arrays cannot contain NULL",
+            "repeated_nested_field[1].repeated_field[0]: arrays cannot contain NULL",
+            "repeated_nested_field[2].repeated_field[1]: expected STRING, got int",
+        ]
+    }
+
+
+def test_validate_types(schema, nested_schema, instance):
+    instance.timestamp_field = "2020-01-01"
+    instance.date_field = datetime(2020, 1, 1)
+    instance.int_field = True
+    instance.float_field = 1
+    instance.numeric_field = 1.5
+    instance.repeated_nested_field = "items"
+    instance.optional_nested_field = nested_schema(
+        int_field="1", optional_field=None, repeated_field=[]
+    )
+    assert compile_validator(schema)([instance]) == {
+        0: [
+            "int_field: expected INT64, got bool",
+            "numeric_field: expected NUMERIC, got float",
+            "timestamp_field: expected TIMESTAMP, got str",
+            "date_field: expected DATE, got datetime",
+            "optional_nested_field.int_field: expected INT64, got str",
+            "repeated_nested_field: expected a list",
+        ]
+    }
+
+
+@pytest.mark.parametrize(
+    "price, error",
+    [
+        (Decimal("1.123456789"), None),
+        (Decimal("1.1234567890000"), None),
+        (Decimal("1.1234567891"), "NUMERIC value has more than 9 decimal places"),
+        (Decimal("9" * 29), None),
+        (Decimal("1" + "0" * 29), "NUMERIC value has more than 29 integer digits"),
+        (10**29, "NUMERIC value has more than 29 integer digits"),
+        (Decimal("-0.5"), None),
+        (Decimal("1E+5"), None),
+        (Decimal("1E-10"), "NUMERIC value has more than 9 decimal places"),
+        (Decimal("1E+29"), "NUMERIC value has more than 29 integer digits"),
+        (Decimal("NaN"), "NUMERIC value is not finite"),
+    ],
+)
+def test_validate_numeric(price, error):
+    row = {"price": price}
+    expected = {0: [f"price: {error}"]} if error else {}
+    assert compile_validator([SchemaField("price", "NUMERIC")])([row]) == expected
+
+
+def test_validate_sizes():
+    schema = [SchemaField("text", "STRING"), SchemaField("data", "BYTES")]
+    validator = compile_validator(schema)
+    too_large = 10 * 1024 * 1024 + 1
+    assert validator([{"text": "ä" * (too_large // 2 + 1), "data": b"a"}]) == {
+        0: ["text: value is larger than 10 MB"]
+    }
+    assert validator([{"text": "a", "data": b"a" * too_large}]) == {
+        0: [f"data: value is larger than {too_large - 1} B"]
+    }
+
+
+def test_validate_schema_fields():
+    schema = [
+        SchemaField("a", "INTEGER", "REQUIRED"),
+        SchemaField("b", "RECORD", "REPEATED", fields=[SchemaField("c", "BOOLEAN")]),
+    ]
+    validator = compile_validator(schema)
+    assert validator is compile_validator(list(schema))
+    assert validator([{"a": 1, "b": [{"c": "yes"}]}]) == {
+        0: ["b[0].c: expected BOOL, got str"]
+    }
+
+
+def test_validate_unsupported_type():
+    with pytest.raises(TypeError):
+        compile_validator([SchemaField("a", "INTERVAL")])
+
+
+def test_bigquery_table_validate_rows(schema, instances):
+    class Table(BigqueryTable):
+        name = "table"
+
+    Table.schema = schema
+    instances[1].int_field = "1"
+    assert Table().validate_rows(instances) == {
+        1: ["int_field: expected INT64, got str"]
+    }
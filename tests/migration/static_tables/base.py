@@ -0,0 +1,7 @@
+from abc import ABC
+
+import bq_schema.bigquery_table as bigquery_table
+
+
+class BaseTable(bigquery_table.BigqueryTable, ABC):
+    dataset = "static_dataset"
@@ -0,0 +1,5 @@
+from .models import EventTable as Event
+
+
+class DerivedEventTable(Event):
+    name = "derived_event_table"
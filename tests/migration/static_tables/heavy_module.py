@@ -0,0 +1 @@
+raise ImportError("Static table discovery must not import this module.")
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+
+from ..base import BaseTable
+
+
+@dataclass
+class EventSchema:
+    event_id: str
+
+
+class EventTable(BaseTable):
+    name = "event_table"
+    schema = EventSchema
@@ -0,0 +1,6 @@
+class BigqueryTable:
+    pass
+
+
+class LocalTable(BigqueryTable):
+    name = "local_table"
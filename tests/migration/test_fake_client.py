@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from google.api_core.exceptions import Conflict, InternalServerError, NotFound
+from google.cloud.bigquery import SchemaField
+from google.cloud.bigquery.table import Table
+
+from bq_schema.migration.fake_client import FakeBigQueryClient, FakeTable
+from bq_schema.migration.models import ApplyStatus
+from bq_schema.migration.retry import RetryPolicy, is_retryable
+from bq_schema.migration.schema_diff import (
+    apply_schema_differences,
+    find_table_differences,
+)
+
+
+def test_create_get_and_list_tables():
+    client = FakeBigQueryClient()
+    created_table = client.create_table(
+        Table("project.dataset.table", schema=[SchemaField("a", "INTEGER")])
+    )
+    assert created_table.created is not None
+
+    table = client.get_table("project.dataset.table")
+    assert table.schema == [SchemaField("a", "INTEGER")]
+    assert [t.table_id for t in client.list_tables("project.dataset")] == ["table"]
+    assert client.calls == {"create_table": 1, "get_table": 1, "list_tables": 1}
+
+    with pytest.raises(Conflict):
+        client.create_table(Table("project.dataset.table"))
+    with pytest.raises(NotFound):
+        client.get_table("project.dataset.missing_table")
+    with pytest.raises(NotFound):
+        client.list_tables("project.missing_dataset")
+
+
+def test_update_table():
+    client = FakeBigQueryClient()
+    client.add_tables([Table("project.dataset.table")])
+    table = client.get_table("project.dataset.table")
+    table.schema = [SchemaField("a", "INTEGER")]
+    table.friendly_name = "table"
+
+    client.update_table(table, ["schema"])
+    updated_table = client.get_table("project.dataset.table")
+    assert updated_table.schema == [SchemaField("a", "INTEGER")]
+    assert updated_table.friendly_name is None
+
+
+def test_injected_errors():
+    client = FakeBigQueryClient(rate_limit_rate=1.0)
+    with pytest.raises(Exception) as error:
+        client.list_tables("project.dataset")
+    assert is_retryable(error.value)
+
+    client = FakeBigQueryClient()
+    client.add_tables([Table("project.dataset.table")])
+    client.inject_error("project.dataset.table", InternalServerError("failed"))
+    with pytest.raises(InternalServerError):
+        client.get_table("project.dataset.table")
+    assert client.get_table("project.dataset.table")
+
+
+def test_migrate_tables():
+    client = FakeBigQueryClient(rate_limit_rate=0.2, failure_rate=0.1, seed=1)
+    client.create_dataset("project.dataset")
+    local_tables = [
+        FakeTable(f"table_{i}", [SchemaField("a", "INTEGER")]) for i in range(20)
+    ]
+    retry_policy = RetryPolicy(attempts=10, initial_delay=0, max_delay=0)
+
+    def migrate():
+        schema_diffs = find_table_differences(
+            local_tables,
+            client,
+            "project",
+            "dataset",
+            concurrency=4,
+            retry_policy=retry_policy,
+        )
+        apply_results = apply_schema_differences(
+            schema_diffs, client, concurrency=4, retry_policy=retry_policy
+        )
+        assert all(r.status == ApplyStatus.APPLIED for r in apply_results.values())
+        return schema_diffs
+
+    assert len(migrate()) == 20
+    assert migrate() == {}
+
+    for local_table in local_tables[:5]:
+        local_table.table_schema = local_table.schema + [SchemaField("b", "STRING")]
+    assert len(migrate()) == 5
+    assert migrate() == {}
+    assert client.get_table("project.dataset.table_0").schema[1].name == "b"
+
+
+def test_max_concurrent_calls():
+    client = FakeBigQueryClient(latency=0.05)
+    client.add_tables([Table(f"project.dataset.table_{i}") for i in range(4)])
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(
+            executor.map(
+                client.get_table, [f"project.dataset.table_{i}" for i in range(4)]
+            )
+        )
+    assert client.max_concurrent_calls > 1
@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+from google.cloud.bigquery import SchemaField
+
+from bq_schema.bigquery_table import BigqueryTable
+from bq_schema.migration import fingerprint
+from bq_schema.migration.fingerprint import dataclass_fingerprint, schema_fingerprint
+
+
+def test_fingerprint_normalizes_legacy_types():
+    local_schema = [
+        SchemaField("a", "STRUCT", "REQUIRED", fields=[SchemaField("b", "INT64")])
+    ]
+    remote_schema = [
+        SchemaField(
+            "a",
+            "RECORD",
+            "REQUIRED",
+            description="ignored",
+            fields=[SchemaField("b", "INTEGER")],
+        )
+    ]
+    assert schema_fingerprint(local_schema) == schema_fingerprint(remote_schema)
+
+
+def test_fingerprint_differs():
+    schema = [SchemaField("a", "RECORD", fields=[SchemaField("b", "INTEGER")])]
+    assert schema_fingerprint(schema) != schema_fingerprint(
+        [SchemaField("a", "RECORD", fields=[SchemaField("b", "STRING")])]
+    )
+    assert schema_fingerprint(schema) != schema_fingerprint(
+        [SchemaField("a", "RECORD", "REQUIRED", fields=[SchemaField("b", "INTEGER")])]
+    )
+    assert schema_fingerprint(schema) != schema_fingerprint(
+        [SchemaField("a", "RECORD", fields=[SchemaField("c", "INTEGER")])]
+    )
+
+
+def test_fingerprint_is_order_aware():
+    schema = [SchemaField("a", "INTEGER"), SchemaField("b", "INTEGER")]
+    assert schema_fingerprint(schema) != schema_fingerprint(schema[::-1])
+
+
+def test_fingerprint_unspecified_field_type():
+    assert schema_fingerprint([SchemaField("a", "RANDOM_FIELD_TYPE")]) is None
+
+
+def test_table_fingerprint():
+    @dataclass
+    class Nested:
+        b: int
+
+    @dataclass
+    class Schema:
+        a: Optional[Nested]
+        c: List[str]
+
+    class Table(BigqueryTable):
+        name = "table"
+        schema = Schema
+
+    remote_schema = [
+        SchemaField("a", "RECORD", fields=[SchemaField("b", "INTEGER", "REQUIRED")]),
+        SchemaField("c", "STRING", "REPEATED"),
+    ]
+    assert Table().get_schema_fingerprint() == schema_fingerprint(remote_schema)
+
+
+def test_dataclass_fingerprint_is_computed_once(monkeypatch):
+    @dataclass
+    class Schema:
+        a: int
+
+    first_fingerprint = dataclass_fingerprint(Schema)
+    assert first_fingerprint == schema_fingerprint(
+        [SchemaField("a", "INT64", "REQUIRED")]
+    )
+
+    def fail(*_):
+        raise AssertionError("The fingerprint should be cached.")
+
+    monkeypatch.setattr(fingerprint, "schema_fingerprint", fail)
+    assert dataclass_fingerprint(Schema) == first_fingerprint
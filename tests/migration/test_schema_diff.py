@@ -1,6 +1,30 @@
+import os
+import pathlib
+
+import pytest
+from google.api_core.exceptions import (
+    BadRequest,
+    Forbidden,
+    InternalServerError,
+    NotFound,
+    TooManyRequests,
+)
 from google.cloud.bigquery import SchemaField
+from google.cloud.bigquery.table import Table
 
-from bq_schema.migration.schema_diff import check_schemas
+from bq_schema.bigquery_table import BigqueryTable
+from bq_schema.migration import schema_diff
+from bq_schema.migration.fake_client import FakeBigQueryClient, FakeTable
+from bq_schema.migration.models import ApplyStatus, ExistingTable, MissingTable
+from bq_schema.migration.retry import RetryPolicy
+from bq_schema.migration.schema_diff import (
+    apply_schema_differences,
+    check_schemas,
+    find_schema_differences,
+    find_table_differences,
+    print_format_apply_results,
+    print_format_schema_differences,
+)
 
 
 def test_check_schemas():
@@ -142,3 +166,310 @@ def test_check_field_type_unspecified_nested():
         "Unspecified field type in SchemaField('b', 'RANDOM_FIELD_TYPE', 'REQUIRED', "
         "None, (), None) or SchemaField('b', 'INTEGER', 'REQUIRED', None, (), None)",
     ]
+
+
+def _client(table_names=(), schema=(), latency=0.0):
+    client = FakeBigQueryClient(latency=latency)
+    client.create_dataset("project.dataset")
+    client.add_tables(
+        Table(f"project.dataset.{table_name}", schema=list(schema))
+        for table_name in table_names
+    )
+    return client
+
+
+def _local_table(table_name):
+    return FakeTable(table_name, [SchemaField("a", "INTEGER")])
+
+
+def _tables_dir():
+    return os.path.join(pathlib.Path(__file__).parent, "tables")
+
+
+def test_find_schema_differences_skips_unchanged_schemas(monkeypatch):
+    def fail(*_):
+        raise AssertionError("check_schemas should not be called.")
+
+    monkeypatch.setattr(schema_diff, "check_schemas", fail)
+    schema_diffs = find_schema_differences(
+        module_path=os.path.join(_tables_dir(), "nested_modules"),
+        bigquery_client=_client(["second_table"], [SchemaField("b_column", "FLOAT64")]),
+        global_project="project",
+        global_dataset="dataset",
+        ignore_abstract=True,
+    )
+    assert schema_diffs == {}
+
+
+def test_find_schema_differences_checks_changed_schemas():
+    schema_diffs = find_schema_differences(
+        module_path=os.path.join(_tables_dir(), "nested_modules"),
+        bigquery_client=_client(["second_table"], [SchemaField("b_column", "INTEGER")]),
+        global_project="project",
+        global_dataset="dataset",
+        ignore_abstract=True,
+    )
+    assert list(schema_diffs) == ["project.dataset.second_table"]
+
+
+def test_find_table_differences_concurrently():
+    local_tables = [_local_table(f"table_{i:02d}") for i in range(20)]
+    local_tables.append(_local_table("table_missing"))
+    client = _client(
+        [f"table_{i:02d}" for i in range(100)],
+        [SchemaField("a", "STRING")],
+        latency=0.05,
+    )
+    schema_diffs = find_table_differences(
+        local_tables=reversed(local_tables),
+        bigquery_client=client,
+        global_project="project",
+        global_dataset="dataset",
+        concurrency=21,
+    )
+    assert client.max_concurrent_calls > 1
+    assert list(schema_diffs) == [
+        f"project.dataset.{table.name}" for table in local_tables
+    ]
+    assert isinstance(schema_diffs["project.dataset.table_missing"], MissingTable)
+    assert isinstance(schema_diffs["project.dataset.table_00"], ExistingTable)
+
+
+def test_find_table_differences_retries():
+    client = _client(["table"], [SchemaField("a", "STRING")])
+    client.inject_error("project.dataset.table", TooManyRequests("rate limit"))
+    client.inject_error(
+        "project.dataset.table",
+        Forbidden("quota", errors=[{"reason": "rateLimitExceeded"}]),
+    )
+    schema_diffs = find_table_differences(
+        local_tables=[_local_table("table")],
+        bigquery_client=client,
+        global_project="project",
+        global_dataset="dataset",
+        retry_policy=RetryPolicy(attempts=3, initial_delay=0),
+    )
+    assert client.calls["get_table"] == 3
+    assert list(schema_diffs) == ["project.dataset.table"]
+
+
+def test_find_table_differences_does_not_retry_permanent_errors():
+    client = _client(["table"])
+    client.inject_error("project.dataset.table", Forbidden("access denied"))
+    with pytest.raises(Forbidden):
+        find_table_differences(
+            local_tables=[_local_table("table")],
+            bigquery_client=client,
+            global_project="project",
+            global_dataset="dataset",
+            retry_policy=RetryPolicy(attempts=3, initial_delay=0),
+        )
+    assert client.calls["get_table"] == 1
+
+
+def test_find_table_differences_lists_tables_per_dataset():
+    client = _client(["table_00"], [SchemaField("a", "STRING")])
+    local_tables = [_local_table("table_00"), _local_table("table_missing")]
+    schema_diffs = find_table_differences(
+        local_tables=local_tables,
+        bigquery_client=client,
+        global_project="project",
+        global_dataset="dataset",
+    )
+    assert client.calls["list_tables"] == 1
+    assert client.calls["get_table"] == 1
+    assert isinstance(schema_diffs["project.dataset.table_missing"], MissingTable)
+
+    schema_diffs = find_table_differences(
+        local_tables=local_tables,
+        bigquery_client=client,
+        global_project="project",
+        global_dataset="missing_dataset",
+    )
+    assert client.calls["list_tables"] == 2
+    assert client.calls["get_table"] == 1
+    assert all(isinstance(diff, MissingTable) for diff in schema_diffs.values())
+
+
+def test_find_table_differences_tables_deleted_after_listing():
+    client = _client(["deleted", "existing"], [SchemaField("a", "STRING")])
+    client.inject_error("project.dataset.deleted", NotFound("Table deleted"))
+    schema_diffs = find_table_differences(
+        local_tables=[_local_table("deleted"), _local_table("existing")],
+        bigquery_client=client,
+        global_project="project",
+        global_dataset="dataset",
+        concurrency=2,
+    )
+    assert isinstance(schema_diffs["project.dataset.deleted"], MissingTable)
+    assert isinstance(schema_diffs["project.dataset.existing"], ExistingTable)
+
+
+def _schema_diffs(client, table_names):
+    schema_diffs = {}
+    for table_name in table_names:
+        local_table = _local_table(table_name)
+        table_identifier = f"project.dataset.{table_name}"
+        if table_name.startswith("missing"):
+            schema_diffs[table_identifier] = MissingTable(local_table=local_table)
+        else:
+            client.add_tables([Table(table_identifier)])
+            schema_diffs[table_identifier] = ExistingTable(
+                local_table=local_table,
+                remote_table=Table(table_identifier),
+                schema_diffs=[],
+            )
+    return schema_diffs
+
+
+def test_apply_schema_differences_concurrently():
+    client = _client(latency=0.05)
+    schema_diffs = _schema_diffs(
+        client,
+        [f"missing_{i}" for i in range(10)] + [f"existing_{i}" for i in range(10)],
+    )
+    apply_results = apply_schema_differences(schema_diffs, client, concurrency=20)
+    assert client.max_concurrent_calls > 1
+    assert list(apply_results) == list(schema_diffs)
+    assert all(r.status == ApplyStatus.APPLIED for r in apply_results.values())
+    assert client.calls["create_table"] == 10
+    assert client.calls["update_table"] == 10
+    for table_identifier in schema_diffs:
+        assert client.get_table(table_identifier).schema == [
+            SchemaField("a", "INTEGER")
+        ]
+    assert schema_diffs["project.dataset.existing_0"].remote_table.schema == [
+        SchemaField("a", "INTEGER")
+    ]
+
+
+def test_apply_schema_differences_retries_and_reports_failures():
+    client = _client()
+    schema_diffs = _schema_diffs(client, ["missing", "existing"])
+    client.inject_error(
+        "project.dataset.missing",
+        Forbidden("quota", errors=[{"reason": "rateLimitExceeded"}]),
+    )
+    client.inject_error("project.dataset.existing", BadRequest("invalid schema"))
+    apply_results = apply_schema_differences(
+        schema_diffs,
+        client,
+        retry_policy=RetryPolicy(attempts=2, initial_delay=0),
+    )
+    assert apply_results["project.dataset.missing"].status == ApplyStatus.APPLIED
+    existing_result = apply_results["project.dataset.existing"]
+    assert existing_result.status == ApplyStatus.FAILED
+    assert isinstance(existing_result.error, BadRequest)
+    assert print_format_apply_results(apply_results) == {
+        "project.dataset.missing": "Applied",
+        "project.dataset.existing": "Failed: 400 invalid schema",
+    }
+
+
+def test_apply_schema_differences_retries_created_tables():
+    client = _client()
+    original_create_table = client.create_table
+
+    def create_table_and_fail(table, exists_ok=False):
+        created_table = original_create_table(table, exists_ok)
+        if not exists_ok:
+            raise InternalServerError("table created, but the response was lost")
+        return created_table
+
+    client.create_table = create_table_and_fail
+    apply_results = apply_schema_differences(
+        _schema_diffs(client, ["missing"]),
+        client,
+        retry_policy=RetryPolicy(attempts=2, initial_delay=0),
+    )
+    assert apply_results["project.dataset.missing"].status == ApplyStatus.APPLIED
+    assert client.calls["create_table"] == 2
+
+
+def test_apply_schema_differences_stop_on_error():
+    client = _client()
+    schema_diffs = _schema_diffs(client, ["existing_0", "existing_1"])
+    client.inject_error("project.dataset.existing_0", BadRequest("invalid schema"))
+    apply_results = apply_schema_differences(schema_diffs, client, stop_on_error=True)
+    assert [r.status for r in apply_results.values()] == [
+        ApplyStatus.FAILED,
+        ApplyStatus.SKIPPED,
+    ]
+    assert client.calls["update_table"] == 1
+    assert client.get_table("project.dataset.existing_1").schema == []
+
+
+class ClusteredTable(BigqueryTable):
+    name = "clustered"
+    schema = [
+        SchemaField("a", "STRING"),
+        SchemaField("b", "INTEGER"),
+        SchemaField("c", "FLOAT"),
+        SchemaField("d", "STRING", "REPEATED"),
+        SchemaField("e", "RECORD", fields=[SchemaField("f", "STRING")]),
+    ]
+
+    def __init__(self, clustering_fields=None):
+        self._clustering_fields = clustering_fields
+
+    @property
+    def clustering_fields(self):
+        return self._clustering_fields
+
+
+def test_get_clustering_fields():
+    assert ClusteredTable().get_clustering_fields() is None
+    assert ClusteredTable(("b", "a")).get_clustering_fields() == ["b", "a"]
+
+
+@pytest.mark.parametrize(
+    "clustering_fields, error",
+    [
+        ([], "between 1 and 4 columns can be clustered"),
+        (["a", "b", "a", "b", "a"], "between 1 and 4 columns can be clustered"),
+        (["a", "a"], "columns are clustered more than once"),
+        (["missing"], "missing does not exist"),
+        (["c"], "c of type FLOAT cannot be clustered"),
+        (["d"], "d is REPEATED"),
+        (["e"], "e of type RECORD cannot be clustered"),
+    ],
+)
+def test_get_clustering_fields_invalid(clustering_fields, error):
+    with pytest.raises(ValueError, match=error):
+        ClusteredTable(clustering_fields).get_clustering_fields()
+
+
+def test_find_table_differences_rejects_invalid_clustering():
+    with pytest.raises(ValueError, match="missing does not exist"):
+        find_table_differences(
+            [ClusteredTable(["missing"])], FakeBigQueryClient(), "project", "dataset"
+        )
+
+
+def test_migrate_clustering_fields():
+    client = FakeBigQueryClient()
+    client.create_dataset("project.dataset")
+
+    def migrate(local_table):
+        schema_diffs = find_table_differences(
+            [local_table], client, "project", "dataset"
+        )
+        apply_results = apply_schema_differences(schema_diffs, client)
+        assert all(r.status == ApplyStatus.APPLIED for r in apply_results.values())
+        return schema_diffs
+
+    assert migrate(ClusteredTable(["a"]))
+    remote_table = client.get_table("project.dataset.clustered")
+    assert remote_table.clustering_fields == ["a"]
+    assert not migrate(ClusteredTable(["a"]))
+    assert not migrate(ClusteredTable())
+
+    schema_diffs = migrate(ClusteredTable(["b", "a"]))
+    difference = schema_diffs["project.dataset.clustered"]
+    assert difference.schema_diffs == []
+    assert print_format_schema_differences(schema_diffs) == {
+        "project.dataset.clustered": "Clustering fields changed from ['a'] to ['b', 'a']"
+    }
+    remote_table = client.get_table("project.dataset.clustered")
+    assert remote_table.clustering_fields == ["b", "a"]
+    assert not migrate(ClusteredTable(["b", "a"]))
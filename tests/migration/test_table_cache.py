@@ -0,0 +1,177 @@
+import json
+import os
+import time
+
+import pytest
+from google.cloud.bigquery import SchemaField
+from google.cloud.bigquery.table import Table
+
+from bq_schema.migration import schema_diff, table_cache
+from bq_schema.migration.fake_client import FakeBigQueryClient, FakeTable
+from bq_schema.migration.fingerprint import schema_fingerprint
+from bq_schema.migration.schema_diff import find_table_differences
+from bq_schema.migration.table_cache import TableCache
+
+
+def _table(table_identifier, created=None, schema=()):
+    project, dataset, table = table_identifier.split(".")
+    resource = {
+        "tableReference": {"projectId": project, "datasetId": dataset, "tableId": table}
+    }
+    if created is not None:
+        resource["creationTime"] = str(created)
+    table = Table.from_api_repr(resource)
+    table.schema = list(schema)
+    return table
+
+
+def test_put_and_get(tmp_path):
+    cache = TableCache(str(tmp_path))
+    table = _table("project.dataset.table", schema=[SchemaField("a", "INTEGER")])
+    cache.put(table)
+
+    cached_table = cache.get("project.dataset.table")
+    assert cached_table.reference == table.reference
+    assert cached_table.schema == table.schema
+    assert cache.get("project.dataset.other_table") is None
+
+
+def test_put_stores_fingerprint(tmp_path):
+    cache = TableCache(str(tmp_path))
+    schema = [SchemaField("a", "INTEGER")]
+    cache.put(_table("project.dataset.table", schema=schema))
+    cache.put(_table("project.dataset.other_table", schema=schema), "fingerprint")
+
+    _, fingerprint = cache.get_with_fingerprint("project.dataset.table")
+    assert fingerprint == schema_fingerprint(schema)
+    _, fingerprint = cache.get_with_fingerprint("project.dataset.other_table")
+    assert fingerprint == "fingerprint"
+
+
+def test_get_expired(tmp_path):
+    cache = TableCache(str(tmp_path), max_age=-1)
+    cache.put(_table("project.dataset.table"))
+    assert cache.get("project.dataset.table") is None
+
+
+def test_get_recreated_table(tmp_path):
+    cache = TableCache(str(tmp_path))
+    table = _table("project.dataset.table", created=1_600_000_000_000)
+    cache.put(table)
+
+    assert cache.get("project.dataset.table", table.created) is not None
+    recreated_table = _table("project.dataset.table", created=1_700_000_000_000)
+    assert cache.get("project.dataset.table", recreated_table.created) is None
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        lambda entry: entry.pop("cached_at"),
+        lambda entry: entry.pop("fingerprint"),
+        lambda entry: entry.pop("table"),
+        lambda entry: entry["table"].pop("tableReference"),
+        lambda entry: entry["table"].update(creationTime="yesterday"),
+        lambda entry: entry.update(cached_at="now"),
+        lambda entry: entry.update(fingerprint=1),
+        lambda entry: entry.clear(),
+    ],
+)
+def test_get_malformed_entry(tmp_path, change):
+    cache = TableCache(str(tmp_path))
+    table = _table("project.dataset.table", created=1_600_000_000_000)
+    cache.put(table)
+    path = cache._path("project.dataset.table")
+    with open(path, encoding="utf-8") as cache_file:
+        entry = json.load(cache_file)
+    change(entry)
+    with open(path, "w", encoding="utf-8") as cache_file:
+        json.dump(entry, cache_file)
+
+    assert cache.get_with_fingerprint("project.dataset.table", table.created) is None
+
+
+def test_get_partly_written_entry(tmp_path):
+    cache = TableCache(str(tmp_path))
+    cache.put(_table("project.dataset.table"))
+    path = cache._path("project.dataset.table")
+    with open(path, encoding="utf-8") as cache_file:
+        content = cache_file.read()
+    for data in (content[: len(content) // 2], "[]", "null"):
+        with open(path, "w", encoding="utf-8") as cache_file:
+            cache_file.write(data)
+        assert cache.get("project.dataset.table") is None
+
+
+def test_invalidate(tmp_path):
+    cache = TableCache(str(tmp_path))
+    cache.put(_table("project.dataset.table"))
+    cache.invalidate("project.dataset.table")
+    cache.invalidate("project.dataset.table")
+    assert cache.get("project.dataset.table") is None
+
+
+def test_prune(tmp_path):
+    cache = TableCache(str(tmp_path), max_entries=2)
+    for index in range(3):
+        cache.put(_table(f"project.dataset.table_{index}"))
+        path = cache._path(f"project.dataset.table_{index}")
+        os.utime(path, (time.time() + index, time.time() + index))
+    cache.prune()
+
+    assert len(os.listdir(tmp_path)) == 2
+    assert cache.get("project.dataset.table_0") is None
+    assert cache.get("project.dataset.table_2") is not None
+
+
+def _client(schema):
+    client = FakeBigQueryClient()
+    client.add_tables([Table("project.dataset.table", schema=schema)])
+    return client
+
+
+def _find_differences(client, cache):
+    return find_table_differences(
+        local_tables=[FakeTable("table", [SchemaField("a", "INTEGER")])],
+        bigquery_client=client,
+        global_project="project",
+        global_dataset="dataset",
+        table_cache=cache,
+    )
+
+
+def test_find_table_differences_uses_cache(tmp_path):
+    cache = TableCache(str(tmp_path))
+    client = _client([SchemaField("a", "INTEGER")])
+    assert _find_differences(client, cache) == {}
+    assert _find_differences(client, cache) == {}
+    assert client.calls["get_table"] == 1
+
+
+def test_find_table_differences_compares_cached_fingerprints(tmp_path, monkeypatch):
+    cache = TableCache(str(tmp_path))
+    client = _client([SchemaField("a", "INTEGER")])
+    assert _find_differences(client, cache) == {}
+
+    def fail(*_):
+        raise AssertionError("The remote schema should not be hashed.")
+
+    monkeypatch.setattr(schema_diff, "schema_fingerprint", fail)
+    monkeypatch.setattr(table_cache, "schema_fingerprint", fail)
+    assert _find_differences(client, cache) == {}
+    assert client.calls["get_table"] == 1
+
+
+def test_find_table_differences_refetches_cached_difference(tmp_path):
+    cache = TableCache(str(tmp_path))
+    client = _client([])
+    assert list(_find_differences(client, cache)) == ["project.dataset.table"]
+
+    client.update_table(
+        Table("project.dataset.table", schema=[SchemaField("a", "INTEGER")]),
+        ["schema"],
+    )
+    assert _find_differences(client, cache) == {}
+    assert client.calls["get_table"] == 2
+    assert _find_differences(client, cache) == {}
+    assert client.calls["get_table"] == 2
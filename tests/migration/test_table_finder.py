@@ -1,9 +1,12 @@
+import json
 import os
 import pathlib
+import sys
 
 import pytest
 
-from bq_schema.migration.table_finder import find_tables
+from bq_schema.migration import table_finder
+from bq_schema.migration.table_finder import find_table_classes, find_tables
 
 
 def test_table_finder():
@@ -27,3 +30,141 @@ def test_table_schema_fields():
     for local_table in find_tables(tables_dir, True):
         schema_fields = local_table.get_schema_fields()
         assert len(schema_fields) > 0
+
+
+def test_static_table_finder():
+    file_path = pathlib.Path(__file__).parent
+    tables_dir = os.path.join(file_path, "tables")
+    static_tables = {
+        (t.name, t.get_schema_fingerprint())
+        for t in find_tables(tables_dir, True, static=True)
+    }
+    tables = {
+        (t.name, t.get_schema_fingerprint()) for t in find_tables(tables_dir, True)
+    }
+    assert static_tables == tables
+
+
+def test_static_table_finder_imports_only_table_modules():
+    file_path = pathlib.Path(__file__).parent
+    tables_dir = os.path.join(file_path, "static_tables")
+    tables = find_tables(tables_dir, True, static=True)
+
+    assert {(t.dataset, t.name) for t in tables} == {
+        ("static_dataset", "event_table"),
+        ("static_dataset", "derived_event_table"),
+    }
+    assert not [name for name in sys.modules if name.endswith("heavy_module")]
+    assert not [name for name in sys.modules if name.endswith("not_a_table")]
+
+
+def test_find_table_classes():
+    file_path = pathlib.Path(__file__).parent
+    tables_dir = os.path.join(file_path, "static_tables")
+    table_classes = {
+        module_name.rsplit(".static_tables.", 1)[-1]: class_names
+        for module_name, class_names in find_table_classes(tables_dir).items()
+    }
+    assert table_classes == {
+        "base": ["BaseTable"],
+        "derived": ["DerivedEventTable"],
+        "models.events": ["EventTable"],
+    }
+
+
+def _write_tables_package(tables_dir):
+    tables_dir.mkdir()
+    (tables_dir / "__init__.py").write_text("")
+    (tables_dir / "base.py").write_text(
+        "from bq_schema.bigquery_table import BigqueryTable\n\n\n"
+        "class BaseTable(BigqueryTable):\n"
+        "    pass\n"
+    )
+    (tables_dir / "table.py").write_text(
+        "from .base import BaseTable\n\n\n"
+        "class Table(BaseTable):\n"
+        "    name = 'table'\n"
+    )
+
+
+def test_static_table_finder_with_base_outside_module_path(tmp_path, monkeypatch):
+    shared_dir = tmp_path / "shared_tables"
+    shared_dir.mkdir()
+    (shared_dir / "__init__.py").write_text("")
+    (shared_dir / "base.py").write_text(
+        "from bq_schema.bigquery_table import BigqueryTable\n\n\n"
+        "class SharedTable(BigqueryTable):\n"
+        "    dataset = 'shared'\n\n\n"
+        "class NotATable:\n"
+        "    pass\n"
+    )
+    tables_dir = tmp_path / "outside_tables"
+    tables_dir.mkdir()
+    (tables_dir / "__init__.py").write_text("")
+    (tables_dir / "tables.py").write_text(
+        "from shared_tables.base import NotATable, SharedTable\n\n\n"
+        "class Table(SharedTable):\n"
+        "    name = 'table'\n\n\n"
+        "class Other(NotATable):\n"
+        "    pass\n"
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    assert "shared_tables.base" not in sys.modules
+    assert find_table_classes(str(tables_dir)) == {
+        "outside_tables.tables": ["Table", "Other"]
+    }
+    tables = find_tables(str(tables_dir), True, static=True)
+    assert {(t.dataset, t.name) for t in tables} == {("shared", "table")}
+    assert find_table_classes(str(tables_dir)) == {"outside_tables.tables": ["Table"]}
+
+
+def test_find_table_classes_with_manifest(tmp_path, monkeypatch):
+    tables_dir = tmp_path / "tables"
+    _write_tables_package(tables_dir)
+    manifest_path = str(tmp_path / "manifest.json")
+
+    parsed_files = []
+    parse_module = table_finder._parse_module
+
+    def counting_parse_module(module_name, file_path, source, is_pkg):
+        parsed_files.append(os.path.basename(file_path))
+        return parse_module(module_name, file_path, source, is_pkg)
+
+    monkeypatch.setattr(table_finder, "_parse_module", counting_parse_module)
+
+    def table_class_names():
+        return sorted(
+            class_name
+            for class_names in find_table_classes(
+                str(tables_dir), manifest_path
+            ).values()
+            for class_name in class_names
+        )
+
+    assert table_class_names() == ["BaseTable", "Table"]
+    assert sorted(parsed_files) == ["base.py", "table.py"]
+
+    parsed_files.clear()
+    assert table_class_names() == ["BaseTable", "Table"]
+    assert parsed_files == []
+
+    os.utime(tables_dir / "table.py", ns=(0, 0))
+    assert table_class_names() == ["BaseTable", "Table"]
+    assert parsed_files == []
+
+    (tables_dir / "base.py").write_text("class BaseTable:\n    pass\n")
+    assert table_class_names() == []
+    assert parsed_files == ["base.py"]
+
+
+def test_find_table_classes_with_invalid_manifest(tmp_path):
+    tables_dir = tmp_path / "tables"
+    _write_tables_package(tables_dir)
+    manifest_path = tmp_path / "manifest.json"
+    manifest_path.write_text("{")
+
+    table_classes = find_table_classes(str(tables_dir), str(manifest_path))
+    assert sorted(table_classes.values()) == [["BaseTable"], ["Table"]]
+    with open(manifest_path, encoding="utf-8") as manifest_file:
+        assert len(json.load(manifest_file)["modules"]) == 2
@@ -1,4 +1,5 @@
 # pylint: disable=too-many-instance-attributes
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import date, datetime, time
 from decimal import Decimal
@@ -6,7 +7,14 @@ from typing import List, Optional
 
 from google.cloud.bigquery import SchemaField
 
-from bq_schema.dataclass_converter import dataclass_to_schema
+from bq_schema.codec.decoder import compile_decoder
+from bq_schema.codec.encoder import compile_encoder
+from bq_schema.codec.json_encoder import compile_json_encoder
+from bq_schema.codec.lazy import compile_lazy_decoder
+from bq_schema.codec.record import compile_record_decoder, record_type
+from bq_schema.codec.validator import compile_validator
+from bq_schema.dataclass_converter import clear_schema_cache, dataclass_to_schema
+from bq_schema.migration import fingerprint
 from bq_schema.types.type_mapping import Geography, Timestamp
 
 
@@ -164,3 +172,80 @@ def test_repeated_types():
             ),
         ),
     ]
+
+
+@dataclass
+class CachedNestedSchema:
+    int_field: int
+
+
+@dataclass
+class CachedSchema:
+    nested_field: CachedNestedSchema
+    repeated_field: List[CachedNestedSchema]
+
+
+def test_schema_is_cached():
+    schema = dataclass_to_schema(CachedSchema)
+    cached_schema = dataclass_to_schema(CachedSchema)
+    assert schema == cached_schema
+    assert schema is not cached_schema
+    assert all(a is b for a, b in zip(schema, cached_schema))
+    assert schema[0].fields[0] is schema[1].fields[0]
+
+
+def test_schema_with_localns_is_not_cached():
+    @dataclass
+    class LocalSchema:
+        nested_field: CachedNestedSchema
+
+    localns = locals()
+    schema = dataclass_to_schema(LocalSchema, localns=localns)
+    assert dataclass_to_schema(LocalSchema, localns=localns) == schema
+    assert dataclass_to_schema(LocalSchema, localns=localns)[0] is not schema[0]
+    assert schema[0].fields[0] is dataclass_to_schema(CachedNestedSchema)[0]
+
+
+def test_clear_schema_cache():
+    schema = dataclass_to_schema(CachedSchema)
+    clear_schema_cache(CachedNestedSchema)
+    assert dataclass_to_schema(CachedSchema)[0] is schema[0]
+    clear_schema_cache(CachedSchema)
+    assert dataclass_to_schema(CachedSchema)[0] is not schema[0]
+    clear_schema_cache()
+    assert dataclass_to_schema(CachedSchema) == schema
+
+
+def test_clear_schema_cache_recompiles_codecs():
+    compile_functions = (
+        compile_encoder,
+        compile_decoder,
+        compile_json_encoder,
+        compile_lazy_decoder,
+        compile_record_decoder,
+        record_type,
+        compile_validator,
+    )
+    compiled = [
+        compile_function(CachedSchema) for compile_function in compile_functions
+    ]
+    nested_encoder = compile_encoder(CachedNestedSchema)
+    fingerprint.dataclass_fingerprint(CachedSchema)
+
+    clear_schema_cache(CachedSchema)
+    assert CachedSchema not in fingerprint._DATACLASS_FINGERPRINTS
+    for compile_function, previous in zip(compile_functions, compiled):
+        assert compile_function(CachedSchema) is not previous
+    assert compile_encoder(CachedNestedSchema) is nested_encoder
+
+    clear_schema_cache()
+    assert compile_encoder(CachedNestedSchema) is not nested_encoder
+
+
+def test_schema_cache_concurrent_access():
+    clear_schema_cache()
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        schemas = list(
+            executor.map(lambda _: dataclass_to_schema(CachedSchema), range(32))
+        )
+    assert all(schema[0] is schemas[0][0] for schema in schemas)
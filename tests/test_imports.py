@@ -0,0 +1,21 @@
+import subprocess
+import sys
+
+import pytest
+
+
+@pytest.mark.parametrize(
+    "module",
+    [
+        "bq_schema.row_transformer",
+        "bq_schema.bigquery_table",
+        "bq_schema.cli.migrate_tables",
+        "bq_schema.cli.convert_table",
+    ],
+)
+def test_import_does_not_load_bigquery(module):
+    code = f"import sys, {module}; print('google.cloud.bigquery' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+    assert result.stdout.strip() == "False"
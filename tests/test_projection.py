@@ -0,0 +1,143 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+import pytest
+from google.cloud.bigquery import SchemaField
+
+from bq_schema.bigquery_table import BigqueryTable
+from bq_schema.row_transformer import RowTransformer
+
+
+@dataclass
+class Leaf:
+    x: int
+    y: str
+
+
+@dataclass
+class Nested:
+    a: int
+    b: str
+    leaves: List[Leaf]
+
+
+@dataclass
+class Schema:
+    id: str
+    optional_nested: Optional[Nested]
+    repeated_nested: List[Nested]
+    nested: Nested
+
+
+@dataclass
+class LeafView:
+    y: str
+
+
+@dataclass
+class NestedView:
+    a: int
+    leaves: List[LeafView]
+
+
+@dataclass
+class View:
+    id: Optional[str]
+    optional_nested: Optional[NestedView]
+    repeated_nested: List[NestedView]
+    nested: Nested
+
+
+class Table(BigqueryTable):
+    name = "table"
+    schema = Schema
+    project = "project"
+    dataset = "dataset"
+
+
+def test_projection_sql_of_schema():
+    assert Table().projection_sql() == (
+        "SELECT\n"
+        "  `id`,\n"
+        "  `optional_nested`,\n"
+        "  `repeated_nested`,\n"
+        "  `nested`\n"
+        "FROM `project.dataset.table`"
+    )
+
+
+def test_projection_sql_of_view():
+    assert Table().projection_sql(View) == (
+        "SELECT\n"
+        "  `id`,\n"
+        "  IF(`optional_nested` IS NULL, NULL, STRUCT("
+        "`optional_nested`.`a` AS `a`, "
+        "ARRAY(SELECT AS STRUCT _item0.`y` AS `y` "
+        "FROM UNNEST(`optional_nested`.`leaves`) AS _item0 "
+        "WITH OFFSET AS _item0_offset ORDER BY _item0_offset) AS `leaves`"
+        ")) AS `optional_nested`,\n"
+        "  ARRAY(SELECT AS STRUCT _item0.`a` AS `a`, "
+        "ARRAY(SELECT AS STRUCT _item1.`y` AS `y` "
+        "FROM UNNEST(_item0.`leaves`) AS _item1 "
+        "WITH OFFSET AS _item1_offset ORDER BY _item1_offset) AS `leaves` "
+        "FROM UNNEST(`repeated_nested`) AS _item0 "
+        "WITH OFFSET AS _item0_offset ORDER BY _item0_offset) AS `repeated_nested`,\n"
+        "  `nested`\n"
+        "FROM `project.dataset.table`"
+    )
+
+
+def test_projection_sql_overrides_table():
+    class SchemaFieldTable(Table):
+        schema = [SchemaField("id", "STRING"), SchemaField("count", "INTEGER")]
+
+    @dataclass
+    class CountView:
+        count: Optional[int]
+
+    assert SchemaFieldTable().projection_sql(CountView, dataset="other") == (
+        "SELECT\n  `count`\nFROM `project.other.table`"
+    )
+
+
+@pytest.mark.parametrize(
+    "view_field, error",
+    [
+        ("missing: int", "missing does not exist"),
+        ("id: int", "id is STRING, not INT64"),
+        ("id: List[str]", "id is REQUIRED, not REPEATED"),
+        ("nested: Optional[LeafView]", "nested.y does not exist"),
+    ],
+)
+def test_projection_sql_invalid_view(view_field, error):
+    namespace = {"Optional": Optional, "List": List, "LeafView": LeafView}
+    exec(f"class InvalidView:\n    {view_field}", namespace)
+    with pytest.raises(ValueError, match=error):
+        Table().projection_sql(dataclass(namespace["InvalidView"]))
+
+
+def test_required_view_field_of_nullable_column():
+    @dataclass
+    class RequiredView:
+        id: str
+
+    class NullableTable(Table):
+        schema = [SchemaField("id", "STRING", "NULLABLE")]
+
+    with pytest.raises(ValueError, match="id is NULLABLE, not REQUIRED"):
+        NullableTable().projection_sql(RequiredView)
+
+
+def test_decode_projected_row():
+    row = {
+        "id": "1",
+        "optional_nested": None,
+        "repeated_nested": [{"a": 1, "leaves": [{"y": "y"}]}],
+        "nested": {"a": 2, "b": "b", "leaves": []},
+    }
+    assert RowTransformer(View).bq_row_to_dataclass_instance(row) == View(
+        id="1",
+        optional_nested=None,
+        repeated_nested=[NestedView(a=1, leaves=[LeafView(y="y")])],
+        nested=Nested(a=2, b="b", leaves=[]),
+    )
@@ -1,9 +1,13 @@
+import threading
 from dataclasses import dataclass
 from datetime import date, datetime, time
 from decimal import Decimal
-from typing import List, Optional
+from types import SimpleNamespace
+from typing import Iterator, List, Optional
 
-from google.cloud.bigquery.table import Row
+import pytest
+from google.cloud.bigquery import SchemaField
+from google.cloud.bigquery.table import Row, RowIterator
 
 from bq_schema.row_transformer import RowTransformer
 from bq_schema.types.type_mapping import Geography, Timestamp
@@ -189,3 +193,114 @@ def dict_to_row(row_as_dict: dict) -> Row:
         field_to_index[key] = i
 
     return Row(values=values, field_to_index=field_to_index)
+
+
+@dataclass
+class SimpleSchema:
+    int_field: int
+
+
+class FakeRowIterator:
+    def __init__(self, page_sizes: List[int], fail_after: Optional[int] = None):
+        self._page_sizes = page_sizes
+        self._fail_after = fail_after
+        self.fetched_by: List[str] = []
+
+    @property
+    def pages(self) -> Iterator[List[Row]]:
+        offset = 0
+        for page_number, page_size in enumerate(self._page_sizes):
+            if page_number == self._fail_after:
+                raise RuntimeError("Page could not be fetched.")
+            self.fetched_by.append(threading.current_thread().name)
+            yield [
+                dict_to_row({"int_field": i}) for i in range(offset, offset + page_size)
+            ]
+            offset += page_size
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_iter_instances(prefetch):
+    row_iterator = FakeRowIterator([3, 0, 2])
+    row_transformer = RowTransformer(SimpleSchema)
+    instances = list(row_transformer.iter_instances(row_iterator, prefetch=prefetch))
+    assert instances == [SimpleSchema(int_field=i) for i in range(5)]
+
+
+def test_iter_instances_prefetches_in_background():
+    row_iterator = FakeRowIterator([1, 1])
+    list(RowTransformer(SimpleSchema).iter_instances(row_iterator))
+    assert row_iterator.fetched_by == ["bq-schema-prefetch", "bq-schema-prefetch"]
+
+
+def test_iter_instances_raises_page_errors():
+    row_iterator = FakeRowIterator([1, 1], fail_after=1)
+    instances = RowTransformer(SimpleSchema).iter_instances(row_iterator)
+    assert next(instances) == SimpleSchema(int_field=0)
+    with pytest.raises(RuntimeError):
+        next(instances)
+
+
+def test_iter_records():
+    row_transformer = RowTransformer(SimpleSchema)
+    records = list(row_transformer.iter_records(FakeRowIterator([3, 0, 2])))
+    assert records == [row_transformer.record_type(int_field=i) for i in range(5)]
+
+
+@pytest.mark.parametrize(
+    "page_sizes, batch_size",
+    [([3, 4], 3), ([10], 3), ([1, 1, 0, 1, 1], 3), ([2, 7, 1], 4), ([5], 5)],
+)
+def test_iter_batches(page_sizes, batch_size):
+    row_iterator = FakeRowIterator(page_sizes)
+    batches = list(RowTransformer(SimpleSchema).iter_batches(row_iterator, batch_size))
+    rows = sum(page_sizes)
+    assert [[i.int_field for i in batch] for batch in batches] == [
+        list(range(start, min(start + batch_size, rows)))
+        for start in range(0, rows, batch_size)
+    ]
+
+
+def test_iter_batches_invalid_batch_size():
+    with pytest.raises(ValueError):
+        next(RowTransformer(SimpleSchema).iter_batches(FakeRowIterator([1]), 0))
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+def test_parallel_decode(ordered):
+    row_iterator = FakeRowIterator([3, 0, 2, 5])
+    instances = RowTransformer(SimpleSchema).parallel_decode(
+        row_iterator.pages, workers=2, ordered=ordered, max_pending_pages=2
+    )
+    int_fields = [instance.int_field for instance in instances]
+    if not ordered:
+        int_fields.sort()
+    assert int_fields == list(range(10))
+
+
+def test_parallel_decode_raises_errors():
+    pages = [[{"int_field": 1}], [{"other_field": 1}]]
+    instances = RowTransformer(SimpleSchema).parallel_decode(pages, workers=1)
+    assert next(instances) == SimpleSchema(int_field=1)
+    with pytest.raises(KeyError):
+        next(instances)
+
+    with pytest.raises(ValueError):
+        next(RowTransformer(SimpleSchema).parallel_decode(pages, max_pending_pages=-1))
+
+
+def test_parallel_decode_row_iterator():
+    responses = {
+        None: {"rows": [{"f": [{"v": "1"}]}, {"f": [{"v": "2"}]}], "pageToken": "2"},
+        "2": {"rows": [{"f": [{"v": "3"}]}]},
+    }
+    row_iterator = RowIterator(
+        client=SimpleNamespace(project="project"),
+        api_request=lambda method, path, query_params: responses[
+            query_params.get("pageToken")
+        ],
+        path="/rows",
+        schema=[SchemaField("int_field", "INTEGER")],
+    )
+    instances = RowTransformer(SimpleSchema).parallel_decode(row_iterator, workers=2)
+    assert list(instances) == [SimpleSchema(int_field=i) for i in (1, 2, 3)]
@@ -1,11 +1,14 @@
 import inspect
-from dataclasses import field
+import sys
+from dataclasses import FrozenInstanceError, field
 from datetime import date, datetime, time
 from decimal import Decimal
 from typing import List, Optional
 
+import pytest
 from google.cloud.bigquery import SchemaField
 
+from bq_schema.row_transformer import RowTransformer
 from bq_schema.schema_converter import schema_to_dataclass
 from bq_schema.types.type_mapping import Geography, Timestamp
 
@@ -179,3 +182,77 @@ def test_repeated_schema_to_dataclass():
         f"@dataclass\n{inspect.getsource(RepeatedSchema)}"
     )
     assert schema_to_dataclass("RepeatedSchema", schema) == expected.strip()
+
+
+def _address(*field_names: str) -> SchemaField:
+    return SchemaField(
+        "address",
+        "STRUCT",
+        "NULLABLE",
+        None,
+        tuple(
+            SchemaField(name, "STRING", "NULLABLE", None, ()) for name in field_names
+        ),
+    )
+
+
+def test_nested_structs_are_deduplicated():
+    schema = [
+        SchemaField("billing", "STRUCT", "REQUIRED", None, (_address("street"),)),
+        SchemaField("shipping", "STRUCT", "REQUIRED", None, (_address("street"),)),
+        _address("street", "city"),
+    ]
+    source = schema_to_dataclass("Order", schema)
+    assert source.count("class Address:") == 1
+    assert source.count("class Address2:") == 1
+    # billing and shipping have the same structure as well.
+    assert source.count("class Billing:") == 1
+    assert "class Shipping" not in source
+    assert "    shipping: Billing" in source
+    assert "    address: Optional[Address2]" in source
+    assert source.index("class Address:") < source.index("class Billing:")
+    assert source.endswith(
+        "class Order:\n    billing: Billing\n    shipping: Billing\n    address: Optional[Address2]"
+    )
+
+
+@pytest.mark.skipif(sys.version_info < (3, 10), reason="slots requires 3.10")
+@pytest.mark.parametrize("lazy", [False, True])
+def test_slots_and_frozen_dataclasses(lazy):
+    schema = [
+        SchemaField("int_field", "INT64", "REQUIRED", None, ()),
+        SchemaField(
+            "repeated_address",
+            "STRUCT",
+            "REPEATED",
+            "Addresses.",
+            (SchemaField("street", "STRING", "NULLABLE", None, ()),),
+        ),
+    ]
+    source = schema_to_dataclass("Schema", schema, slots=True, frozen=True)
+    assert source.startswith("@dataclass(frozen=True, slots=True)\n")
+
+    namespace: dict = {}
+    exec(  # pylint: disable=exec-used
+        "from dataclasses import dataclass, field\n"
+        "from typing import List, Optional\n" + source,
+        namespace,
+    )
+    dataclass = namespace["Schema"]
+    row = {"int_field": 1, "repeated_address": [{"street": "a"}]}
+    instance = RowTransformer(dataclass, lazy=lazy).bq_row_to_dataclass_instance(row)
+    assert not hasattr(dataclass(1, []), "__dict__")
+    assert instance.repeated_address[0].street == "a"
+    assert RowTransformer.dataclass_instance_to_bq_row(instance) == row
+    with pytest.raises(FrozenInstanceError):
+        instance.int_field = 2
+
+
+def test_slots_require_python_3_10(monkeypatch):
+    monkeypatch.setattr(sys, "version_info", (3, 9, 0))
+    schema = [SchemaField("int_field", "INT64", "REQUIRED", None, ())]
+    with pytest.raises(ValueError, match="python 3.10"):
+        schema_to_dataclass("Schema", schema, slots=True)
+    assert schema_to_dataclass("Schema", schema, frozen=True).startswith(
+        "@dataclass(frozen=True)\n"
+    )
@@ -0,0 +1,187 @@
+import json
+from dataclasses import dataclass
+from typing import List
+
+import pytest
+from google.api_core.exceptions import InternalServerError
+from google.cloud.bigquery import SchemaField
+from google.cloud.bigquery.table import Table
+
+from bq_schema.bigquery_table import BigqueryTable
+from bq_schema.migration.fake_client import FakeBigQueryClient
+from bq_schema.migration.retry import RetryPolicy
+from bq_schema.streaming_writer import (
+    StreamingWriter,
+    content_insert_id,
+    random_insert_id,
+)
+
+TABLE = "project.dataset.table"
+SCHEMA = [SchemaField("id", "INTEGER"), SchemaField("name", "STRING")]
+NO_DELAY = RetryPolicy(attempts=3, initial_delay=0, max_delay=0)
+
+
+@pytest.fixture(name="client")
+def fixture_client():
+    client = FakeBigQueryClient()
+    client.add_tables([Table(TABLE, schema=SCHEMA)])
+    return client
+
+
+class _RowErrorClient:
+    """
+    Fail the row with the id 1 with reason on every request.
+    """
+
+    def __init__(self, reason: str):
+        self.reason = reason
+        self.requests: List[List[dict]] = []
+        self.row_ids: List[List[str]] = []
+
+    def insert_rows_json(self, table, json_rows, row_ids):
+        self.requests.append(json_rows)
+        self.row_ids.append(row_ids)
+        for index, row in enumerate(json_rows):
+            if row["id"] == "1":
+                return [{"index": index, "errors": [{"reason": self.reason}]}]
+        return []
+
+
+def test_batches_by_rows(client):
+    batches = []
+    with StreamingWriter(
+        client, TABLE, SCHEMA, max_request_rows=10, on_batch=batches.append
+    ) as writer:
+        writer.write_many({"id": i, "name": str(i)} for i in range(25))
+
+    assert sorted(batch.rows for batch in batches) == [5, 10, 10]
+    assert client.calls["insert_rows_json"] == 3
+    assert len(client.list_rows(TABLE)) == 25
+    assert not writer.failed_rows
+
+
+def test_batches_by_bytes(client):
+    max_request_bytes = 1000
+    batches = []
+    with StreamingWriter(
+        client,
+        TABLE,
+        SCHEMA,
+        max_request_bytes=max_request_bytes,
+        on_batch=batches.append,
+    ) as writer:
+        writer.write_many({"id": i, "name": "x" * 50} for i in range(100))
+
+    assert len(batches) > 1
+    assert all(batch.payload_bytes <= max_request_bytes for batch in batches)
+    # Batches are packed close to the limit.
+    assert all(batch.payload_bytes > max_request_bytes - 200 for batch in batches[:-1])
+    assert sum(batch.rows for batch in batches) == 100
+
+
+def test_payload_size_is_exact(client):
+    batches = []
+    rows = [{"id": i, "name": "ü" * i} for i in range(10)]
+    with StreamingWriter(
+        client, TABLE, SCHEMA, insert_id=content_insert_id, on_batch=batches.append
+    ) as writer:
+        writer.write_many(rows)
+
+    json_rows = [{"id": str(row["id"]), "name": row["name"]} for row in rows]
+    request = {
+        "rows": [{"insertId": content_insert_id(row), "json": row} for row in json_rows]
+    }
+    # The separator of the first row is counted as well.
+    assert batches[0].payload_bytes == len(json.dumps(request)) + 2
+
+
+def test_equal_rows_are_inserted(client):
+    row = {"id": 1, "name": "a"}
+    assert random_insert_id(row) != random_insert_id(row)
+    with StreamingWriter(client, TABLE, SCHEMA) as writer:
+        writer.write_many([row, row])
+    assert client.list_rows(TABLE) == [{"id": "1", "name": "a"}] * 2
+
+
+def test_content_insert_ids_deduplicate_rows(client):
+    row = {"id": 1, "name": "a"}
+    assert content_insert_id(row) == content_insert_id({"name": "a", "id": 1})
+
+    for _ in range(2):
+        with StreamingWriter(
+            client, TABLE, SCHEMA, insert_id=content_insert_id
+        ) as writer:
+            writer.write(row)
+    assert client.list_rows(TABLE) == [{"id": "1", "name": "a"}]
+
+
+def test_retries_stopped_rows():
+    client = _RowErrorClient("stopped")
+    batches = []
+    with StreamingWriter(
+        client, TABLE, SCHEMA, retry_policy=NO_DELAY, on_batch=batches.append
+    ) as writer:
+        writer.write_many({"id": i, "name": None} for i in range(3))
+
+    # The failing row is sent on its own until the attempts are exhausted.
+    assert [len(request) for request in client.requests] == [3, 1, 1]
+    assert client.row_ids[1] == client.row_ids[2] == [client.row_ids[0][1]]
+    assert batches[0].requests == 3
+    assert batches[0].retried_rows == 2
+    assert [failed_row.row for failed_row in writer.failed_rows] == [
+        {"id": 1, "name": None}
+    ]
+
+
+def test_does_not_retry_invalid_rows():
+    client = _RowErrorClient("invalid")
+    with StreamingWriter(client, TABLE, SCHEMA, retry_policy=NO_DELAY) as writer:
+        writer.write_many({"id": i, "name": None} for i in range(3))
+
+    assert len(client.requests) == 1
+    assert len(writer.failed_rows) == 1
+    assert writer.failed_rows[0].errors == [{"reason": "invalid"}]
+
+
+def test_retries_failed_requests(client):
+    client.inject_error(TABLE, InternalServerError("failed"), times=2)
+    with StreamingWriter(client, TABLE, SCHEMA, retry_policy=NO_DELAY) as writer:
+        writer.write({"id": 1, "name": "a"})
+
+    assert client.calls["insert_rows_json"] == 3
+    assert len(client.list_rows(TABLE)) == 1
+    assert not writer.failed_rows
+
+    client.inject_error(TABLE, InternalServerError("failed"), times=3)
+    with StreamingWriter(client, TABLE, SCHEMA, retry_policy=NO_DELAY) as writer:
+        writer.write({"id": 2, "name": "b"})
+    assert writer.failed_rows[0].errors[0]["reason"] == "InternalServerError"
+
+
+def test_rejects_too_large_rows(client):
+    with StreamingWriter(client, TABLE, SCHEMA, max_request_bytes=200) as writer:
+        writer.write({"id": 1, "name": "x" * 200})
+        writer.write({"id": 2, "name": "x"})
+
+    assert [r.row["id"] for r in writer.failed_rows] == [1]
+    assert client.list_rows(TABLE) == [{"id": "2", "name": "x"}]
+
+
+@dataclass
+class Event:
+    id: int
+    name: str
+
+
+class EventTable(BigqueryTable):
+    project = "project"
+    dataset = "dataset"
+    name = "table"
+    schema = Event
+
+
+def test_bigquery_table_writer(client):
+    with EventTable().writer(client, concurrency=2) as writer:
+        writer.write_many(Event(i, str(i)) for i in range(3))
+
+    assert sorted(row["id"] for row in client.list_rows(TABLE)) == [0, 1, 2]